@@ -1,202 +1,234 @@
 const express = require('express');
-const { spawn } = require('child_process');
+const axios = require('axios');
 const cors = require('cors');
-const path = require('path');
 
 // Create an Express router for the hybrid search API
 const router = express.Router();
 
+// Long-running Python hybrid search service (hybrid_search.py --serve)
+const HYBRID_SEARCH_URL = process.env.HYBRID_SEARCH_URL || 'http://localhost:8765';
+const HYBRID_SEARCH_TIMEOUT_MS = parseInt(process.env.HYBRID_SEARCH_TIMEOUT_MS, 10) || 30000;
+
 /**
- * Route handler for hybrid search (GET)
- * This endpoint integrates with the Python hybrid search script
+ * Collects filters from a POST body ("filters" object) or from repeated
+ * filter_<field> query parameters, the format used by /api/search.
+ * Fields the hybrid search cannot filter on are rejected by the service with 400.
+ *
+ * @param {Object} source - req.query or req.body
+ * @returns {Object|undefined} Field -> list of values, undefined without filters
  */
-router.get('/search', cors(), async (req, res) => {
-  try {
-    const { q, rows = 10, start = 0, keyword_weight = 0.5, semantic_weight = 0.5 } = req.query;
-    
-    if (!q || q.trim() === '') {
-      return res.status(400).json({ 
-        error: true, 
-        message: 'Query parameter is required',
-        numFound: 0,
-        docs: []
-      });
-    }
-
-    // Convert to numeric values
-    const limit = parseInt(rows, 10) || 10;
-    const weights = `${parseFloat(keyword_weight)},${parseFloat(semantic_weight)}`;
-    
-    console.log(`Performing hybrid search: "${q}" with weights ${weights} and limit ${limit}`);
-    
-    // Execute the Python script
-    const scriptPath = '/app/scripts/qdrant/hybrid_search.py';
-    // Use system Python in development, but respect PATH in production (which should include the venv)
-    const pythonBin = process.env.NODE_ENV === 'production' ? 'python' : 'python3';
-    const pythonProcess = spawn(pythonBin, [
-      scriptPath,
-      '--query', q,
-      '--limit', limit.toString(),
-      '--weights', weights
-    ]);
-    
-    let resultData = '';
-    let errorData = '';
-
-    // Collect data from stdout
-    pythonProcess.stdout.on('data', (data) => {
-      resultData += data.toString();
+function extractFilters(source) {
+  const filters = { ...(source.filters || {}) };
+  Object.keys(source)
+    .filter(key => key.startsWith('filter_'))
+    .forEach(key => {
+      const values = source[key];
+      filters[key.slice('filter_'.length)] = Array.isArray(values) ? values : [values];
     });
+  return Object.keys(filters).length > 0 ? filters : undefined;
+}
 
-    // Collect data from stderr
-    pythonProcess.stderr.on('data', (data) => {
-      errorData += data.toString();
-      console.error(`Hybrid search stderr: ${data}`);
-    });
+/**
+ * Interprets a query string or JSON flag ("true", "1", true) as boolean.
+ *
+ * @param {boolean|string|undefined} value - Flag value
+ * @returns {boolean}
+ */
+function isTruthy(value) {
+  return value === true || ['1', 'true', 'yes', 'on'].includes(String(value).toLowerCase());
+}
 
-    // Handle process completion
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        console.error(`Hybrid search process exited with code ${code}`);
-        console.error(`Error: ${errorData}`);
-        return res.status(500).json({
-          error: true, 
-          message: `Search failed with exit code ${code}`,
-          stderr: errorData,
-          numFound: 0,
-          docs: []
-        });
-      }
-
-      try {
-        // Parse the JSON returned by the Python script
-        const results = JSON.parse(resultData);
-        
-        // Format the results in a way compatible with the frontend
-        const formattedResults = {
-          numFound: results.length,
-          docs: results,
-          start: parseInt(start, 10) || 0,
-        };
-
-        res.json(formattedResults);
-      } catch (parseError) {
-        console.error('Failed to parse hybrid search results:', parseError);
-        console.error('Raw data:', resultData);
-        res.status(500).json({
-          error: true, 
-          message: 'Failed to parse search results',
-          numFound: 0,
-          docs: []
-        });
-      }
+/**
+ * Logs the per-stage durations of a traced hybrid search.
+ *
+ * @param {string} query - Search query
+ * @param {Object} timings - Timings block of the search response (trace_id, total_ms, stages, spans)
+ */
+function logTimings(query, timings) {
+  const stages = Object.entries(timings.stages || {})
+    .map(([stage, ms]) => `${stage}=${ms.toFixed(1)}ms`)
+    .join(' ');
+  console.log(`Hybrid search timings for "${query}" (trace ${timings.trace_id}): total=${timings.total_ms.toFixed(1)}ms ${stages}`);
+}
+
+/**
+ * Proxies a search request to the hybrid search service and sends the result
+ * in the format expected by the frontend.
+ *
+ * @param {Object} params - Search parameters
+ * @param {string} params.query - Search query
+ * @param {number|string} params.rows - Number of results
+ * @param {number|string} params.start - Offset for pagination
+ * @param {string} [params.cursor] - Cursor of an earlier page of the same query
+ * @param {string} [params.mode] - Result mode: 'full' or 'snippets' (metadata plus highlighted snippets)
+ * @param {number|string} params.keyword_weight - Weight for keyword results
+ * @param {number|string} params.semantic_weight - Weight for semantic results
+ * @param {string} [params.fusion] - Fusion strategy (sigmoid, rrf, minmax)
+ * @param {number|string} [params.candidate_pool] - Candidates fetched per side before fusion
+ * @param {boolean|string} [params.timings] - Return the timing spans of the search
+ * @param {Object} [params.filters] - Field -> values; applied by Solr (fq) and Qdrant (payload filter)
+ * @param {string} [params.ann_preset] - Qdrant accuracy preset (fast, default, exact)
+ * @param {Object} res - Express response
+ */
+async function proxyHybridSearch({ query, rows = 10, start = 0, cursor, mode, keyword_weight = 0.5, semantic_weight = 0.5, fusion, candidate_pool, timings, filters, ann_preset }, res) {
+  if (!query || query.trim() === '') {
+    return res.status(400).json({
+      error: true,
+      message: 'Query parameter is required',
+      numFound: 0,
+      docs: []
     });
+  }
+
+  // Convert to numeric values
+  const limit = parseInt(rows, 10) || 10;
+  const offset = parseInt(start, 10) || 0;
+  const keywordWeight = parseFloat(keyword_weight);
+  const semanticWeight = parseFloat(semantic_weight);
+
+  console.log(`Performing hybrid search: "${query}" with weights ${keywordWeight},${semanticWeight} and limit ${limit} (start ${offset})`
+    + (filters ? ` and filters ${JSON.stringify(filters)}` : ''));
+
+  try {
+    // Reason: the service keeps a warm HybridSearcher with pooled connections,
+    // so no Python process has to be spawned per query. Passing the cursor back
+    // lets it serve further pages from its cached candidate pool.
+    const response = await axios.post(`${HYBRID_SEARCH_URL}/search`, {
+      query,
+      limit,
+      start: offset,
+      cursor,
+      mode,
+      keyword_weight: keywordWeight,
+      semantic_weight: semanticWeight,
+      fusion,
+      candidate_pool: candidate_pool ? parseInt(candidate_pool, 10) : undefined,
+      timings: isTruthy(timings),
+      filters,
+      ann_preset
+    }, { timeout: HYBRID_SEARCH_TIMEOUT_MS });
+
+    if (response.data.timings) {
+      logTimings(query, response.data.timings);
+    }
+    res.json(response.data);
   } catch (error) {
-    console.error('Hybrid search error:', error);
-    res.status(500).json({
-      error: true, 
-      message: error.message || 'Internal server error',
+    const status = error.response ? error.response.status : 502;
+    const message = (error.response && error.response.data && error.response.data.message)
+      || error.message
+      || 'Hybrid search service unavailable';
+    console.error(`Hybrid search failed (${status}): ${message}`);
+    res.status(status).json({
+      error: true,
+      message,
       numFound: 0,
       docs: []
     });
   }
+}
+
+/**
+ * Route handler for hybrid search (GET)
+ * This endpoint proxies to the Python hybrid search service
+ */
+router.get('/search', cors(), async (req, res) => {
+  const { q, rows, start, cursor, mode, keyword_weight, semantic_weight, fusion, candidate_pool, timings, ann_preset } = req.query;
+  await proxyHybridSearch({ query: q, rows, start, cursor, mode, keyword_weight, semantic_weight, fusion, candidate_pool, timings, ann_preset, filters: extractFilters(req.query) }, res);
 });
 
 /**
  * Route handler for hybrid search (POST)
- * This endpoint integrates with the Python hybrid search script
+ * This endpoint proxies to the Python hybrid search service
  * Accepts JSON body with query parameters
  */
 router.post('/search', cors(), async (req, res) => {
-  try {
-    const { query, rows = 10, start = 0, keyword_weight = 0.5, semantic_weight = 0.5 } = req.body;
-    
-    if (!query || query.trim() === '') {
-      return res.status(400).json({ 
-        error: true, 
-        message: 'Query parameter is required',
-        numFound: 0,
-        docs: []
-      });
-    }
-
-    // Convert to numeric values
-    const limit = parseInt(rows, 10) || 10;
-    const weights = `${parseFloat(keyword_weight)},${parseFloat(semantic_weight)}`;
-    
-    console.log(`Performing hybrid search (POST): "${query}" with weights ${weights} and limit ${limit}`);
-    
-    // Execute the Python script
-    const scriptPath = '/app/scripts/qdrant/hybrid_search.py';
-    // Use system Python in development, but respect PATH in production (which should include the venv)
-    const pythonBin = process.env.NODE_ENV === 'production' ? 'python' : 'python3';
-    const pythonProcess = spawn(pythonBin, [
-      scriptPath,
-      '--query', query,
-      '--limit', limit.toString(),
-      '--weights', weights
-    ]);
-    
-    let resultData = '';
-    let errorData = '';
-
-    // Collect data from stdout
-    pythonProcess.stdout.on('data', (data) => {
-      resultData += data.toString();
-    });
+  const { query, rows, start, cursor, mode, keyword_weight, semantic_weight, fusion, candidate_pool, timings, ann_preset } = req.body;
+  await proxyHybridSearch({ query, rows, start, cursor, mode, keyword_weight, semantic_weight, fusion, candidate_pool, timings, ann_preset, filters: extractFilters(req.body) }, res);
+});
 
-    // Collect data from stderr
-    pythonProcess.stderr.on('data', (data) => {
-      errorData += data.toString();
-      console.error(`Hybrid search stderr: ${data}`);
+/**
+ * Pipes the NDJSON event stream of the hybrid search service to the client:
+ * a "keyword" event with Solr results first, then a "final" event with the fused ranking.
+ *
+ * @param {Object} params - Search parameters (see proxyHybridSearch, without start/cursor)
+ * @param {Object} res - Express response
+ */
+async function proxyHybridSearchStream({ query, rows = 10, mode, keyword_weight = 0.5, semantic_weight = 0.5, fusion, candidate_pool, timings, filters, ann_preset }, res) {
+  if (!query || query.trim() === '') {
+    return res.status(400).json({
+      error: true,
+      message: 'Query parameter is required',
+      numFound: 0,
+      docs: []
     });
+  }
 
-    // Handle process completion
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        console.error(`Hybrid search process exited with code ${code}`);
-        console.error(`Error: ${errorData}`);
-        return res.status(500).json({
-          error: true, 
-          message: `Search failed with exit code ${code}`,
-          stderr: errorData,
-          numFound: 0,
-          docs: []
-        });
-      }
-
-      try {
-        // Parse the JSON returned by the Python script
-        const results = JSON.parse(resultData);
-        
-        // Format the results in a way compatible with the frontend
-        const formattedResults = {
-          numFound: results.length,
-          docs: results,
-          start: parseInt(start, 10) || 0,
-        };
-
-        res.json(formattedResults);
-      } catch (parseError) {
-        console.error('Failed to parse hybrid search results:', parseError);
-        console.error('Raw data:', resultData);
-        res.status(500).json({
-          error: true, 
-          message: 'Failed to parse search results',
-          numFound: 0,
-          docs: []
-        });
-      }
-    });
+  try {
+    const response = await axios.post(`${HYBRID_SEARCH_URL}/search/stream`, {
+      query,
+      limit: parseInt(rows, 10) || 10,
+      mode,
+      keyword_weight: parseFloat(keyword_weight),
+      semantic_weight: parseFloat(semantic_weight),
+      fusion,
+      candidate_pool: candidate_pool ? parseInt(candidate_pool, 10) : undefined,
+      timings: isTruthy(timings),
+      filters,
+      ann_preset
+    }, { timeout: HYBRID_SEARCH_TIMEOUT_MS, responseType: 'stream' });
+
+    res.setHeader('Content-Type', 'application/x-ndjson; charset=utf-8');
+    res.setHeader('Cache-Control', 'no-cache');
+    // Reason: nginx would otherwise buffer the stream and hold back the keyword event
+    res.setHeader('X-Accel-Buffering', 'no');
+    response.data.pipe(res);
   } catch (error) {
-    console.error('Hybrid search error:', error);
-    res.status(500).json({
-      error: true, 
-      message: error.message || 'Internal server error',
+    const status = error.response ? error.response.status : 502;
+    console.error(`Hybrid search stream failed (${status}): ${error.message}`);
+    res.status(status).json({
+      error: true,
+      message: error.message || 'Hybrid search service unavailable',
       numFound: 0,
       docs: []
     });
   }
+}
+
+/**
+ * Route handler for progressive hybrid search (GET, NDJSON stream)
+ */
+router.get('/search/stream', cors(), async (req, res) => {
+  const { q, rows, mode, keyword_weight, semantic_weight, fusion, candidate_pool, timings, ann_preset } = req.query;
+  await proxyHybridSearchStream({ query: q, rows, mode, keyword_weight, semantic_weight, fusion, candidate_pool, timings, ann_preset, filters: extractFilters(req.query) }, res);
+});
+
+/**
+ * Route handler for progressive hybrid search (POST, NDJSON stream)
+ */
+router.post('/search/stream', cors(), async (req, res) => {
+  const { query, rows, mode, keyword_weight, semantic_weight, fusion, candidate_pool, timings, ann_preset } = req.body;
+  await proxyHybridSearchStream({ query, rows, mode, keyword_weight, semantic_weight, fusion, candidate_pool, timings, ann_preset, filters: extractFilters(req.body) }, res);
+});
+
+/**
+ * Route handler for a single full document
+ * Loads the full text on demand after a search with mode=snippets
+ */
+router.get('/documents/:id', cors(), async (req, res) => {
+  try {
+    const response = await axios.get(
+      `${HYBRID_SEARCH_URL}/documents/${encodeURIComponent(req.params.id)}`,
+      { timeout: HYBRID_SEARCH_TIMEOUT_MS }
+    );
+    res.json(response.data);
+  } catch (error) {
+    const status = error.response ? error.response.status : 502;
+    const message = (error.response && error.response.data && error.response.data.message)
+      || error.message
+      || 'Hybrid search service unavailable';
+    console.error(`Document request failed (${status}): ${message}`);
+    res.status(status).json({ error: true, message });
+  }
 });
 
 module.exports = router;
@@ -18,7 +18,8 @@ export default function DynamicApp() {
   const [activeFilters, setActiveFilters] = useState({});
   const [lastSearchQuery, setLastSearchQuery] = useState('');
   const [lastSearchMode, setLastSearchMode] = useState('all');
-  const [schemaInfo, setSchemaInfo] = useState(null);
+  const [lastSearchOptions, setLastSearchOptions] = useState({}); // Suchmaschine und Gewichte der letzten Suche
+const [schemaInfo, setSchemaInfo] = useState(null);
   const [totalResults, setTotalResults] = useState(0);
   const [currentFacets, setCurrentFacets] = useState({});
   const [uiMode, setUIMode] = useState('normal'); // UI mode state (normal | expert)
@@ -51,7 +52,8 @@ export default function DynamicApp() {
       setIsLoading(true);
       setLastSearchQuery(query);
       setLastSearchMode(searchMode);
-      
+      setLastSearchOptions(searchOptions);
+
       console.log('Dynamic search:', { 
         query, 
         searchMode, 
@@ -71,7 +73,8 @@ export default function DynamicApp() {
             rows: 20,
             start: 0,
             keyword_weight: searchOptions.weights?.keyword || 0.5,
-            semantic_weight: searchOptions.weights?.semantic || 0.5
+            semantic_weight: searchOptions.weights?.semantic || 0.5,
+            filters: activeFilters
           });
           
           // Convert hybrid search results to the expected format
@@ -123,6 +126,20 @@ export default function DynamicApp() {
     if (lastSearchQuery) {
       try {
         setIsLoading(true);
+        // Hybride Suche: Filter werden serverseitig in Solr und Qdrant angewendet
+        if (lastSearchOptions.searchEngine === 'hybrid' || lastSearchOptions.searchEngine === 'semantic') {
+          const hybridResponse = await searchDocumentsHybrid(lastSearchQuery, {
+            rows: 20,
+            start: 0,
+            keyword_weight: lastSearchOptions.weights?.keyword || 0.5,
+            semantic_weight: lastSearchOptions.weights?.semantic || 0.5,
+            filters: newFilters
+          });
+          setSearchResults(hybridResponse.results || []);
+          setCurrentFacets(hybridResponse.facets || {});
+          setTotalResults(hybridResponse.total || 0);
+          return;
+        }
         const searchResponse = await searchDocuments(lastSearchQuery, lastSearchMode, newFilters);
         setSearchResults(searchResponse.results);
         setCurrentFacets(searchResponse.facets);
@@ -82,11 +82,14 @@ export default function ResultItem({ result, searchQuery, uiMode, resultConfig,
               ? 'bg-amber-100 text-amber-800'
               : result.search_source === 'semantic' 
                 ? 'bg-purple-100 text-purple-800'
-                : 'bg-indigo-100 text-indigo-800' // hybrid
+                : result.search_source === 'citation'
+                  ? 'bg-green-100 text-green-800'
+                  : 'bg-indigo-100 text-indigo-800' // hybrid
           }`}>
             {result.search_source === 'keyword' && '🔍 Solr'}
             {result.search_source === 'semantic' && '🧠 Semantisch'}
             {result.search_source === 'hybrid' && '⚡ Hybrid'}
+            {result.search_source === 'citation' && '§ Zitat'}
           </span>
         )}
         
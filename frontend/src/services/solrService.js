@@ -90,7 +90,7 @@ export const searchDocuments = async (query, searchMode = 'all', filters = {}, o
 /**
  * Hybrid Search - spezieller Endpoint für semantische und kombinierte Suche
  * @param {string} query - Suchanfrage
- * @param {Object} options - Suchoptionen (rows, start, keyword_weight, semantic_weight)
+ * @param {Object} options - Suchoptionen (rows, start, cursor, mode, keyword_weight, semantic_weight, timings, filters)
  * @returns {Promise<Object>} Suchergebnisse im einheitlichen Format
  */
 export const searchDocumentsHybrid = async (query, options = {}) => {
@@ -106,13 +106,34 @@ export const searchDocumentsHybrid = async (query, options = {}) => {
       semantic_weight: options.semantic_weight || 0.5,
       _: Date.now() // Cache buster
     });
-    
+    // Cursor der vorherigen Seite: Folgeseiten kommen aus dem gecachten Kandidatenpool
+    if (options.cursor) {
+      searchParams.set('cursor', options.cursor);
+    }
+    // mode=snippets: nur Metadaten und Textausschnitte, Volltext über fetchDocumentById
+    if (options.mode) {
+      searchParams.set('mode', options.mode);
+    }
+    // timings=true: Zeitmessung der einzelnen Suchschritte (Embedding, Qdrant, Solr, Fusion)
+    if (options.timings) {
+      searchParams.set('timings', 'true');
+    }
+    // Filter werden in Solr (fq) und Qdrant (Payload-Filter) angewendet, nicht erst im Client
+    Object.entries(options.filters || {}).forEach(([fieldName, filterValues]) => {
+      (filterValues || []).forEach(value => {
+        searchParams.append(`filter_${fieldName}`, value);
+      });
+    });
+
     // Nutze die hybride Backend-API
     const response = await apiClient.get(`hybrid/search?${searchParams.toString()}`);
     
     console.log(`📊 Hybrid API Response status: ${response.status}`);
     console.log(`📊 Hybrid API Response full data:`, response.data);
     console.log(`📊 Hybrid API Response numFound: ${response.data.numFound}`);
+    if (response.data.timings) {
+      console.log(`⏱️ Hybrid search timings (${response.data.timings.total_ms} ms):`, response.data.timings.stages);
+    }
     
     // Die hybride API gibt bereits die korrekte Struktur zurück: {numFound, docs, start}
     // Konvertiere zu einheitlichem Format für Frontend-Kompatibilität
@@ -125,7 +146,9 @@ export const searchDocumentsHybrid = async (query, options = {}) => {
       results: response.data.docs || [], // Hybride API nutzt "docs" direkt
       facets: {}, // Hybride Suche hat keine Facetten
       total: response.data.numFound || 0, // Hybride API nutzt "numFound"
-      start: response.data.start || 0 // Paginierungsstart
+      start: response.data.start || 0, // Paginierungsstart
+      cursor: response.data.cursor, // Für Folgeseiten derselben Suche
+      timings: response.data.timings // Nur bei options.timings
     };
     
     console.log('📊 DEBUG - Final return object:', returnObject);
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Adaptive Candidate Pool
+
+The fixed candidate pool (`candidate_pool_size`: 30 per side for sigmoid fusion and
+10 results) pulls full Solr documents and Qdrant points that most queries never need.
+An adaptive search starts with a small pool. It fetches the full pool only when the
+fused top-k of the small pool is unstable, which is detected in one of two ways:
+
+- score gap: a document outside the top-k, seen by one side only, could pass the k-th
+  fused score once its missing side is known. The same holds for a document that
+  neither side returned. A missing side contributes its cutoff score, the score of the
+  last candidate of that side, discounted by the agreement of the pools: the share of
+  the smaller pool that the other side returned as well. Engines that rarely return
+  the same documents rarely fill in a missing side. A side that returned fewer
+  candidates than requested is exhausted and contributes nothing.
+- low overlap: the pools agree, but too few top-k documents were found by both
+  engines. The fusion then rests on one-sided scores, and the order within the top-k
+  can still change when the missing sides turn up.
+
+Min-max fusion scales the scores by the pool itself, so it always uses the full pool.
+
+Usage:
+    initial = initial_pool_size(limit, pool_size, fusion)
+    ranked = fuse(...)                          # on the initial candidates
+    assessment = assess_stability(ranked, len(keyword_results), len(semantic_results),
+                                  initial, limit, keyword_weight, semantic_weight)
+    if not assessment["stable"]:
+        ...                                     # fetch pool_size candidates and fuse again
+    pool_stats.record(initial, final_pool, pool_size, assessment)
+"""
+
+import math
+import os
+import threading
+from typing import Dict, List
+
+# Min-max scores are scaled by the pool itself, so a small pool shifts them instead of cutting the tail
+ADAPTIVE_FUSIONS = ("sigmoid", "rrf")
+INITIAL_POOL_FACTOR = float(os.environ.get("HYBRID_INITIAL_POOL_FACTOR", "1.5"))  # Initial pool = limit * factor
+INITIAL_POOL_MINIMUM = 10  # Smallest initial pool per side
+MIN_TOP_OVERLAP = float(os.environ.get("HYBRID_MIN_TOP_OVERLAP", "0.2"))  # Share of top-k found by both sides
+
+STABILITY_REASONS = ("score_gap", "low_overlap")
+
+
+def initial_pool_size(limit: int, pool_size: int, fusion: str) -> int:
+    """Return the number of candidates per side fetched first by an adaptive search.
+
+    Args:
+        limit: Number of results requested
+        pool_size: Full candidate pool per side, fetched on expansion
+        fusion: Fusion strategy; strategies outside ADAPTIVE_FUSIONS start with the full pool
+
+    Returns:
+        Initial pool size, at least limit and at most pool_size
+    """
+    if fusion not in ADAPTIVE_FUSIONS:
+        return pool_size
+    initial = max(math.ceil(limit * INITIAL_POOL_FACTOR), INITIAL_POOL_MINIMUM, limit)
+    return min(initial, pool_size)
+
+
+def _side_cutoff(ranked: List[tuple], score_field: str, sources: tuple, returned: int, requested: int) -> float:
+    """Highest score a candidate beyond one side's pool could have on that side."""
+    if returned < requested:
+        return 0.0
+    scores = [info[score_field] for _, info in ranked if info["search_source"] in sources]
+    return min(scores) if scores else 0.0
+
+
+def assess_stability(ranked: List[tuple], keyword_count: int, semantic_count: int, pool_size: int,
+                     limit: int, keyword_weight: float, semantic_weight: float) -> Dict:
+    """Decide whether a larger candidate pool could change the fused top-k.
+
+    Args:
+        ranked: Fused (document ID, score information) pairs in rank order
+        keyword_count: Number of keyword candidates returned
+        semantic_count: Number of semantic candidates returned
+        pool_size: Candidates requested per side
+        limit: Number of results (k)
+        keyword_weight: Normalized keyword weight of the fusion
+        semantic_weight: Normalized semantic weight of the fusion
+
+    Returns:
+        Dict with stable, reason (None, "score_gap" or "low_overlap"), overlap (share of
+        the top-k found by both sides) and gap (k-th fused score minus the score a
+        document outside the top-k can be expected to reach)
+    """
+    top = ranked[:limit]
+    if not keyword_count or not semantic_count or not top:
+        # Reason: with one list the fused order is that list's order, which a larger pool only extends
+        return {"stable": True, "reason": None, "overlap": None, "gap": None}
+
+    overlap = sum(1 for _, info in top if info["search_source"] == "hybrid") / len(top)
+    if len(ranked) <= limit:
+        # Every candidate is in the result, so both sides are exhausted
+        return {"stable": True, "reason": None, "overlap": round(overlap, 3), "gap": None}
+
+    # Share of the smaller pool the other side returned as well: how often a missing side turns up
+    shared = sum(1 for _, info in ranked if info["search_source"] == "hybrid")
+    agreement = shared / min(keyword_count, semantic_count)
+    keyword_cutoff = agreement * keyword_weight * _side_cutoff(ranked, "keyword_score", ("keyword", "hybrid"),
+                                                               keyword_count, pool_size)
+    semantic_cutoff = agreement * semantic_weight * _side_cutoff(ranked, "semantic_score", ("semantic", "hybrid"),
+                                                                 semantic_count, pool_size)
+
+    # Score a document outside the top-k can expect to reach: unseen ones both discounted
+    # cutoffs, one-sided ones their known score plus the discounted cutoff of the missing side
+    best_outside = keyword_cutoff + semantic_cutoff
+    for _, info in ranked[limit:]:
+        if info["search_source"] == "keyword":
+            best_outside = max(best_outside, info["combined_score"] + semantic_cutoff)
+        elif info["search_source"] == "semantic":
+            best_outside = max(best_outside, info["combined_score"] + keyword_cutoff)
+    gap = top[-1][1]["combined_score"] - best_outside
+
+    if gap < 0:
+        reason = "score_gap"
+    elif overlap < MIN_TOP_OVERLAP <= agreement:
+        # Reason: the engines agree on the pool but not on the top-k, so its order rests on one-sided scores
+        reason = "low_overlap"
+    else:
+        reason = None
+    return {"stable": reason is None, "reason": reason, "overlap": round(overlap, 3), "gap": round(gap, 6)}
+
+
+class AdaptivePoolStats:
+    """Thread-safe counters of adaptive candidate pools and their expansions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.expanded = 0
+        self.unstable_kept = 0  # Unstable, but the retrieval budget left no time to expand
+        self.reasons = {reason: 0 for reason in STABILITY_REASONS}
+        self.candidates = 0  # Keyword candidates (full Solr documents) fetched
+        self.full_pool_candidates = 0
+
+    def record(self, initial_pool: int, final_pool: int, full_pool: int, assessment: Dict) -> None:
+        """Count one adaptive search.
+
+        Args:
+            initial_pool: Candidates per side fetched first
+            final_pool: Candidates per side the result was fused from
+            full_pool: Candidates per side a non-adaptive search would have fetched
+            assessment: Result of assess_stability for the initial pool
+        """
+        with self._lock:
+            self.searches += 1
+            self.candidates += final_pool  # Expansions continue the Solr search instead of repeating it
+            self.full_pool_candidates += full_pool
+            if final_pool != initial_pool:
+                self.expanded += 1
+                self.reasons[assessment["reason"]] += 1
+            elif not assessment["stable"]:
+                self.unstable_kept += 1
+
+    def stats(self) -> Dict:
+        """Return expansion statistics.
+
+        Returns:
+            Dict with searches, expansions (count, rate, reasons) and the keyword candidates
+            fetched per search, also relative to the full pool
+        """
+        with self._lock:
+            return {
+                "searches": self.searches,
+                "expanded": self.expanded,
+                "expansion_rate": self.expanded / self.searches if self.searches else 0.0,
+                "unstable_kept": self.unstable_kept,
+                "reasons": dict(self.reasons),
+                "mean_candidates": self.candidates / self.searches if self.searches else 0.0,
+                "candidate_ratio": self.candidates / self.full_pool_candidates if self.full_pool_candidates else 0.0,
+            }
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA ANN Search Parameters
+
+Query-time accuracy knobs of the Qdrant search. Interactive searches trade a little
+recall for latency; offline evaluations want the exact nearest neighbours. Named
+presets cover both, single parameters can be overridden per request.
+
+Presets:
+    fast     Small HNSW candidate list (hnsw_ef=32), no rescoring of quantized vectors
+    default  Qdrant defaults (hnsw_ef = ef_construct); filtered searches over small
+             subsets run exact
+    exact    Brute-force search over all (filtered) points, e.g. as ground truth
+
+Parameters:
+    hnsw_ef          Size of the HNSW candidate list; larger is slower and more accurate
+    exact            Skip the HNSW index and compare against every point
+    exact_below      Filtered searches whose subset has at most this many points run exact
+    oversampling     Quantized candidates fetched per result before rescoring (>= 1)
+    rescore          Rescore quantized candidates with the original vectors
+    score_threshold  Minimum cosine similarity of semantic candidates
+"""
+
+from typing import Dict, NamedTuple, Optional
+
+from qdrant_client.http import models as qdrant_models
+
+DEFAULT_SCORE_THRESHOLD = 0.5  # Minimum cosine similarity of semantic candidates
+EXACT_FILTER_POINTS = 2000  # Filtered subsets up to this size are searched exactly by default
+
+
+class AnnParams(NamedTuple):
+    """Query-time parameters of one Qdrant search (hashable, so usable in cache keys)."""
+    hnsw_ef: Optional[int] = None
+    exact: bool = False
+    exact_below: int = 0
+    oversampling: Optional[float] = None
+    rescore: Optional[bool] = None
+    score_threshold: Optional[float] = DEFAULT_SCORE_THRESHOLD
+
+    def search_params(self, exact: Optional[bool] = None) -> qdrant_models.SearchParams:
+        """Build the Qdrant search params.
+
+        Args:
+            exact: Override of the exact flag (e.g. for a small filtered subset)
+
+        Returns:
+            Search params for query_points / QueryRequest
+        """
+        quantization = None
+        if self.oversampling is not None or self.rescore is not None:
+            quantization = qdrant_models.QuantizationSearchParams(
+                rescore=self.rescore, oversampling=self.oversampling)
+        return qdrant_models.SearchParams(
+            hnsw_ef=self.hnsw_ef,
+            exact=self.exact if exact is None else exact,
+            quantization=quantization,
+        )
+
+
+ANN_PRESETS: Dict[str, AnnParams] = {
+    "fast": AnnParams(hnsw_ef=32, rescore=False),
+    "default": AnnParams(exact_below=EXACT_FILTER_POINTS),
+    "exact": AnnParams(exact=True),
+}
+DEFAULT_ANN_PRESET = "default"
+
+
+def resolve_ann_params(preset: Optional[str] = None, **overrides) -> AnnParams:
+    """Start from a preset and apply per-request overrides.
+
+    Args:
+        preset: Preset name (default: DEFAULT_ANN_PRESET)
+        **overrides: AnnParams fields; None values keep the preset's value
+
+    Returns:
+        The resolved parameters
+
+    Raises:
+        ValueError: If the preset or a field is unknown or a value is out of range
+    """
+    preset = preset or DEFAULT_ANN_PRESET
+    if preset not in ANN_PRESETS:
+        raise ValueError(f"Unknown ANN preset '{preset}', expected one of {', '.join(ANN_PRESETS)}")
+    unknown = set(overrides) - set(AnnParams._fields)
+    if unknown:
+        raise ValueError(f"Unknown ANN parameter(s): {', '.join(sorted(unknown))}")
+
+    params = ANN_PRESETS[preset]._replace(**{key: value for key, value in overrides.items() if value is not None})
+    if params.hnsw_ef is not None and params.hnsw_ef <= 0:
+        raise ValueError("hnsw_ef must be positive")
+    if params.exact_below < 0:
+        raise ValueError("exact_below must not be negative")
+    if params.oversampling is not None and params.oversampling < 1:
+        raise ValueError("oversampling must be at least 1")
+    if params.score_threshold is not None and not -1 <= params.score_threshold <= 1:
+        raise ValueError("score_threshold must be between -1 and 1")
+    return params
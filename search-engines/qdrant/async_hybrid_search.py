@@ -0,0 +1,1014 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Async Hybrid Search
+
+asyncio-native counterpart of HybridSearcher. Solr and Ollama are called through one
+pooled httpx.AsyncClient, Qdrant through AsyncQdrantClient. A search waiting on I/O
+only holds a coroutine instead of a thread, so one worker process serves hundreds of
+concurrent searches.
+
+The searcher shares configuration (endpoints, fields, budgets), caches, fusion and
+the citation index with HybridSearcher and returns the same result format:
+
+    async with AsyncHybridSearcher() as searcher:
+        results = await searcher.combined_search("Kündigungsfrist Mietvertrag")
+        page = await searcher.search("Kündigungsfrist Mietvertrag", limit=10, start=10, cursor=cursor)
+
+Usage:
+    python3 async_hybrid_search.py --query "search query" [--limit N]
+    python3 async_hybrid_search.py --queries-file queries.jsonl [--output results.jsonl] [--concurrency 200]
+
+Options:
+    --query         The search query text
+    --queries-file  Search all queries of a text/JSONL file concurrently and write JSONL results
+    --concurrency   Searches in flight at the same time for --queries-file (default: 100)
+    --docker        Use Docker network endpoints instead of localhost
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import secrets
+import sys
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import httpx
+import requests
+from qdrant_client import AsyncQdrantClient
+
+import hybrid_search
+from adaptive_pool import AdaptivePoolStats, assess_stability, initial_pool_size
+from ann_params import ANN_PRESETS, AnnParams, resolve_ann_params
+from embedding_gateway import PRIORITY_HEADER
+from fusion import FUSION_STRATEGIES, fuse
+from hybrid_search import (
+    COLLECTION_NAME,
+    CURSOR_CACHE_SIZE,
+    CURSOR_TTL_SECONDS,
+    DEFAULT_LIMIT,
+    DEFAULT_WEIGHTS,
+    EMBEDDING_MODEL,
+    EMBEDDING_TIMEOUT_SECONDS,
+    FILTER_COUNT_CACHE_SIZE,
+    FILTER_COUNT_TTL_SECONDS,
+    HTTP_POOL_SIZE,
+    HYBRID_ANN_PRESET,
+    HYDRATION_MIN_TIMEOUT,
+    INDEX_VERSION_CHECK_SECONDS,
+    MODEL_DIGEST_REFRESH_SECONDS,
+    OLLAMA_FAILURE_THRESHOLD,
+    OLLAMA_RESET_SECONDS,
+    OLLAMA_SLOW_CALL_SECONDS,
+    PAGE_POOL_SIZE,
+    RESULT_MODES,
+    RETRIEVAL_BUDGET_SHARE,
+    SEARCH_BUDGET_SECONDS,
+    SNIPPET_COUNT,
+    SNIPPET_FIELD,
+    SNIPPET_FRAGSIZE,
+    SOLR_DOCUMENT_FIELDS,
+    SOLR_METADATA_FIELDS,
+    SOLR_QUERY_FIELDS,
+    SOLR_RANKING_FIELDS,
+    SOLR_TIMEOUT_SECONDS,
+    VECTOR_BACKENDS,
+    HybridSearcher,
+)
+from latency_budget import CircuitBreaker, Deadline
+from model_residency import KEEP_ALIVE_PROFILES, ModelResidencyManager
+from ollama_pool import OllamaEndpoint, OllamaEndpointPool, parse_endpoints
+from query_sets import load_queries, query_limit
+from search_cache import EmbeddingCache, ResultCache, TTLCache
+from search_filters import Filters, filter_key, normalize_filters, qdrant_filter, solr_filter_queries
+from solr_vectors import cosine_from_solr, knn_query
+from tracing import ensure_trace, span
+from vector_reduction import FULL_VECTOR_NAME, VectorProjection
+
+logger = logging.getLogger(__name__)
+
+ASYNC_MAX_CONNECTIONS = 256  # Open connections of the shared HTTP client (Solr and Ollama together)
+DEFAULT_CONCURRENCY = 100  # Searches in flight at the same time in --queries-file mode
+
+
+class AsyncHybridSearcher:
+    """Hybrid search over Solr and Qdrant (or the Solr vector field) with asyncio I/O."""
+
+    # Reason: query analysis, option defaults and score merging do no I/O, so they are
+    # shared with the synchronous searcher instead of being duplicated
+    load_citation_index = staticmethod(HybridSearcher.load_citation_index)
+    normalize_weights = staticmethod(HybridSearcher.normalize_weights)
+    merge_scores = staticmethod(HybridSearcher.merge_scores)
+    semantic_documents = staticmethod(HybridSearcher.semantic_documents)
+    _envelope = staticmethod(HybridSearcher._envelope)
+    citation_ranking = HybridSearcher.citation_ranking
+    is_stopword_query = HybridSearcher.is_stopword_query
+    should_use_semantic_search = HybridSearcher.should_use_semantic_search
+    resolve_search_options = HybridSearcher.resolve_search_options
+    cursor_fingerprint = staticmethod(HybridSearcher.cursor_fingerprint)
+    paging_pool = staticmethod(HybridSearcher.paging_pool)
+
+    def __init__(self, weights: Tuple[float, float] = DEFAULT_WEIGHTS, ann: Optional[AnnParams] = None,
+                 vector_backend: Optional[str] = None):
+        """Initialize the async hybrid search service.
+
+        The clients connect lazily; create the searcher inside the event loop that uses it
+        and close it with aclose() (or use it as an async context manager).
+
+        Args:
+            weights: Tuple of weights (keyword_weight, semantic_weight) for combining results
+            ann: Default ANN parameters of semantic searches (default: HYBRID_ANN_PRESET)
+            vector_backend: "qdrant" or "solr" (default: VECTOR_BACKEND)
+
+        Raises:
+            ValueError: If the vector backend is unknown
+        """
+        self.vector_backend = vector_backend or hybrid_search.VECTOR_BACKEND
+        if self.vector_backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend '{self.vector_backend}', "
+                             f"expected one of {', '.join(VECTOR_BACKENDS)}")
+        self.qdrant_client = (AsyncQdrantClient(url=hybrid_search.QDRANT_ENDPOINT)
+                              if self.vector_backend == "qdrant" else None)
+        # One keep-alive pool for Solr and Ollama; requests wait for a free connection instead of opening more
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS, max_keepalive_connections=HTTP_POOL_SIZE),
+            timeout=SOLR_TIMEOUT_SECONDS,
+            headers={PRIORITY_HEADER: "interactive"}
+        )
+        self.endpoint_pool = OllamaEndpointPool(parse_endpoints(hybrid_search.OLLAMA_ENDPOINTS), EMBEDDING_MODEL)
+        self.residency = ModelResidencyManager(self.endpoint_pool.urls, EMBEDDING_MODEL, KEEP_ALIVE_PROFILES["search"],
+                                               headers={PRIORITY_HEADER: "interactive"})
+        self.embedding_cache = EmbeddingCache(EMBEDDING_MODEL, max_entries=hybrid_search.EMBEDDING_CACHE_SIZE,
+                                              ttl_seconds=hybrid_search.EMBEDDING_CACHE_TTL,
+                                              sqlite_path=hybrid_search.EMBEDDING_CACHE_DB)
+        self._model_digest_checked_at = 0.0
+        self.result_cache = ResultCache(max_entries=hybrid_search.RESULT_CACHE_SIZE,
+                                        ttl_seconds=hybrid_search.RESULT_CACHE_TTL,
+                                        max_bytes=hybrid_search.RESULT_CACHE_MAX_MB * 1024 * 1024)
+        self._index_version_checked_at = 0.0
+        self._index_version_known = False
+        self.cursor_cache = TTLCache(max_entries=CURSOR_CACHE_SIZE, ttl_seconds=CURSOR_TTL_SECONDS)
+        self.ann = ann or resolve_ann_params(HYBRID_ANN_PRESET)
+        self.filter_counts = TTLCache(max_entries=FILTER_COUNT_CACHE_SIZE, ttl_seconds=FILTER_COUNT_TTL_SECONDS)
+        self.ollama_breaker = CircuitBreaker("ollama", failure_threshold=OLLAMA_FAILURE_THRESHOLD,
+                                             reset_seconds=OLLAMA_RESET_SECONDS,
+                                             slow_call_seconds=OLLAMA_SLOW_CALL_SECONDS)
+        self.projection = (VectorProjection.load(hybrid_search.VECTOR_PROJECTION_FILE)
+                           if hybrid_search.VECTOR_PROJECTION_FILE else None)
+        self.adaptive_pool = hybrid_search.ADAPTIVE_CANDIDATE_POOL
+        self.pool_stats = AdaptivePoolStats()
+        self.citation_index = self.load_citation_index(hybrid_search.CITATION_INDEX_FILE)
+        self._vector_name_resolved = False
+        self._vector_name = None
+        self.keyword_weight, self.semantic_weight = self.normalize_weights(weights)
+
+        logger.info(f"Initialized async hybrid search with weights: keyword={self.keyword_weight:.2f}, "
+                    f"semantic={self.semantic_weight:.2f}, vector backend: {self.vector_backend}")
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections and the Qdrant client."""
+        await self.http.aclose()
+        if self.qdrant_client is not None:
+            await self.qdrant_client.close()
+
+    async def __aenter__(self) -> "AsyncHybridSearcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def stats(self) -> Dict:
+        """Return cache and Ollama pool statistics of this searcher.
+
+        Returns:
+            Dict with one entry per component
+        """
+        return {
+            "embedding_cache": self.embedding_cache.stats(),
+            "result_cache": self.result_cache.stats(),
+            "ollama_breaker": self.ollama_breaker.stats(),
+            "ollama_endpoints": self.endpoint_pool.stats(),
+            "citation_index": self.citation_index.stats() if self.citation_index else None,
+            "model_residency": self.residency.stats(),
+            "candidate_pool": dict(self.pool_stats.stats(), adaptive=self.adaptive_pool),
+            "ann": self.ann._asdict(),
+            "vector_backend": self.vector_backend,
+        }
+
+    async def _acquire_ollama(self) -> OllamaEndpoint:
+        """Reserve the least-loaded healthy Ollama host (any host if none is healthy).
+
+        Raises:
+            requests.exceptions.ConnectionError: If no host is free
+        """
+        # Reason: the searcher's pool has no in-flight limit, so acquire() only blocks to
+        # health-check ejected hosts; that rare path runs in a worker thread
+        if any(endpoint.ejected_until > 0 for endpoint in self.endpoint_pool.endpoints):
+            return await asyncio.to_thread(self.endpoint_pool.acquire, 0)
+        return self.endpoint_pool.acquire(timeout=0)
+
+    async def refresh_model_digest(self) -> None:
+        """Re-read the embedding model digest so a replaced model invalidates cached embeddings."""
+        now = time.time()
+        if now - self._model_digest_checked_at < MODEL_DIGEST_REFRESH_SECONDS:
+            return
+        if self.ollama_breaker.state != CircuitBreaker.CLOSED:
+            return  # Ollama is failing; keep the known digest
+        self._model_digest_checked_at = now
+
+        try:
+            endpoint = await self._acquire_ollama()
+            try:
+                response = await self.http.get(f"{endpoint.url}/api/tags", timeout=EMBEDDING_TIMEOUT_SECONDS)
+            finally:
+                self.endpoint_pool.release(endpoint)
+            response.raise_for_status()
+        except (httpx.HTTPError, requests.exceptions.RequestException) as e:
+            logger.warning(f"Could not refresh embedding model digest: {e}")
+            return
+        digest = next((tag.get("digest") for tag in response.json().get("models", [])
+                       if tag.get("name") == EMBEDDING_MODEL), None)
+        self.embedding_cache.set_model_digest(digest)
+
+    async def generate_embedding(self, text: str, timeout: float = EMBEDDING_TIMEOUT_SECONDS) -> Optional[List[float]]:
+        """Generate an embedding for the search query (cached, behind the Ollama circuit breaker).
+
+        Args:
+            text: The search query text
+            timeout: Timeout of the Ollama request in seconds
+
+        Returns:
+            List of embedding values or None if generation failed
+        """
+        if not text or text.strip() == "":
+            logger.warning("Empty text provided for embedding generation.")
+            return None
+
+        with span("embed") as current:
+            await self.refresh_model_digest()
+            embedding = self.embedding_cache.get(text)
+            current.set_attribute("cache_hit", embedding is not None)
+            if embedding is not None:
+                return embedding
+
+            if not self.ollama_breaker.allow():
+                logger.warning("Ollama circuit breaker is open, skipping query embedding")
+                current.set_attribute("breaker_open", True)
+                return None
+
+            try:
+                request_start = time.time()
+                endpoint = await self._acquire_ollama()
+                failed = False
+                try:
+                    response = await self.http.post(
+                        f"{endpoint.url}/api/embeddings",
+                        json={"model": EMBEDDING_MODEL, "prompt": text, "keep_alive": self.residency.keep_alive},
+                        timeout=timeout
+                    )
+                except (httpx.ConnectError, httpx.ConnectTimeout):
+                    failed = True  # Connection errors count towards ejecting the host, read timeouts do not
+                    raise
+                finally:
+                    self.endpoint_pool.release(endpoint, failed=failed)
+                response.raise_for_status()
+                current.set_attributes(endpoint=endpoint.url, bytes=len(response.content))
+                embedding = response.json().get("embedding", [])
+                self.ollama_breaker.record_success(time.time() - request_start)
+
+                if not embedding:
+                    logger.warning(f"Empty embedding returned for query: {text}")
+                    return None
+
+                self.embedding_cache.put(text, embedding)
+                return embedding
+            except (httpx.HTTPError, requests.exceptions.RequestException, ValueError, AttributeError) as e:
+                # Reason: every failed call must reach the breaker, or a half-open trial never ends
+                self.ollama_breaker.record_failure()
+                current.set_attribute("error", str(e) or type(e).__name__)
+                logger.error(f"Error generating embedding: {e!r}")
+                return None
+
+    async def index_version(self) -> Tuple[str, str, int]:
+        """Read the current versions of the Solr index and the Qdrant collection.
+
+        Returns:
+            Tuple of (Solr index version, Qdrant collection behind the alias, Qdrant point count)
+        """
+        response = await self.http.get(f"{hybrid_search.SOLR_ENDPOINT}/admin/luke",
+                                       params={"numTerms": 0, "show": "index", "wt": "json"}, timeout=5)
+        response.raise_for_status()
+        solr_version = str(response.json().get("index", {}).get("version", ""))
+        if self.vector_backend == "solr":
+            return solr_version, "solr", 0
+
+        aliases = (await self.qdrant_client.get_aliases()).aliases
+        collection = next((alias.collection_name for alias in aliases if alias.alias_name == COLLECTION_NAME),
+                          COLLECTION_NAME)
+        points_count = (await self.qdrant_client.get_collection(collection)).points_count or 0
+        return solr_version, collection, points_count
+
+    async def refresh_index_version(self) -> bool:
+        """Update the result cache with the current index version (throttled).
+
+        Returns:
+            True if the index version is known and cached results may be used
+        """
+        now = time.time()
+        if now - self._index_version_checked_at < INDEX_VERSION_CHECK_SECONDS:
+            return self._index_version_known
+        self._index_version_checked_at = now
+
+        try:
+            self.result_cache.set_index_version(await self.index_version())
+            self._index_version_known = True
+        except Exception as e:
+            logger.warning(f"Could not read index versions, bypassing result cache: {e}")
+            self._index_version_known = False
+        return self._index_version_known
+
+    async def solr_search(self, query: str, limit: int = DEFAULT_LIMIT, fields: Optional[str] = None,
+                          timeout: float = SOLR_TIMEOUT_SECONDS, filters: Optional[Filters] = None,
+                          start: int = 0) -> List[Dict]:
+        """Perform keyword search using Solr (same parameters as HybridSearcher.solr_search).
+
+        Args:
+            query: Search query text
+            limit: Maximum number of results to return
+            fields: Stored fields to return (default: full document fields)
+            timeout: Request timeout in seconds (also passed to Solr as timeAllowed)
+            filters: Normalized field filters, sent as one fq clause per field
+            start: Rank of the first result
+
+        Returns:
+            List of document dicts with search scores (empty if Solr failed)
+        """
+        params = {
+            "q": query,
+            "start": start,
+            "rows": limit,
+            "fl": f"{fields or SOLR_DOCUMENT_FIELDS},score",
+            "defType": "edismax",
+            "qf": SOLR_QUERY_FIELDS,
+            "mm": "2<70%",
+            "pf": "enbez^4.0 text_content^2.0",
+            "ps": "2",
+            "hl": "false",
+            "facet": "false",
+            "spellcheck": "false",
+            "timeAllowed": int(timeout * 1000),
+            "wt": "json"
+        }
+        if filters:
+            params["fq"] = solr_filter_queries(filters)
+
+        try:
+            start_time = time.time()
+            with span("solr_search", rows=limit, filtered=bool(filters)) as current:
+                response = await self.http.get(f"{hybrid_search.SOLR_ENDPOINT}/select", params=params,
+                                               timeout=timeout)
+                response.raise_for_status()
+                result = response.json()
+                docs = result.get("response", {}).get("docs", [])
+                current.set_attributes(result_count=len(docs), bytes=len(response.content),
+                                       partial=bool(result.get("responseHeader", {}).get("partialResults")))
+            for doc in docs:
+                doc["search_source"] = "keyword"
+            logger.info(f"Solr search returned {len(docs)} results in {time.time() - start_time:.2f} seconds")
+            return docs
+        except httpx.HTTPError as e:
+            logger.error(f"Error in Solr search: {e!r}")
+            return []
+
+    async def get_solr_documents_by_ids(self, doc_ids: List[str],
+                                        timeout: float = SOLR_TIMEOUT_SECONDS) -> Dict[str, Dict]:
+        """Retrieve full document data from Solr's realtime /get handler.
+
+        Args:
+            doc_ids: List of document IDs to retrieve
+            timeout: Request timeout in seconds
+
+        Returns:
+            Dictionary mapping document ID to full document data
+        """
+        if not doc_ids:
+            return {}
+        try:
+            with span("solr_hydration", ids=len(doc_ids), mode="full") as current:
+                response = await self.http.get(
+                    f"{hybrid_search.SOLR_ENDPOINT}/get",
+                    params={"ids": ",".join(doc_ids), "fl": SOLR_DOCUMENT_FIELDS, "wt": "json"},
+                    timeout=timeout
+                )
+                response.raise_for_status()
+                docs = response.json().get("response", {}).get("docs", [])
+                current.set_attributes(result_count=len(docs), bytes=len(response.content))
+            return {doc["id"]: doc for doc in docs}
+        except httpx.HTTPError as e:
+            logger.error(f"Error retrieving documents from Solr: {e!r}")
+            return {}
+
+    async def get_solr_snippets_by_ids(self, doc_ids: List[str], query: str,
+                                       timeout: float = SOLR_TIMEOUT_SECONDS) -> Dict[str, Dict]:
+        """Retrieve document metadata plus snippets highlighted for the user query.
+
+        Args:
+            doc_ids: List of document IDs to retrieve
+            query: User query the snippets are highlighted for
+            timeout: Request timeout in seconds
+
+        Returns:
+            Dictionary mapping document ID to metadata with a "snippets" list
+        """
+        if not doc_ids:
+            return {}
+        params = {
+            "q": "{!terms f=id}" + ",".join(doc_ids),
+            "rows": len(doc_ids),
+            "fl": SOLR_METADATA_FIELDS,
+            "hl": "true",
+            "hl.method": "unified",
+            "hl.fl": SNIPPET_FIELD,
+            "hl.q": query,
+            "hl.qparser": "edismax",
+            "qf": SOLR_QUERY_FIELDS,
+            "hl.snippets": SNIPPET_COUNT,
+            "hl.fragsize": SNIPPET_FRAGSIZE,
+            "hl.defaultSummary": "true",
+            "hl.tag.pre": "<mark>",
+            "hl.tag.post": "</mark>",
+            "facet": "false",
+            "spellcheck": "false",
+            "wt": "json"
+        }
+        try:
+            with span("solr_hydration", ids=len(doc_ids), mode="snippets") as current:
+                response = await self.http.get(f"{hybrid_search.SOLR_ENDPOINT}/select", params=params,
+                                               timeout=timeout)
+                response.raise_for_status()
+                result = response.json()
+                current.set_attributes(result_count=result.get("response", {}).get("numFound", 0),
+                                       bytes=len(response.content))
+        except httpx.HTTPError as e:
+            logger.error(f"Error retrieving snippets from Solr: {e!r}")
+            return {}
+
+        highlighting = result.get("highlighting", {})
+        doc_dict = {}
+        for doc in result.get("response", {}).get("docs", []):
+            doc["snippets"] = highlighting.get(doc["id"], {}).get(SNIPPET_FIELD, [])
+            doc_dict[doc["id"]] = doc
+        return doc_dict
+
+    async def get_document(self, doc_id: str) -> Optional[Dict]:
+        """Retrieve one document with its full text, e.g. after a snippets search."""
+        return (await self.get_solr_documents_by_ids([doc_id])).get(doc_id)
+
+    async def query_vector_name(self) -> Optional[str]:
+        """Determine which Qdrant vector the query embedding is searched against."""
+        if self.projection is not None:
+            return self.projection.vector_name
+        if not self._vector_name_resolved:
+            collection = await self.qdrant_client.get_collection(COLLECTION_NAME)
+            self._vector_name = FULL_VECTOR_NAME if isinstance(collection.config.params.vectors, dict) else None
+            self._vector_name_resolved = True
+        return self._vector_name
+
+    async def is_small_subset(self, filters: Optional[Filters], exact_below: int) -> bool:
+        """Check whether a filtered search covers at most exact_below points (see HybridSearcher)."""
+        if not filters or exact_below <= 0:
+            return False
+        key = filter_key(filters)
+        count = self.filter_counts.get(key)
+        if count is None:
+            try:
+                count = (await self.qdrant_client.count(COLLECTION_NAME, count_filter=qdrant_filter(filters),
+                                                        exact=False)).count
+            except Exception as e:
+                logger.warning(f"Could not count points for filter {key}: {e}")
+                return False
+            self.filter_counts.put(key, count)
+        return count <= exact_below
+
+    async def semantic_search(self, query: str, limit: int = DEFAULT_LIMIT, deadline: Optional[Deadline] = None,
+                              filters: Optional[Filters] = None, ann: Optional[AnnParams] = None,
+                              fields: Optional[str] = None,
+                              query_vector: Optional[Dict] = None) -> Optional[List[Dict]]:
+        """Perform semantic search using Qdrant (or the Solr vector field).
+
+        Args:
+            query: Search query text
+            limit: Maximum number of results to return
+            deadline: Deadline of the semantic path; embedding and Qdrant timeouts derive from it
+            filters: Normalized field filters
+            ann: ANN parameters (default: the searcher's)
+            fields: Stored fields of Solr kNN hits (Solr backend only, default: full document fields)
+            query_vector: Query embedding of an earlier round of the same search under "embedding";
+                without one the generated embedding is stored there for later rounds
+
+        Returns:
+            List of document dicts with search scores, or None if the semantic path failed
+        """
+        with span("semantic_search", limit=limit) as semantic_span:
+            try:
+                start_time = time.time()
+                embedding = query_vector.get("embedding") if query_vector is not None else None
+                if embedding is None:
+                    embedding_timeout = (deadline.timeout(cap=EMBEDDING_TIMEOUT_SECONDS) if deadline
+                                         else EMBEDDING_TIMEOUT_SECONDS)
+                    embedding = await self.generate_embedding(query, timeout=embedding_timeout)
+                    if not embedding:
+                        logger.warning("Could not generate embedding for semantic search.")
+                        return None
+                    if query_vector is not None:
+                        query_vector["embedding"] = embedding
+
+                ann = ann or self.ann
+                if self.vector_backend == "solr":
+                    solr_timeout = deadline.timeout(cap=SOLR_TIMEOUT_SECONDS) if deadline else SOLR_TIMEOUT_SECONDS
+                    docs = await self.solr_knn_search(embedding, limit, filters, ann, fields, timeout=solr_timeout)
+                else:
+                    if self.projection is not None:
+                        embedding = self.projection.transform(embedding)
+                    exact = ann.exact or await self.is_small_subset(filters, ann.exact_below)
+                    with span("qdrant", limit=limit, filtered=bool(filters), exact=exact,
+                              hnsw_ef=ann.hnsw_ef or 0) as current:
+                        search_results = await self.qdrant_client.query_points(
+                            collection_name=COLLECTION_NAME,
+                            query=embedding,
+                            using=await self.query_vector_name(),
+                            query_filter=qdrant_filter(filters),
+                            search_params=ann.search_params(exact),
+                            limit=limit,
+                            with_payload=True,
+                            score_threshold=ann.score_threshold,
+                            timeout=max(1, math.ceil(deadline.remaining())) if deadline else None
+                        )
+                        current.set_attribute("result_count", len(search_results.points))
+                    docs = self.semantic_documents(search_results.points)
+
+                semantic_span.set_attribute("result_count", len(docs))
+                logger.info(f"Semantic search returned {len(docs)} results in {time.time() - start_time:.2f} seconds")
+                return docs
+            except Exception as e:
+                logger.error(f"Error in semantic search: {e!r}")
+                return None
+
+    async def solr_knn_search(self, embedding: List[float], limit: int, filters: Optional[Filters] = None,
+                              ann: Optional[AnnParams] = None, fields: Optional[str] = None,
+                              timeout: float = SOLR_TIMEOUT_SECONDS) -> List[Dict]:
+        """Search the Solr vector field with {!knn} (see HybridSearcher.solr_knn_search).
+
+        Raises:
+            httpx.HTTPError: If the Solr request fails
+        """
+        ann = ann or self.ann
+        top_k = max(limit, ann.hnsw_ef or 0)
+        params = {
+            "q": knn_query(embedding, top_k),
+            "rows": top_k,
+            "fl": f"{fields or SOLR_DOCUMENT_FIELDS},score",
+            "hl": "false",
+            "facet": "false",
+            "spellcheck": "false",
+            "wt": "json"
+        }
+        if filters:
+            params["fq"] = solr_filter_queries(filters)
+
+        with span("solr_knn", top_k=top_k, filtered=bool(filters)) as current:
+            response = await self.http.post(f"{hybrid_search.SOLR_ENDPOINT}/select", data=params, timeout=timeout)
+            response.raise_for_status()
+            docs = response.json().get("response", {}).get("docs", [])
+            current.set_attributes(result_count=len(docs), bytes=len(response.content))
+
+        results = []
+        for doc in docs[:limit]:
+            doc["score"] = cosine_from_solr(doc.get("score", 0.0))
+            if ann.score_threshold is not None and doc["score"] < ann.score_threshold:
+                continue
+            doc["search_source"] = "semantic"
+            results.append(doc)
+        return results
+
+    async def retrieve_candidates(self, query: str, pool_size: int, keyword_fields: Optional[str] = None,
+                                  deadline: Optional[Deadline] = None, filters: Optional[Filters] = None,
+                                  ann: Optional[AnnParams] = None, keyword_start: int = 0,
+                                  query_vector: Optional[Dict] = None
+                                  ) -> Tuple[List[Dict], List[Dict], Optional[str]]:
+        """Fetch the ranked candidate lists from Solr and the vector backend concurrently.
+
+        Args:
+            query: Search query text
+            pool_size: Number of candidates to fetch from each side
+            keyword_fields: Stored fields of the Solr candidates (default: full document fields)
+            deadline: Deadline of the retrieval stage (default: no budget)
+            filters: Normalized field filters
+            ann: ANN parameters of the semantic side (default: the searcher's)
+            keyword_start: Keyword candidates already fetched (Solr ranks from here up to pool_size)
+            query_vector: Holder of the query embedding shared by the rounds of one search
+
+        Returns:
+            Tuple of (keyword results, semantic results, degraded reason), as in HybridSearcher
+        """
+        semantic_task = None
+        if self.should_use_semantic_search(query):
+            semantic_task = asyncio.ensure_future(
+                self.semantic_search(query, pool_size, deadline, filters, ann, keyword_fields, query_vector))
+        else:
+            logger.info("Semantic search skipped - using keyword results only")
+
+        solr_timeout = deadline.timeout(cap=SOLR_TIMEOUT_SECONDS) if deadline else SOLR_TIMEOUT_SECONDS
+        solr_results = await self.solr_search(query, limit=pool_size - keyword_start, fields=keyword_fields,
+                                              timeout=solr_timeout, filters=filters, start=keyword_start)
+
+        if semantic_task is None:
+            return solr_results, [], None
+        try:
+            # Reason: unlike a thread, a late semantic search is cancelled instead of running on in the background
+            semantic_results = await asyncio.wait_for(semantic_task, deadline.remaining() if deadline else None)
+        except asyncio.TimeoutError:
+            logger.warning("Semantic search missed its latency budget - returning keyword results only")
+            return solr_results, [], "semantic_timeout"
+        if semantic_results is None:
+            return solr_results, [], "semantic_unavailable"
+        return solr_results, semantic_results, None
+
+    async def retrieve_and_fuse(self, query: str, limit: int, pool_size: int, fusion: str,
+                                keyword_weight: float, semantic_weight: float, adaptive: bool,
+                                deadline: Optional[Deadline] = None, filters: Optional[Filters] = None,
+                                ann: Optional[AnnParams] = None, keyword_fields: Optional[str] = None,
+                                query_vector: Optional[Dict] = None
+                                ) -> Tuple[List[Dict], List[Dict], List[tuple], Optional[str], Dict]:
+        """Retrieve candidates and fuse them, starting with a small pool if adaptive.
+
+        Returns:
+            Tuple of (keyword results, semantic results, fused ranking, degraded reason,
+            pool information), as in HybridSearcher.retrieve_and_fuse
+        """
+        initial_pool = initial_pool_size(limit, pool_size, fusion) if adaptive else pool_size
+        query_vector = {} if query_vector is None else query_vector
+        solr_results, semantic_results, degraded_reason = await self.retrieve_candidates(
+            query, initial_pool, keyword_fields=keyword_fields, deadline=deadline, filters=filters, ann=ann,
+            query_vector=query_vector)
+        ranked = fuse(fusion, solr_results, semantic_results, keyword_weight, semantic_weight)
+        pool_info = {"initial": initial_pool, "final": initial_pool, "expanded": False, "assessment": None}
+        if initial_pool >= pool_size:
+            return solr_results, semantic_results, ranked, degraded_reason, pool_info
+
+        assessment = assess_stability(ranked, len(solr_results), len(semantic_results), initial_pool, limit,
+                                      keyword_weight, semantic_weight)
+        pool_info["assessment"] = assessment
+        if not assessment["stable"] and degraded_reason is None and not (deadline and deadline.expired()):
+            more_keyword, more_semantic, expanded_reason = await self.expand_candidates(
+                query, pool_size, solr_results, deadline, filters, ann, keyword_fields, query_vector)
+            if expanded_reason is None:
+                solr_results, semantic_results = more_keyword, more_semantic
+                ranked = fuse(fusion, solr_results, semantic_results, keyword_weight, semantic_weight)
+                pool_info.update(final=pool_size, expanded=True)
+            else:
+                logger.warning(f"Expanded candidate pool degraded ({expanded_reason}) - keeping the initial pool")
+        self.pool_stats.record(initial_pool, pool_info["final"], pool_size, assessment)
+        return solr_results, semantic_results, ranked, degraded_reason, pool_info
+
+    async def expand_candidates(self, query: str, pool_size: int, solr_results: List[Dict],
+                                deadline: Optional[Deadline] = None, filters: Optional[Filters] = None,
+                                ann: Optional[AnnParams] = None, keyword_fields: Optional[str] = None,
+                                query_vector: Optional[Dict] = None) -> Tuple[List[Dict], List[Dict], Optional[str]]:
+        """Fetch the full candidate pool after the known keyword candidates (see HybridSearcher.expand_candidates)."""
+        more_keyword, semantic_results, degraded_reason = await self.retrieve_candidates(
+            query, pool_size, keyword_fields=keyword_fields, deadline=deadline, filters=filters, ann=ann,
+            keyword_start=len(solr_results), query_vector=query_vector)
+        known_ids = {doc["id"] for doc in solr_results}
+        keyword_results = solr_results + [doc for doc in more_keyword if doc["id"] not in known_ids]
+        return keyword_results, semantic_results, degraded_reason
+
+    async def widen_pool(self, pool: Dict, query: str, end: int, fusion: str, keyword_weight: float,
+                         semantic_weight: float, deadline: Optional[Deadline] = None,
+                         filters: Optional[Filters] = None, ann: Optional[AnnParams] = None) -> Dict:
+        """Make a paging pool cover the ranking up to the end of a page (see HybridSearcher.widen_pool).
+
+        Returns:
+            The given pool if it covers the page, otherwise a new, widened pool
+        """
+        if pool["candidates"] is None or end <= pool["covered"] or pool["pool_size"] >= pool["full_pool"]:
+            return pool
+        keyword_results, semantic_results = pool["candidates"]["keyword"], pool["candidates"]["semantic"]
+        if end <= pool["pool_size"]:
+            ranked = [(entry["id"], entry) for entry in pool["ranking"]]
+            assessment = assess_stability(ranked, len(keyword_results), len(semantic_results), pool["pool_size"],
+                                          end, keyword_weight, semantic_weight)
+            if assessment["stable"]:
+                return dict(pool, covered=end)
+
+        query_vector = {"embedding": pool["query_embedding"]} if pool.get("query_embedding") else None
+        keyword_results, more_semantic, degraded_reason = await self.expand_candidates(
+            query, pool["full_pool"], keyword_results, deadline, filters, ann, SOLR_RANKING_FIELDS, query_vector)
+        if degraded_reason is not None and pool["degraded_reason"] is None:
+            logger.warning(f"Widened candidate pool degraded ({degraded_reason}) - keeping the initial pool")
+            return dict(pool, full_pool=pool["pool_size"])
+        logger.info(f"Widened the candidate pool of query '{query}' from {pool['pool_size']} to "
+                    f"{pool['full_pool']} per side for a page ending at {end}")
+        ranked = fuse(fusion, keyword_results, more_semantic, keyword_weight, semantic_weight)
+        return dict(self.paging_pool(ranked, keyword_results, more_semantic, pool["full_pool"], pool["full_pool"],
+                                     end, degraded_reason), fingerprint=pool.get("fingerprint"))
+
+    async def hydrate_ranked(self, ranked: List[tuple], full_documents: Dict[str, Dict], limit: int,
+                             deadline: Optional[Deadline] = None) -> List[Dict]:
+        """Turn the top of a fused ranking into full result documents (see HybridSearcher.hydrate_ranked)."""
+        final_results = []
+        position = 0
+        while len(final_results) < limit and position < len(ranked):
+            window = ranked[position:position + limit - len(final_results)]
+            position += len(window)
+
+            missing_ids = [doc_id for doc_id, _ in window if doc_id not in full_documents]
+            if missing_ids:
+                timeout = (deadline.timeout(cap=SOLR_TIMEOUT_SECONDS, minimum=HYDRATION_MIN_TIMEOUT)
+                           if deadline else SOLR_TIMEOUT_SECONDS)
+                full_documents.update(await self.get_solr_documents_by_ids(missing_ids, timeout=timeout))
+
+            for doc_id, score_info in window:
+                if doc_id not in full_documents:
+                    logger.warning(f"Document {doc_id} not found in Solr but was in search results")
+                    continue
+                final_results.append(self.merge_scores(dict(full_documents[doc_id]), score_info))
+        return final_results
+
+    async def hydrate_page(self, page: List[Dict], query: str, mode: str = "full",
+                           timeout: float = SOLR_TIMEOUT_SECONDS) -> List[Dict]:
+        """Load the documents of a ranking page from Solr and merge their scores."""
+        doc_ids = [entry["id"] for entry in page]
+        if mode == "snippets":
+            documents = await self.get_solr_snippets_by_ids(doc_ids, query, timeout=timeout)
+        else:
+            documents = await self.get_solr_documents_by_ids(doc_ids, timeout=timeout)
+
+        docs = []
+        for entry in page:
+            if entry["id"] not in documents:
+                logger.warning(f"Document {entry['id']} not found in Solr but was in search results")
+                continue
+            docs.append(self.merge_scores(dict(documents[entry["id"]]), entry))
+        return docs
+
+    async def combined_search(self, query: str, limit: int = DEFAULT_LIMIT,
+                              weights: Optional[Tuple[float, float]] = None, use_cache: bool = True,
+                              fusion: Optional[str] = None, candidate_pool: Optional[int] = None,
+                              budget: Optional[float] = None,
+                              filters: Optional[Dict[str, Union[str, List[str]]]] = None,
+                              ann: Optional[AnnParams] = None) -> List[Dict]:
+        """Hybrid search with the same arguments and results as HybridSearcher.combined_search.
+
+        Returns:
+            List of document dicts with combined ranking and full content
+
+        Raises:
+            ValueError: If the fusion strategy or a filter field is unknown
+        """
+        with span("combined_search", limit=limit) as current:
+            start_time = time.time()
+            deadline = Deadline(budget or SEARCH_BUDGET_SECONDS)
+            keyword_weight, semantic_weight, fusion, pool_size = self.resolve_search_options(
+                limit, weights, fusion, candidate_pool)
+            filters = normalize_filters(filters)
+            ann = ann or self.ann
+            current.set_attributes(fusion=fusion, candidate_pool=pool_size, filters=filter_key(filters))
+
+            citation_ranking = self.citation_ranking(query) if filters is None else None
+            if citation_ranking is not None:
+                results = await self.hydrate_page(citation_ranking[:limit], query, timeout=deadline.timeout(
+                    cap=SOLR_TIMEOUT_SECONDS, minimum=HYDRATION_MIN_TIMEOUT))
+                current.set_attributes(citation=True, result_count=len(results))
+                return results
+
+            cache_key = None
+            if use_cache and await self.refresh_index_version():
+                cache_key = ResultCache.key(query, limit, round(keyword_weight, 4), round(semantic_weight, 4),
+                                            fusion, pool_size, filter_key(filters), ann)
+                cached_results = self.result_cache.get(cache_key)
+                current.set_attribute("cache_hit", cached_results is not None)
+                if cached_results is not None:
+                    current.set_attribute("result_count", len(cached_results))
+                    return cached_results
+
+            solr_results, semantic_results, ranked, degraded_reason, pool_info = await self.retrieve_and_fuse(
+                query, limit, pool_size, fusion, keyword_weight, semantic_weight,
+                adaptive=self.adaptive_pool and candidate_pool is None,
+                deadline=deadline.child(RETRIEVAL_BUDGET_SHARE), filters=filters, ann=ann)
+            current.set_attributes(initial_pool=pool_info["initial"], pool_expanded=pool_info["expanded"])
+
+            full_documents = {doc["id"]: doc for doc in solr_results}
+            if self.vector_backend == "solr":
+                full_documents.update({doc["id"]: doc for doc in semantic_results if doc["id"] not in full_documents})
+            final_results = await self.hydrate_ranked(ranked, full_documents, limit, deadline)
+
+            search_type = "hybrid" if semantic_results else "keyword-only"
+            current.set_attributes(result_count=len(final_results), search_type=search_type,
+                                   degraded=degraded_reason or "")
+            logger.info(f"{search_type.title()} search ({fusion}) returned {len(final_results)} results "
+                        + (f"(pool expanded from {pool_info['initial']} to {pool_info['final']}: "
+                           f"{pool_info['assessment']['reason']}) " if pool_info["expanded"] else "")
+                        + f"in {time.time() - start_time:.2f} seconds"
+                        + (f", degraded: {degraded_reason}" if degraded_reason else ""))
+
+            if cache_key is not None and degraded_reason is None:
+                self.result_cache.put(cache_key, final_results)
+            return final_results
+
+    async def search(self, query: str, limit: int = DEFAULT_LIMIT, start: int = 0, cursor: Optional[str] = None,
+                     weights: Optional[Tuple[float, float]] = None, fusion: Optional[str] = None,
+                     candidate_pool: Optional[int] = None, mode: str = "full", budget: Optional[float] = None,
+                     timings: bool = False, filters: Optional[Dict[str, Union[str, List[str]]]] = None,
+                     ann: Optional[AnnParams] = None) -> Dict:
+        """Paginated hybrid search with the same arguments and envelope as HybridSearcher.search.
+
+        Returns:
+            Dict with numFound, start, cursor, docs and degraded (plus timings if requested)
+
+        Raises:
+            ValueError: If the fusion strategy, the result mode or a filter field is unknown
+        """
+        if mode not in RESULT_MODES:
+            raise ValueError(f"Unknown result mode '{mode}', expected one of {', '.join(RESULT_MODES)}")
+
+        with ensure_trace(timings) as trace, span("search", limit=limit, start=start, mode=mode) as current:
+            start_time = time.time()
+            deadline = Deadline(budget or SEARCH_BUDGET_SECONDS)
+            filters = normalize_filters(filters)
+            ann = ann or self.ann
+            keyword_weight, semantic_weight, fusion, pool_size = self.resolve_search_options(
+                limit, weights, fusion, candidate_pool)
+            fingerprint = self.cursor_fingerprint(query, filters, ann, keyword_weight, semantic_weight, fusion)
+
+            pool = self.cursor_cache.get(cursor) if cursor else None
+            if pool is not None and pool["fingerprint"] != fingerprint:
+                logger.warning(f"Cursor {cursor} belongs to another search, computing a new pool")
+                pool = None
+            current.set_attribute("cursor_hit", pool is not None)
+
+            if pool is None:
+                pool_size = max(pool_size, PAGE_POOL_SIZE)
+
+                cache_key = None
+                citation_ranking = self.citation_ranking(query) if filters is None else None
+                if citation_ranking is not None:
+                    pool = {"ranking": citation_ranking, "candidates": None, "degraded_reason": None}
+                elif await self.refresh_index_version():
+                    cache_key = ResultCache.key(query, pool_size, "pool", round(keyword_weight, 4),
+                                                round(semantic_weight, 4), fusion, filter_key(filters), ann)
+                    # Reason: the result cache holds lists of dicts, so the pool is cached as a one-element list
+                    pool = next(iter(self.result_cache.get(cache_key) or []), None)
+                    current.set_attribute("cache_hit", pool is not None)
+
+                if pool is None:
+                    # Reason: built for the first page and widened below, as in HybridSearcher.search
+                    query_vector: Dict = {}
+                    solr_results, semantic_results, ranked, degraded_reason, pool_info = await self.retrieve_and_fuse(
+                        query, limit, pool_size, fusion, keyword_weight, semantic_weight,
+                        adaptive=self.adaptive_pool and candidate_pool is None,
+                        deadline=deadline.child(RETRIEVAL_BUDGET_SHARE), filters=filters, ann=ann,
+                        keyword_fields=SOLR_RANKING_FIELDS, query_vector=query_vector)
+                    current.set_attributes(initial_pool=pool_info["initial"], pool_expanded=pool_info["expanded"])
+                    pool = self.paging_pool(ranked, solr_results, semantic_results, pool_info["final"], pool_size,
+                                            limit, degraded_reason, query_vector.get("embedding"))
+                    if cache_key is not None and degraded_reason is None:
+                        self.result_cache.put(cache_key, [pool])
+
+                pool = dict(pool, fingerprint=fingerprint)
+                cursor = secrets.token_urlsafe(16)
+                self.cursor_cache.put(cursor, pool)
+
+            widened = await self.widen_pool(pool, query, start + limit, fusion, keyword_weight, semantic_weight,
+                                            deadline.child(RETRIEVAL_BUDGET_SHARE), filters, ann)
+            if widened is not pool:
+                pool = widened
+                self.cursor_cache.put(cursor, pool)
+
+            ranking = pool["ranking"]
+            page = ranking[start:start + limit]
+            docs = await self.hydrate_page(page, query, mode, timeout=deadline.timeout(
+                cap=SOLR_TIMEOUT_SECONDS, minimum=HYDRATION_MIN_TIMEOUT))
+
+            logger.info(f"Page {start}-{start + len(page)} of {len(ranking)} fused results for query '{query}' "
+                        f"in {time.time() - start_time:.2f} seconds")
+            response = self._envelope({"numFound": len(ranking), "start": start, "cursor": cursor, "docs": docs},
+                                      pool["degraded_reason"])
+            current.set_attributes(result_count=len(docs), pool_size=len(ranking), degraded=response["degraded"])
+
+        if timings and trace is not None:
+            response["timings"] = trace.timings()
+        return response
+
+
+async def run_queries(searcher: AsyncHybridSearcher, entries: List[Dict], output, limit: int,
+                      concurrency: int = DEFAULT_CONCURRENCY, **search_options) -> int:
+    """Search many queries concurrently and write one JSON line per query as it finishes.
+
+    Args:
+        searcher: Async hybrid searcher
+        entries: Query dicts with a "query" field (extra fields are passed through)
+        output: Text stream for the JSONL results
+        limit: Maximum number of results of queries without their own "limit"
+        concurrency: Searches in flight at the same time
+        **search_options: Further combined_search arguments (fusion, candidate_pool, filters)
+
+    Returns:
+        Number of queries processed
+
+    Raises:
+        ValueError: If an entry has an invalid "limit"
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = [query_limit(entry, limit) for entry in entries]
+
+    async def run(entry: Dict, entry_limit: int) -> None:
+        async with semaphore:
+            results = await searcher.combined_search(entry["query"], entry_limit, **search_options)
+        output.write(json.dumps(dict(entry, results=results), ensure_ascii=False) + "\n")
+
+    start_time = time.time()
+    await asyncio.gather(*(run(entry, entry_limit) for entry, entry_limit in zip(entries, limits)))
+    output.flush()
+    elapsed = time.time() - start_time
+    logger.info(f"Processed {len(entries)} queries in {elapsed:.1f} seconds "
+                f"({len(entries) / elapsed if elapsed else 0:.1f} queries/s) at concurrency {concurrency}")
+    return len(entries)
+
+
+async def _run(args, filters: Dict[str, List[str]], ann: AnnParams) -> None:
+    """Run the command line search inside the event loop."""
+    async with AsyncHybridSearcher(ann=ann, vector_backend=args.vector_backend) as searcher:
+        options = {"fusion": args.fusion, "candidate_pool": args.candidate_pool, "filters": filters}
+        if args.queries_file:
+            output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+            try:
+                await run_queries(searcher, load_queries(args.queries_file), output, args.limit,
+                                  args.concurrency, **options)
+            finally:
+                if args.output:
+                    output.close()
+            return
+        results = await searcher.combined_search(args.query, args.limit, **options)
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+def main():
+    """Main function to run the async hybrid search."""
+    parser = argparse.ArgumentParser(description="ASRA Async Hybrid Search")
+    parser.add_argument("--query", type=str, default=None,
+                        help="Search query text (required unless --queries-file is used)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT,
+                        help=f"Maximum number of results per query (default: {DEFAULT_LIMIT})")
+    parser.add_argument("--fusion", choices=FUSION_STRATEGIES, default=None,
+                        help="Fusion strategy (default: HYBRID_FUSION env or sigmoid)")
+    parser.add_argument("--candidate-pool", type=int, default=None,
+                        help="Candidates fetched per side before fusion (default: depends on the fusion strategy)")
+    parser.add_argument("--filter", action="append", default=[], metavar="FIELD=VALUE",
+                        help="Restrict the search to a field value, e.g. jurabk=BGB (repeatable)")
+    parser.add_argument("--ann-preset", choices=list(ANN_PRESETS), default=None,
+                        help="Query-time ANN accuracy preset (default: HYBRID_ANN_PRESET env or default)")
+    parser.add_argument("--vector-backend", choices=VECTOR_BACKENDS, default=None,
+                        help="Vector search in Qdrant or in the Solr vector field (default: HYBRID_VECTOR_BACKEND env)")
+    parser.add_argument("--queries-file", type=str, default=None,
+                        help="Search all queries of a file (one per line, or JSONL with a \"query\" field)")
+    parser.add_argument("--output", type=str, default=None, help="Output file for --queries-file (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Searches in flight at the same time for --queries-file (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--docker", action="store_true", help="Use Docker network endpoints (ollama, qdrant, solr)")
+    args = parser.parse_args()
+
+    if not args.query and not args.queries_file:
+        parser.error("--query is required unless --queries-file is used")
+    if args.concurrency <= 0:
+        parser.error("--concurrency must be positive")
+
+    if args.docker:
+        logger.info("Using Docker network endpoints")
+        hybrid_search.QDRANT_ENDPOINT = hybrid_search.DOCKER_QDRANT_ENDPOINT
+        hybrid_search.OLLAMA_ENDPOINTS = hybrid_search.DOCKER_OLLAMA_ENDPOINT
+        hybrid_search.SOLR_ENDPOINT = hybrid_search.DOCKER_SOLR_ENDPOINT
+
+    filters: Dict[str, List[str]] = {}
+    for entry in args.filter:
+        field, separator, value = entry.partition("=")
+        if not separator:
+            parser.error(f"--filter expects FIELD=VALUE, got '{entry}'")
+        filters.setdefault(field.strip(), []).append(value)
+
+    try:
+        ann = resolve_ann_params(args.ann_preset or HYBRID_ANN_PRESET)
+        asyncio.run(_run(args, filters, ann))
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(2)
+    except KeyboardInterrupt:
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
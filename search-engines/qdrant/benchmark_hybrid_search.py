@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Hybrid Search Benchmark
+
+Replays a query log (or the built-in German legal queries) against a HybridSearcher
+at a configurable concurrency. Reports p50/p95/p99 latency of the whole search and of
+its stages (embed, qdrant, solr_search, solr_hydration, fusion), plus throughput.
+Stages run partly in parallel (Solr next to embed + Qdrant), so they do not add up to
+the total.
+
+By default the embedding and result caches are disabled, so every search pays the
+full backend cost. With --stub the benchmark starts local stand-ins for Solr, Ollama
+and Qdrant (stub_backends.py) and needs no running services. The in-process
+stand-ins compete with the searcher for the interpreter, so compare stub runs with
+each other; for lower overhead run stub_backends.py separately and export the
+endpoints it prints.
+
+Usage:
+    python3 benchmark_hybrid_search.py [--queries-file queries.log] [--concurrency 4] [--repeat 3]
+    python3 benchmark_hybrid_search.py --stub [--ollama-latency-ms 30] [--max-p95-ms 200]
+
+Options:
+    --queries-file  Query log (one query per line, or JSONL with a "query" field)
+    --concurrency   Number of concurrent searches (default: 4)
+    --repeat        How often the query list is replayed (default: 1)
+    --warmup        Queries run before measuring (default: 5)
+    --method        combined (combined_search), search (paged) or snippets (paged, snippet mode)
+    --warm-cache    Keep the embedding and result caches enabled
+    --no-embedding-batching  Send every query embedding as its own Ollama request
+    --adaptive-pool     Start with a small candidate pool and expand it when the top-k is unstable
+    --no-adaptive-pool  Always fetch the full candidate pool, even if HYBRID_ADAPTIVE_POOL is set
+    --stub          Run against local stand-in backends
+    --output        Write the report as JSON to this file
+    --max-p95-ms    Exit with status 2 if the total p95 latency exceeds this value
+    --docker        Use Docker network endpoints instead of localhost
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import hybrid_search
+from ann_params import ANN_PRESETS, resolve_ann_params
+from fusion import FUSION_STRATEGIES
+from query_sets import default_queries, load_queries
+from stub_backends import DEFAULT_DOCUMENTS, StubBackends
+from tracing import STAGES, start_trace
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("combined", "search", "snippets")
+PERCENTILES = (50, 95, 99)
+EXIT_LATENCY_REGRESSION = 2  # Exit status when --max-p95-ms is exceeded
+
+
+def run_query(searcher: "hybrid_search.HybridSearcher", method: str, query: str, limit: int,
+              fusion: Optional[str] = None) -> Dict[str, float]:
+    """Run one search and return its total and per-stage durations in seconds.
+
+    Args:
+        searcher: Hybrid searcher
+        method: One of METHODS
+        query: Search query text
+        limit: Number of results
+        fusion: Fusion strategy
+
+    Returns:
+        Dict with "total" and one entry per stage that occurred
+    """
+    with start_trace() as trace:
+        start_time = time.perf_counter()
+        if method == "combined":
+            searcher.combined_search(query, limit, fusion=fusion)
+        else:
+            searcher.search(query, limit, fusion=fusion, mode="snippets" if method == "snippets" else "full")
+        total = time.perf_counter() - start_time
+    sample = trace.totals()
+    sample["total"] = total
+    return sample
+
+
+def summarize(samples: List[Dict[str, float]], wall_seconds: float, concurrency: int) -> Dict:
+    """Aggregate the samples into percentiles per stage and throughput.
+
+    Args:
+        samples: Results of run_query
+        wall_seconds: Wall-clock duration of the measured run
+        concurrency: Number of concurrent searches
+
+    Returns:
+        Report dict
+    """
+    stages = {}
+    for stage in ("total",) + STAGES:
+        values = [sample[stage] * 1000 for sample in samples if stage in sample]
+        if not values:
+            continue
+        stages[stage] = {"count": len(values), "mean_ms": float(np.mean(values))}
+        stages[stage].update({f"p{p}_ms": float(np.percentile(values, p)) for p in PERCENTILES})
+    return {
+        "queries": len(samples),
+        "concurrency": concurrency,
+        "wall_seconds": wall_seconds,
+        "throughput_qps": len(samples) / wall_seconds if wall_seconds else 0.0,
+        "stages": stages,
+    }
+
+
+def benchmark(searcher: "hybrid_search.HybridSearcher", queries: List[str], method: str = "combined",
+              limit: int = hybrid_search.DEFAULT_LIMIT, concurrency: int = 4, warmup: int = 5,
+              fusion: Optional[str] = None) -> Dict:
+    """Replay the queries and measure latencies.
+
+    Args:
+        searcher: Hybrid searcher
+        queries: Queries in replay order
+        method: One of METHODS
+        limit: Number of results per search
+        concurrency: Number of concurrent searches
+        warmup: Queries run before measuring
+        fusion: Fusion strategy
+
+    Returns:
+        Report dict (see summarize)
+    """
+    for query in queries[:warmup]:
+        run_query(searcher, method, query, limit, fusion)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="benchmark") as executor:
+        start_time = time.perf_counter()
+        samples = list(executor.map(lambda query: run_query(searcher, method, query, limit, fusion), queries))
+        wall_seconds = time.perf_counter() - start_time
+    return summarize(samples, wall_seconds, concurrency)
+
+
+def print_report(report: Dict) -> None:
+    """Print the report as a table."""
+    header = f"{'stage':<15} {'count':>6} " + " ".join(f"{'p' + str(p) + ' ms':>9}" for p in PERCENTILES)
+    print(f"\n{header} {'mean ms':>9}")
+    for stage, row in report["stages"].items():
+        percentiles = " ".join(f"{row[f'p{p}_ms']:>9.1f}" for p in PERCENTILES)
+        print(f"{stage:<15} {row['count']:>6} {percentiles} {row['mean_ms']:>9.1f}")
+    print(f"\n{report['queries']} queries in {report['wall_seconds']:.1f} s at concurrency "
+          f"{report['concurrency']}: {report['throughput_qps']:.1f} queries/s")
+    pool = report.get("candidate_pool")
+    if pool and pool["searches"]:
+        print(f"Adaptive candidate pool: {pool['expansion_rate']:.0%} of {pool['searches']} searches expanded "
+              f"{pool['reasons']}, {pool['candidate_ratio']:.0%} of the full pool fetched")
+
+
+def main():
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the hybrid search")
+    parser.add_argument("--queries-file", type=str, default=None,
+                        help="Query log, one query per line or JSONL with a \"query\" field")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent searches (default: 4)")
+    parser.add_argument("--repeat", type=int, default=1, help="How often the query list is replayed (default: 1)")
+    parser.add_argument("--warmup", type=int, default=5, help="Queries run before measuring (default: 5)")
+    parser.add_argument("--limit", type=int, default=hybrid_search.DEFAULT_LIMIT,
+                        help=f"Results per search (default: {hybrid_search.DEFAULT_LIMIT})")
+    parser.add_argument("--method", choices=METHODS, default="combined",
+                        help="Search method to measure (default: combined)")
+    parser.add_argument("--fusion", choices=FUSION_STRATEGIES, default=None,
+                        help="Fusion strategy (default: HYBRID_FUSION env or sigmoid)")
+    parser.add_argument("--ann-preset", choices=list(ANN_PRESETS), default=None,
+                        help="Qdrant accuracy preset (default: HYBRID_ANN_PRESET env or default)")
+    parser.add_argument("--warm-cache", action="store_true",
+                        help="Keep the embedding and result caches enabled")
+    parser.add_argument("--stub", action="store_true",
+                        help="Run against local stand-ins for Solr, Ollama and Qdrant")
+    parser.add_argument("--stub-documents", type=int, default=DEFAULT_DOCUMENTS,
+                        help=f"Size of the stand-in corpus (default: {DEFAULT_DOCUMENTS})")
+    parser.add_argument("--solr-latency-ms", type=float, default=5, help="Stand-in Solr latency (default: 5)")
+    parser.add_argument("--ollama-latency-ms", type=float, default=30, help="Stand-in Ollama latency (default: 30)")
+    parser.add_argument("--qdrant-latency-ms", type=float, default=5, help="Stand-in Qdrant latency (default: 5)")
+    parser.add_argument("--ollama-parallel", type=int, default=None,
+                        help="Requests the stand-in Ollama works on at once, like a CPU host (default: unlimited)")
+    parser.add_argument("--no-embedding-batching", action="store_true",
+                        help="Send every query embedding as its own Ollama request")
+    adaptive = parser.add_mutually_exclusive_group()
+    adaptive.add_argument("--adaptive-pool", action="store_true",
+                          help="Start with a small candidate pool and expand it when the top-k is unstable")
+    adaptive.add_argument("--no-adaptive-pool", action="store_true",
+                          help="Always fetch the full candidate pool, even if HYBRID_ADAPTIVE_POOL is set")
+    parser.add_argument("--output", type=str, default=None, help="Write the report as JSON to this file")
+    parser.add_argument("--max-p95-ms", type=float, default=None,
+                        help="Exit with status 2 if the total p95 latency exceeds this value")
+    parser.add_argument("--docker", action="store_true",
+                        help="Use Docker network endpoints instead of localhost")
+    args = parser.parse_args()
+
+    backends = None
+    if args.stub:
+        backends = StubBackends(args.stub_documents, solr_latency_ms=args.solr_latency_ms,
+                                ollama_latency_ms=args.ollama_latency_ms, qdrant_latency_ms=args.qdrant_latency_ms,
+                                ollama_parallel=args.ollama_parallel)
+        endpoints = StubBackends.endpoints(backends.start())
+        hybrid_search.SOLR_ENDPOINT = endpoints["solr"]
+        hybrid_search.OLLAMA_ENDPOINTS = endpoints["ollama"]
+        hybrid_search.QDRANT_ENDPOINT = endpoints["qdrant"]
+        hybrid_search.CITATION_INDEX_FILE = None  # Citations of the real corpus do not exist in the stand-ins
+    elif args.docker:
+        hybrid_search.QDRANT_ENDPOINT = hybrid_search.DOCKER_QDRANT_ENDPOINT
+        hybrid_search.OLLAMA_ENDPOINTS = hybrid_search.DOCKER_OLLAMA_ENDPOINT
+        hybrid_search.SOLR_ENDPOINT = hybrid_search.DOCKER_SOLR_ENDPOINT
+
+    if not args.warm_cache:
+        # Reason: repeated queries would otherwise measure cache hits instead of the backends
+        hybrid_search.EMBEDDING_CACHE_SIZE = 0
+        hybrid_search.EMBEDDING_CACHE_DB = None
+        hybrid_search.RESULT_CACHE_SIZE = 0
+    if args.no_embedding_batching:
+        hybrid_search.EMBEDDING_MICRO_BATCH = False
+    if args.adaptive_pool:
+        hybrid_search.ADAPTIVE_CANDIDATE_POOL = True
+    elif args.no_adaptive_pool:
+        hybrid_search.ADAPTIVE_CANDIDATE_POOL = False
+
+    try:
+        entries = load_queries(args.queries_file) if args.queries_file else default_queries()
+        queries = [entry["query"] for entry in entries] * args.repeat
+        logger.info(f"Benchmarking {args.method} with {len(queries)} queries at concurrency {args.concurrency}"
+                    f"{' against stand-in backends' if args.stub else ''}")
+
+        searcher = hybrid_search.HybridSearcher(ann=resolve_ann_params(args.ann_preset) if args.ann_preset else None)
+        # Reason: per-search INFO logs would dominate the measured time
+        for name in ("hybrid_search", "httpx"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+        report = benchmark(searcher, queries, args.method, args.limit, args.concurrency, args.warmup, args.fusion)
+        report.update({"method": args.method, "stub": args.stub, "warm_cache": args.warm_cache,
+                       "ann": searcher.ann._asdict(), "embedding_batcher": searcher.stats()["embedding_batcher"],
+                       "candidate_pool": searcher.stats()["candidate_pool"]})
+        print_report(report)
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            logger.info(f"Report written to {args.output}")
+
+    except Exception as e:
+        logger.error(f"Error during benchmark: {e}")
+        sys.exit(1)
+    finally:
+        if backends is not None:
+            backends.stop()
+
+    p95 = report["stages"].get("total", {}).get("p95_ms", 0.0)
+    if args.max_p95_ms is not None and p95 > args.max_p95_ms:
+        logger.error(f"Total p95 latency {p95:.1f} ms exceeds the limit of {args.max_p95_ms:.1f} ms")
+        sys.exit(EXIT_LATENCY_REGRESSION)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Citation Index
+
+Direct lookup of legal citations such as "§ 823 BGB", "Art. 1 GG", "BGB § 823 Abs. 1",
+"§§ 1-5 BGB" or "Anlage 2 StVO". The index maps (abbreviation, norm designation) to
+Solr document IDs. It is written by solr_import_norms.py at import time; for an
+existing Solr index it can be built with this script.
+
+Abbreviations are matched on jurabk and amtabk (case-insensitive), norm designations
+on the normalized enbez ("§ 823", "Art 1", "Anlage 2"). Queries that are not a pure
+citation (e.g. "Haftung nach § 823 BGB") are left to the regular search.
+
+Usage:
+    python3 citation_index.py --output citation_index.json [--solr URL]
+    python3 citation_index.py --index citation_index.json --query "§ 823 BGB"
+
+    index = CitationIndex.load("citation_index.json")
+    doc_ids = index.resolve("§§ 1-5 BGB")  # None if the query is no known citation
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOLR_ENDPOINT = "http://localhost:8983/solr/documents"
+CITATION_INDEX_FORMAT = 1  # Version of the JSON file layout
+MAX_RANGE_NORMS = 200  # Larger ranges ("§§ 1-2000 BGB") are left to the regular search
+EXPORT_BATCH_SIZE = 1000  # Rows per Solr cursor page when building from Solr
+
+# Norm designation: §/§§, Art/Art./Artikel or Anlage/Anlagen followed by a number
+# ("823", "1a") or a roman numeral (Anlage IV)
+_KIND = r"(?P<kind>§§?|art(?:ikel|\.)?|anlagen?)"
+_NUMBER = r"\d+[a-z]?|[ivxlc]+"
+_CITATION_RE = re.compile(
+    r"^(?:(?P<before>.+?)\s+)?" + _KIND +
+    r"\s*(?P<first>" + _NUMBER + r")(?!\w)"
+    r"(?:\s*(?:-|–|bis)\s*(?P<last>" + _NUMBER + r")(?!\w))?"
+    # Paragraph, sentence and number qualifiers point into the norm and are ignored
+    r"(?:\s+(?:abs\.?|absatz|s\.|satz|nr\.?|nummer|buchst\.?)\s*\w+)*"
+    r"(?:\s+(?P<after>.+))?$",
+    re.IGNORECASE,
+)
+_ENBEZ_RE = re.compile(r"^" + _KIND + r"\s*(?P<number>" + _NUMBER + r")?(?!\w)", re.IGNORECASE)
+_LEADING_DIGITS_RE = re.compile(r"^(\d+)(.*)$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class Citation(NamedTuple):
+    """A parsed citation: kind ("§", "Art", "Anlage"), first and optional last number, abbreviation."""
+    kind: str
+    first: str
+    last: Optional[str]
+    abbreviation: str
+
+
+def _canonical_kind(kind: str) -> str:
+    """Map the spelling of a norm kind to "§", "Art" or "Anlage"."""
+    kind = kind.lower()
+    if kind.startswith("§"):
+        return "§"
+    if kind.startswith("art"):
+        return "Art"
+    return "Anlage"
+
+
+def normalize_abbreviation(abbreviation: str) -> str:
+    """Normalize a law abbreviation (jurabk/amtabk) for lookups."""
+    return _WHITESPACE_RE.sub(" ", abbreviation).strip().rstrip(".").lower()
+
+
+def normalize_enbez(enbez: str) -> Optional[Tuple[str, str]]:
+    """Normalize a norm designation to (kind, number).
+
+    Args:
+        enbez: Designation as stored in Solr, e.g. "§ 823", "Art 1", "Anlage 2"
+
+    Returns:
+        Tuple of (kind, lowercased number), or None if it is not a §, article or annex
+        designation ("Anlage" without number has number "")
+    """
+    match = _ENBEZ_RE.match(enbez.strip())
+    if not match:
+        return None
+    kind = _canonical_kind(match.group("kind"))
+    number = (match.group("number") or "").lower()
+    if not number and kind != "Anlage":
+        return None
+    return kind, number
+
+
+def parse_citation(query: str) -> Optional[Citation]:
+    """Recognize a query that consists of a single citation.
+
+    The abbreviation may follow ("§ 823 BGB") or precede ("BGB § 823") the norm.
+
+    Args:
+        query: Search query text
+
+    Returns:
+        The parsed citation, or None if the query is not a pure citation
+    """
+    match = _CITATION_RE.match(query.strip())
+    if not match:
+        return None
+    before, after = match.group("before"), match.group("after")
+    # Reason: exactly one side may hold the abbreviation; text on both sides is a normal query
+    if bool(before) == bool(after):
+        return None
+    return Citation(
+        kind=_canonical_kind(match.group("kind")),
+        first=match.group("first").lower(),
+        last=match.group("last").lower() if match.group("last") else None,
+        abbreviation=normalize_abbreviation(before or after),
+    )
+
+
+def _number_sort_key(number: str) -> Tuple[int, str]:
+    """Sort key for norm numbers: numeric part first, then the letter suffix."""
+    match = _LEADING_DIGITS_RE.match(number)
+    return (int(match.group(1)), match.group(2)) if match else (-1, number)
+
+
+class CitationIndex:
+    """In-memory (abbreviation, norm designation) -> document ID index."""
+
+    def __init__(self, entries: Iterable[Tuple[str, str, str]] = ()):
+        """Initialize the index.
+
+        Args:
+            entries: (abbreviation, enbez, document ID) triples
+        """
+        self._norms: Dict[str, Dict[Tuple[str, str], List[str]]] = {}
+        self.entries = 0
+        self.lookups = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        for abbreviation, enbez, doc_id in entries:
+            self.add(abbreviation, enbez, doc_id)
+
+    def __len__(self) -> int:
+        return self.entries
+
+    def add(self, abbreviation: str, enbez: str, doc_id: str) -> bool:
+        """Add a norm to the index.
+
+        Args:
+            abbreviation: jurabk or amtabk of the law
+            enbez: Norm designation
+            doc_id: Solr document ID
+
+        Returns:
+            True if the designation is a citable norm and was added
+        """
+        key = normalize_enbez(enbez)
+        if key is None or not abbreviation.strip():
+            return False
+        doc_ids = self._norms.setdefault(normalize_abbreviation(abbreviation), {}).setdefault(key, [])
+        if doc_id not in doc_ids:
+            doc_ids.append(doc_id)
+            self.entries += 1
+        return True
+
+    def lookup(self, citation: Citation) -> Optional[List[str]]:
+        """Resolve a parsed citation to document IDs.
+
+        Args:
+            citation: Parsed citation
+
+        Returns:
+            Document IDs in norm order, or None if the abbreviation or norm is unknown
+            or the range is too large
+        """
+        norms = self._norms.get(citation.abbreviation)
+        if norms is None:
+            return None
+
+        if citation.last is None:
+            return list(norms.get((citation.kind, citation.first), [])) or None
+
+        low, high = _number_sort_key(citation.first), _number_sort_key(citation.last)
+        if low[0] < 0 or high[0] < 0 or high < low:
+            return None  # Roman numeral or reversed ranges
+        numbers = sorted((number for kind, number in norms
+                          if kind == citation.kind and low <= _number_sort_key(number) <= high),
+                         key=_number_sort_key)
+        if not numbers or len(numbers) > MAX_RANGE_NORMS:
+            return None
+        return [doc_id for number in numbers for doc_id in norms[(citation.kind, number)]]
+
+    def resolve(self, query: str) -> Optional[List[str]]:
+        """Resolve a citation query to document IDs.
+
+        Args:
+            query: Search query text
+
+        Returns:
+            Document IDs, or None if the query is not a citation found in the index
+        """
+        citation = parse_citation(query)
+        if citation is None:
+            return None
+        doc_ids = self.lookup(citation)
+        with self._lock:
+            self.lookups += 1
+            if doc_ids:
+                self.hits += 1
+        return doc_ids
+
+    def stats(self) -> Dict:
+        """Return size and lookup counters."""
+        with self._lock:
+            return {
+                "abbreviations": len(self._norms),
+                "norms": self.entries,
+                "lookups": self.lookups,
+                "hits": self.hits,
+            }
+
+    def save(self, path: str) -> None:
+        """Write the index as JSON.
+
+        Args:
+            path: Output file
+        """
+        entries = [
+            [abbreviation, f"{kind} {number}".strip(), doc_id]
+            for abbreviation, norms in self._norms.items()
+            for (kind, number), doc_ids in norms.items()
+            for doc_id in doc_ids
+        ]
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Reason: write to a temporary file first so a running service never reads a partial index
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": CITATION_INDEX_FORMAT, "created_at": time.time(), "entries": entries},
+                      f, ensure_ascii=False)
+        os.replace(temp_path, path)
+        logger.info(f"Citation index with {self.entries} norms written to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "CitationIndex":
+        """Load an index written by save() (or by solr_import_norms.py).
+
+        Args:
+            path: Index file
+
+        Returns:
+            The loaded index
+
+        Raises:
+            ValueError: If the file has an unsupported format
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") != CITATION_INDEX_FORMAT:
+            raise ValueError(f"Unsupported citation index format {data.get('format')} in {path}")
+        index = cls(tuple(entry) for entry in data["entries"])
+        logger.info(f"Loaded citation index with {index.entries} norms "
+                    f"for {len(index._norms)} abbreviations from {path}")
+        return index
+
+
+def build_from_solr(solr_url: str = DEFAULT_SOLR_ENDPOINT, timeout: float = 30) -> CitationIndex:
+    """Build the index from all norms in a Solr core.
+
+    Args:
+        solr_url: Solr core URL
+        timeout: Timeout per request in seconds
+
+    Returns:
+        The built index
+    """
+    index = CitationIndex()
+    cursor_mark = "*"
+    while True:
+        response = requests.get(f"{solr_url}/select", params={
+            "q": "enbez:*",
+            "fl": "id,enbez,jurabk,amtabk",
+            "sort": "id asc",
+            "rows": EXPORT_BATCH_SIZE,
+            "cursorMark": cursor_mark,
+            "wt": "json",
+        }, timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+        for doc in data["response"]["docs"]:
+            for abbreviation in norm_abbreviations(doc):
+                index.add(abbreviation, doc["enbez"], doc["id"])
+        if data["nextCursorMark"] == cursor_mark:
+            break
+        cursor_mark = data["nextCursorMark"]
+    return index
+
+
+def norm_abbreviations(doc: Dict) -> List[str]:
+    """Return the abbreviations (jurabk and amtabk) a norm can be cited with."""
+    abbreviations = []
+    for field in ("jurabk", "amtabk"):
+        values = doc.get(field) or []
+        for value in [values] if isinstance(values, str) else values:
+            if value and value not in abbreviations:
+                abbreviations.append(value)
+    return abbreviations
+
+
+def main():
+    """Main function to build or query a citation index."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Build or query the citation index")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Build the index from Solr and write it to this file")
+    parser.add_argument("--solr", type=str, default=os.environ.get("SOLR_ENDPOINT", DEFAULT_SOLR_ENDPOINT),
+                        help="Solr endpoint URL (default: SOLR_ENDPOINT env or localhost)")
+    parser.add_argument("--index", type=str, default=None,
+                        help="Index file to resolve --query against")
+    parser.add_argument("--query", type=str, default=None,
+                        help="Citation to resolve, e.g. \"§ 823 BGB\"")
+    args = parser.parse_args()
+
+    if not args.output and not (args.index and args.query):
+        parser.error("either --output or --index with --query is required")
+
+    try:
+        if args.output:
+            build_from_solr(args.solr).save(args.output)
+        if args.index and args.query:
+            print(json.dumps({"query": args.query, "ids": CitationIndex.load(args.index).resolve(args.query)},
+                             ensure_ascii=False))
+    except Exception as e:
+        logger.error(f"Citation index error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Qdrant Collection Aliases
+
+Helpers for blue/green reindexing. The indexer builds into a versioned collection
+(e.g. "deutsche_gesetze_v2025_10_17"), and searchers query the stable alias
+"deutsche_gesetze". Once a rebuild has been validated the alias is repointed
+atomically, so searches never see an empty or half-built collection. Old versions
+are garbage-collected afterwards.
+"""
+
+import logging
+from datetime import date
+from typing import List, Optional, Tuple
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qdrant_models
+
+logger = logging.getLogger(__name__)
+
+VERSION_MARKER = "_v"  # Separates the alias name from the version suffix
+
+
+def versioned_collection_name(alias: str, existing: List[str], build_date: Optional[date] = None) -> str:
+    """Build the name of a new collection version for an alias.
+
+    Args:
+        alias: Alias the searchers use (e.g. "deutsche_gesetze")
+        existing: Names of the collections that already exist
+        build_date: Date of the build (default: today)
+
+    Returns:
+        A collection name like "deutsche_gesetze_v2025_10_17" that does not exist yet;
+        repeated builds on the same day get a counter suffix ("..._v2025_10_17_2")
+    """
+    build_date = build_date or date.today()
+    name = f"{alias}{VERSION_MARKER}{build_date.strftime('%Y_%m_%d')}"
+    candidate = name
+    counter = 2
+    while candidate in existing:
+        candidate = f"{name}_{counter}"
+        counter += 1
+    return candidate
+
+
+def version_key(name: str, alias: str) -> Tuple[str, int]:
+    """Sort key of a collection version: (build date, same-day counter).
+
+    The counter is not zero-padded, so "..._v2025_10_17_10" has to sort after
+    "..._v2025_10_17_2"; the first build of a day has counter 1.
+
+    Args:
+        name: Versioned collection name
+        alias: Alias the version belongs to
+
+    Returns:
+        Tuple of the zero-padded date suffix and the counter
+    """
+    parts = name[len(f"{alias}{VERSION_MARKER}"):].split("_")
+    build_date = "_".join(parts[:3])
+    counter = parts[3] if len(parts) > 3 else "1"
+    return build_date, int(counter) if counter.isdigit() else 0
+
+
+def list_collection_versions(client: QdrantClient, alias: str) -> List[str]:
+    """List all versioned collections that belong to an alias, oldest first.
+
+    Args:
+        client: Qdrant client
+        alias: Alias name
+
+    Returns:
+        Sorted list of collection names
+    """
+    prefix = f"{alias}{VERSION_MARKER}"
+    names = [c.name for c in client.get_collections().collections]
+    return sorted((name for name in names if name.startswith(prefix)), key=lambda name: version_key(name, alias))
+
+
+def resolve_alias(client: QdrantClient, alias: str) -> Optional[str]:
+    """Return the collection an alias currently points to.
+
+    Args:
+        client: Qdrant client
+        alias: Alias name
+
+    Returns:
+        Collection name, or None if the alias does not exist
+    """
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def point_alias_to(client: QdrantClient, alias: str, collection: str) -> None:
+    """Atomically repoint an alias to a collection.
+
+    If a plain collection with the alias name exists (layout before blue/green
+    reindexing), it has to be deleted first because aliases and collections share
+    one namespace. This one-time migration is the only non-atomic step.
+
+    Args:
+        client: Qdrant client
+        alias: Alias name
+        collection: Collection the alias should point to
+    """
+    current = resolve_alias(client, alias)
+    operations = []
+
+    if current is not None:
+        operations.append(qdrant_models.DeleteAliasOperation(
+            delete_alias=qdrant_models.DeleteAlias(alias_name=alias)))
+    elif alias in [c.name for c in client.get_collections().collections]:
+        logger.warning(f"Replacing legacy collection '{alias}' with an alias (one-time migration)")
+        client.delete_collection(alias)
+
+    operations.append(qdrant_models.CreateAliasOperation(
+        create_alias=qdrant_models.CreateAlias(collection_name=collection, alias_name=alias)))
+
+    # Delete and create run in a single request, which Qdrant applies atomically
+    client.update_collection_aliases(change_aliases_operations=operations)
+    logger.info(f"Alias '{alias}' now points to '{collection}' (was: {current or 'none'})")
+
+
+def garbage_collect_versions(client: QdrantClient, alias: str, keep: int = 2) -> List[str]:
+    """Delete old collection versions of an alias.
+
+    The live collection is always kept, together with the newest `keep - 1` versions
+    older than it (rollback candidates). Versions newer than the live one are builds
+    that were never published and are deleted as well.
+
+    Args:
+        client: Qdrant client
+        alias: Alias name
+        keep: Number of versions to keep, including the live one
+
+    Returns:
+        Names of the deleted collections
+    """
+    live = resolve_alias(client, alias)
+    if live is None:
+        logger.warning(f"Alias '{alias}' does not exist, skipping garbage collection")
+        return []
+
+    versions = list_collection_versions(client, alias)
+    older = [name for name in versions if version_key(name, alias) < version_key(live, alias)]
+    keep_older = older[-(keep - 1):] if keep > 1 else []
+    obsolete = [name for name in versions if name != live and name not in keep_older]
+
+    for name in obsolete:
+        logger.info(f"Deleting old collection version '{name}'")
+        client.delete_collection(name)
+
+    return obsolete
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Fusion Strategy Comparison
+
+Offline comparison of the fusion strategies in fusion.py across candidate pool sizes.
+For every query and pool size the Solr and Qdrant candidates are retrieved once
+(query embeddings are warmed up first, so the timing reflects the Solr and Qdrant
+cost of the pool), then every strategy fuses them.
+
+Quality is measured against relevance judgements when the query file provides
+"relevant_ids" (recall@k, MRR@k, nDCG@k). Without judgements, overlap@k with the
+reference ranking (legacy sigmoid fusion at the largest pool) is reported.
+
+Usage:
+    python3 compare_fusion.py [--pools 10,20,30,60] [--k 10] [--queries-file queries.jsonl]
+
+Options:
+    --pools         Comma-separated candidate pool sizes per side
+    --strategies    Comma-separated strategies (default: all)
+    --k             Cut-off for the quality metrics (default: 10)
+    --queries-file  Query file (text or JSONL), default: built-in German legal queries
+    --output        Write the report as JSON to this file
+    --docker        Use Docker network endpoints instead of localhost
+"""
+
+import argparse
+import json
+import logging
+import math
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import hybrid_search
+from fusion import FUSION_STRATEGIES, fuse
+from query_sets import default_queries, load_queries
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_STRATEGY = "sigmoid"  # Legacy fusion at the largest pool is the reference ranking
+
+
+def quality_metrics(ranking: List[str], relevant_ids: Optional[List[str]], reference: List[str], k: int) -> Dict:
+    """Compute the quality metrics of one ranking.
+
+    Args:
+        ranking: Ranked document IDs
+        relevant_ids: Judged relevant IDs, or None if the query has no judgements
+        reference: Reference ranking used when there are no judgements
+        k: Cut-off
+
+    Returns:
+        Dict with recall, mrr and ndcg (judged) or overlap (unjudged)
+    """
+    top = ranking[:k]
+    if relevant_ids:
+        relevant = set(relevant_ids)
+        hits = [1.0 if doc_id in relevant else 0.0 for doc_id in top]
+        first_hit = next((rank for rank, hit in enumerate(hits, start=1) if hit), None)
+        dcg = sum(hit / math.log2(rank + 1) for rank, hit in enumerate(hits, start=1))
+        ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(len(relevant), k) + 1))
+        return {
+            "recall": sum(hits) / len(relevant),
+            "mrr": 1.0 / first_hit if first_hit else 0.0,
+            "ndcg": dcg / ideal if ideal else 0.0,
+        }
+
+    expected = set(reference[:k])
+    return {"overlap": len(set(top) & expected) / len(expected) if expected else 1.0}
+
+
+def compare(searcher: "hybrid_search.HybridSearcher", queries: List[Dict], pools: List[int],
+            strategies: List[str], k: int) -> List[Dict]:
+    """Run all queries for every pool size and strategy.
+
+    Args:
+        searcher: Hybrid searcher used for retrieval
+        queries: Query dicts (with optional "relevant_ids")
+        pools: Candidate pool sizes per side
+        strategies: Fusion strategies to compare
+        k: Cut-off for the quality metrics
+
+    Returns:
+        One report row per (strategy, pool) with averaged metrics and latencies
+    """
+    weights = (searcher.keyword_weight, searcher.semantic_weight)
+
+    # Warm up query embeddings so every pool size pays the same embedding cost
+    for entry in queries:
+        searcher.generate_embedding(entry["query"])
+
+    candidates = {}  # (query index, pool) -> (keyword results, semantic results)
+    retrieval_ms = {pool: [] for pool in pools}
+    for index, entry in enumerate(queries):
+        for pool in pools:
+            start_time = time.perf_counter()
+            keyword_results, semantic_results, _ = searcher.retrieve_candidates(entry["query"], pool)
+            candidates[(index, pool)] = (keyword_results, semantic_results)
+            retrieval_ms[pool].append((time.perf_counter() - start_time) * 1000)
+
+    references = []
+    for index in range(len(queries)):
+        keyword_results, semantic_results = candidates[(index, max(pools))]
+        references.append([doc_id for doc_id, _ in fuse(REFERENCE_STRATEGY, keyword_results,
+                                                         semantic_results, *weights)])
+
+    report = []
+    for strategy in strategies:
+        for pool in pools:
+            metrics: Dict[str, List[float]] = {}
+            fusion_ms = []
+            for index, entry in enumerate(queries):
+                keyword_results, semantic_results = candidates[(index, pool)]
+                start_time = time.perf_counter()
+                ranking = [doc_id for doc_id, _ in fuse(strategy, keyword_results, semantic_results, *weights)]
+                fusion_ms.append((time.perf_counter() - start_time) * 1000)
+                for name, value in quality_metrics(ranking, entry.get("relevant_ids"),
+                                                   references[index], k).items():
+                    metrics.setdefault(name, []).append(value)
+
+            row = {"strategy": strategy, "pool": pool}
+            row.update({name: float(np.mean(values)) for name, values in metrics.items()})
+            row.update({
+                "retrieval_p50_ms": float(np.percentile(retrieval_ms[pool], 50)),
+                "retrieval_p95_ms": float(np.percentile(retrieval_ms[pool], 95)),
+                "fusion_p50_ms": float(np.percentile(fusion_ms, 50)),
+            })
+            report.append(row)
+    return report
+
+
+def main():
+    """Main function to run the comparison."""
+    parser = argparse.ArgumentParser(description="Compare fusion strategies and candidate pool sizes")
+    parser.add_argument("--pools", type=str, default="10,20,30,60",
+                        help="Comma-separated candidate pool sizes per side (default: 10,20,30,60)")
+    parser.add_argument("--strategies", type=str, default=",".join(FUSION_STRATEGIES),
+                        help=f"Comma-separated fusion strategies (default: {','.join(FUSION_STRATEGIES)})")
+    parser.add_argument("--k", type=int, default=10,
+                        help="Cut-off for the quality metrics (default: 10)")
+    parser.add_argument("--queries-file", type=str, default=None,
+                        help="Query file, one query per line or JSONL with optional relevant_ids")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Write the report as JSON to this file")
+    parser.add_argument("--docker", action="store_true",
+                        help="Use Docker network endpoints instead of localhost")
+    args = parser.parse_args()
+
+    if args.docker:
+        hybrid_search.QDRANT_ENDPOINT = hybrid_search.DOCKER_QDRANT_ENDPOINT
+        hybrid_search.OLLAMA_ENDPOINTS = hybrid_search.DOCKER_OLLAMA_ENDPOINT
+        hybrid_search.SOLR_ENDPOINT = hybrid_search.DOCKER_SOLR_ENDPOINT
+
+    try:
+        pools = sorted(int(p) for p in args.pools.split(","))
+        strategies = [s.strip() for s in args.strategies.split(",") if s.strip()]
+        unknown = [s for s in strategies if s not in FUSION_STRATEGIES]
+        if unknown:
+            parser.error(f"Unknown fusion strategies: {', '.join(unknown)}")
+
+        queries = load_queries(args.queries_file) if args.queries_file else default_queries()
+        judged = any(entry.get("relevant_ids") for entry in queries)
+        logger.info(f"Comparing {len(strategies)} strategies over {len(queries)} queries, pools {pools}, "
+                    f"{'judged' if judged else f'overlap with {REFERENCE_STRATEGY}@{max(pools)}'}")
+
+        report = compare(hybrid_search.HybridSearcher(), queries, pools, strategies, args.k)
+
+        quality_columns = ["recall", "mrr", "ndcg"] if judged else ["overlap"]
+        header = f"{'strategy':>9} {'pool':>5} " + " ".join(f"{c + '@' + str(args.k):>10}" for c in quality_columns)
+        print(f"\n{header} {'retr p50':>9} {'retr p95':>9} {'fuse p50':>9}")
+        for row in report:
+            quality = " ".join(f"{row.get(c, 0.0):>10.3f}" for c in quality_columns)
+            print(f"{row['strategy']:>9} {row['pool']:>5} {quality} {row['retrieval_p50_ms']:>9.1f} "
+                  f"{row['retrieval_p95_ms']:>9.1f} {row['fusion_p50_ms']:>9.3f}")
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"k": args.k, "queries": len(queries), "judged": judged, "results": report}, f, indent=2)
+            logger.info(f"Report written to {args.output}")
+
+    except Exception as e:
+        logger.error(f"Error during comparison: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Query Embedding Batcher
+
+Micro-batching and singleflight for query embeddings. Under load many searches need
+an embedding at the same moment; instead of one Ollama /api/embeddings call each, the
+batcher collects the texts that arrive within a few milliseconds and sends them as one
+multi-input /api/embed call. Identical texts already queued or in flight share one
+result (singleflight), so a burst of the same query costs one embedding.
+
+Batches form under load only: while no batch is in flight, a text is sent at once, so
+an idle service pays no extra wait. While batches are in flight, new texts wait up to
+`max_wait_ms` for company, and while all `workers` are busy they queue up and leave
+together as soon as one is free.
+
+Usage:
+    batcher = EmbeddingBatcher(embed_batch, max_batch=32, max_wait_ms=5, workers=4)
+    embedding = batcher.embed("Kündigungsfrist Mietvertrag", timeout=2.0)   # None on failure
+    future = batcher.submit("Kündigungsfrist Mietvertrag")                  # concurrent.futures.Future
+
+`embed_batch(texts, timeout)` sends one request and returns one embedding (or None)
+per text; exceptions fail all texts of the batch.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional
+
+from search_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 32  # Texts per Ollama request
+DEFAULT_MAX_WAIT_MS = 5.0  # How long a text waits for company while other batches are in flight
+DEFAULT_WORKERS = 4  # Batch requests in flight at the same time
+DEFAULT_TIMEOUT_SECONDS = 10.0  # Request timeout of a batch when no caller passes one
+
+EmbedBatch = Callable[[List[str], float], List[Optional[List[float]]]]
+
+
+class _Pending:
+    """One queued text and the callers waiting for it."""
+
+    __slots__ = ("text", "future", "timeout")
+
+    def __init__(self, text: str, timeout: float):
+        self.text = text
+        self.future: Future = Future()
+        self.timeout = timeout
+
+
+class EmbeddingBatcher:
+    """Collects concurrent embedding requests into batched calls (thread-safe)."""
+
+    def __init__(self, embed_batch: EmbedBatch, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS, workers: int = DEFAULT_WORKERS):
+        """Start the dispatcher thread.
+
+        Args:
+            embed_batch: Function sending one batch: (texts, timeout) -> one embedding or None per text
+            max_batch: Maximum texts per call
+            max_wait_ms: Collection window while other batches are in flight (0 sends what is queued)
+            workers: Maximum batch calls in flight
+
+        Raises:
+            ValueError: If max_batch or workers is not positive or max_wait_ms is negative
+        """
+        if max_batch <= 0 or workers <= 0:
+            raise ValueError("max_batch and workers must be positive")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must not be negative")
+        self.embed_batch = embed_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.workers = workers
+
+        self._lock = threading.Condition()
+        self._queue: List[_Pending] = []
+        self._pending: Dict[str, _Pending] = {}  # Normalized text -> queued or in-flight request
+        self._in_flight = 0
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedding-batch")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="embedding-batcher", daemon=True)
+
+        self.requests = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.max_batch_seen = 0
+        self.failed_batches = 0
+        self._dispatcher.start()
+
+    def submit(self, text: str, timeout: float = DEFAULT_TIMEOUT_SECONDS) -> Future:
+        """Queue a text, or join the identical request that is already queued or in flight.
+
+        Args:
+            text: Query text
+            timeout: Request timeout the caller can afford; a batch uses the largest of its texts
+
+        Returns:
+            Future resolving to the embedding (or None)
+
+        Raises:
+            RuntimeError: If the batcher is closed
+        """
+        key = normalize_query(text)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Embedding batcher is closed")
+            self.requests += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                pending.timeout = max(pending.timeout, timeout)
+                return pending.future
+            pending = _Pending(text, timeout)
+            self._pending[key] = pending
+            self._queue.append(pending)
+            self._lock.notify_all()
+            return pending.future
+
+    def embed(self, text: str, timeout: float = DEFAULT_TIMEOUT_SECONDS) -> Optional[List[float]]:
+        """Embed one text through the batcher and wait for the result.
+
+        Args:
+            text: Query text
+            timeout: Maximum time in seconds to wait, including the time in the queue
+
+        Returns:
+            The embedding, or None if the batch failed or the timeout expired
+        """
+        try:
+            return self.submit(text, timeout).result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.warning(f"Batched embedding did not arrive within {timeout:.2f} seconds")
+        except Exception as e:
+            logger.error(f"Batched embedding failed: {e}")
+        return None
+
+    def _dispatch_loop(self) -> None:
+        """Form batches from the queue and hand them to the workers."""
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._lock.wait()
+                if self._closed and not self._queue:
+                    return
+
+                # Reason: with nothing in flight a text leaves at once, so batching adds no latency at low load
+                if self._in_flight > 0 and self.max_wait > 0:
+                    window_end = time.monotonic() + self.max_wait
+                    while len(self._queue) < self.max_batch and not self._closed:
+                        remaining = window_end - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._lock.wait(remaining)
+                # All workers busy: keep collecting until one is free
+                while self._in_flight >= self.workers and not self._closed:
+                    self._lock.wait()
+
+                batch = self._queue[:self.max_batch]
+                del self._queue[:len(batch)]
+                self._in_flight += 1
+                self.batches += 1
+                self.batched_texts += len(batch)
+                self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[_Pending]) -> None:
+        """Send one batch and resolve the futures of its texts."""
+        try:
+            embeddings = self.embed_batch([pending.text for pending in batch],
+                                          max(pending.timeout for pending in batch))
+            if len(embeddings) != len(batch):
+                raise ValueError(f"Got {len(embeddings)} embeddings for {len(batch)} texts")
+            error = None
+        except Exception as e:
+            embeddings = None
+            error = e
+
+        with self._lock:
+            # Reason: drop the singleflight entries before resolving, so later callers start a fresh request
+            for pending in batch:
+                self._pending.pop(normalize_query(pending.text), None)
+            self._in_flight -= 1
+            if error is not None:
+                self.failed_batches += 1
+            self._lock.notify_all()
+
+        for position, pending in enumerate(batch):
+            if error is not None:
+                pending.future.set_exception(error)
+            else:
+                pending.future.set_result(embeddings[position])
+
+    def close(self) -> None:
+        """Send the queued texts, then stop the dispatcher and the workers."""
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict:
+        """Return batching statistics.
+
+        Returns:
+            Dict with requests, coalesced (singleflight) requests, batches and batch sizes
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "batches": self.batches,
+                "failed_batches": self.failed_batches,
+                "mean_batch_size": self.batched_texts / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_seen,
+                "queued": len(self._queue),
+                "in_flight": self._in_flight,
+            }
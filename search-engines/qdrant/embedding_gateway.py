@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Embedding Gateway
+
+HTTP proxy in front of an Ollama host that schedules model requests by priority class.
+Search and indexing share the same Ollama instance. Without the gateway, a query
+embedding of the hybrid search queues behind the norm embeddings of a running reindex
+and runs into its timeout.
+
+Priority classes (highest first):
+    interactive  Query embeddings of HybridSearcher / the search service
+    batch        Norm embeddings and summaries of qdrant_indexer.py
+
+Clients name their class in the `X-Embedding-Priority` header (HybridSearcher and the
+indexer do), or through a path prefix for clients that cannot set headers
+(`http://gateway:11435/batch/api/embed`). Requests without a class are batch traffic.
+
+Scheduling:
+- At most `slots` model requests are in flight at Ollama (match OLLAMA_NUM_PARALLEL).
+- A free slot goes to the oldest request of the highest waiting class.
+- While interactive traffic is present (in flight, waiting, or seen within the last
+  `idle_seconds`), batch traffic is limited to `batch_slots` requests in flight, so
+  one slot stays free for the next query. The indexer thus yields capacity on its own
+  and gets all slots back once search traffic stops.
+- A batch request that has waited `max_batch_wait` seconds ignores the limit, so a
+  reindex still makes progress under constant search traffic.
+
+Only model requests (/api/embed, /api/embeddings, /api/generate, /api/chat) are scheduled;
+everything else (/api/tags, /api/ps, ...) is passed through. Responses are buffered,
+so streaming generate/chat responses arrive in one piece.
+
+Usage:
+    python3 embedding_gateway.py [--upstream http://localhost:11434] [--port 11435] [--slots 1]
+    OLLAMA_ENDPOINT=http://localhost:11435 python3 hybrid_search.py --serve
+    python3 qdrant_indexer.py --ollama-hosts http://localhost:11435
+
+Endpoints:
+    GET /gateway/stats    Queue lengths, in-flight requests and wait times per class
+    *   /api/...          Proxied to Ollama
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HEADER = "X-Embedding-Priority"  # Request header naming the priority class
+PRIORITY_CLASSES = ("interactive", "batch")  # Highest priority first
+DEFAULT_PRIORITY = "batch"  # Class of requests that do not name one
+SCHEDULED_PATHS = ("/api/embed", "/api/embeddings", "/api/generate", "/api/chat")  # Model requests taking a slot
+
+DEFAULT_UPSTREAM = os.environ.get("OLLAMA_UPSTREAM", "http://localhost:11434")
+DOCKER_UPSTREAM = "http://ollama:11434"
+DEFAULT_GATEWAY_PORT = int(os.environ.get("EMBEDDING_GATEWAY_PORT", "11435"))
+DEFAULT_SLOTS = int(os.environ.get("EMBEDDING_GATEWAY_SLOTS", "1"))  # Model requests in flight at Ollama
+DEFAULT_IDLE_SECONDS = 5.0  # Interactive traffic counts as present this long after its last request
+DEFAULT_MAX_BATCH_WAIT = 30.0  # Batch requests waiting longer than this ignore the batch limit
+QUEUE_TIMEOUT_SECONDS = 120  # Requests waiting longer for a slot are answered with 503
+UPSTREAM_TIMEOUT_SECONDS = 300  # Timeout of proxied requests (long summaries on CPU hosts)
+MAX_BODY_SIZE = 16 * 1024 * 1024  # Upper bound for request bodies
+
+
+class QueueTimeoutError(Exception):
+    """Raised when a request does not get a slot within its queue timeout."""
+
+
+class PriorityScheduler:
+    """Hands out a fixed number of slots by priority class, with per-class limits under load."""
+
+    def __init__(self, slots: int = DEFAULT_SLOTS, batch_slots: Optional[int] = None,
+                 idle_seconds: float = DEFAULT_IDLE_SECONDS, max_batch_wait: float = DEFAULT_MAX_BATCH_WAIT):
+        """Initialize the scheduler.
+
+        Args:
+            slots: Requests in flight at the same time
+            batch_slots: Batch requests in flight while interactive traffic is present
+                (default: slots - 1, so one slot stays free for queries)
+            idle_seconds: How long interactive traffic counts as present after its last request
+            max_batch_wait: Waiting time after which a batch request ignores batch_slots
+
+        Raises:
+            ValueError: If slots is not positive or batch_slots is negative
+        """
+        if slots <= 0:
+            raise ValueError("slots must be positive")
+        self.slots = slots
+        self.batch_slots = max(slots - 1, 0) if batch_slots is None else batch_slots
+        if self.batch_slots < 0:
+            raise ValueError("batch_slots must not be negative")
+        self.idle_seconds = idle_seconds
+        self.max_batch_wait = max_batch_wait
+
+        self._condition = threading.Condition()
+        # Waiting requests per class as (enqueue time, sequence number) tickets, oldest first
+        self._waiting: Dict[str, Deque[Tuple[float, int]]] = {name: deque() for name in PRIORITY_CLASSES}
+        self._sequence = itertools.count()
+        self._in_flight = {name: 0 for name in PRIORITY_CLASSES}
+        self._last_interactive = 0.0
+        self.granted = {name: 0 for name in PRIORITY_CLASSES}
+        self.timeouts = {name: 0 for name in PRIORITY_CLASSES}
+        self.wait_seconds = {name: 0.0 for name in PRIORITY_CLASSES}
+        self.max_wait_seconds = {name: 0.0 for name in PRIORITY_CLASSES}
+
+    def interactive_present(self, now: Optional[float] = None) -> bool:
+        """Check whether search traffic is present (in flight, waiting or recently seen)."""
+        now = time.monotonic() if now is None else now
+        return (self._in_flight["interactive"] > 0 or bool(self._waiting["interactive"])
+                or now - self._last_interactive < self.idle_seconds)
+
+    def _may_start(self, priority: str, ticket: Tuple[float, int], now: float) -> bool:
+        """Check whether the waiting request with this ticket gets the next slot (lock held)."""
+        if sum(self._in_flight.values()) >= self.slots or self._waiting[priority][0] != ticket:
+            return False
+        aged = priority == "batch" and now - ticket[0] >= self.max_batch_wait
+        if aged:
+            return True
+        rank = PRIORITY_CLASSES.index(priority)
+        if any(self._waiting[name] for name in PRIORITY_CLASSES[:rank]):
+            return False
+        if priority == "batch" and self.interactive_present(now):
+            return self._in_flight["batch"] < self.batch_slots
+        return True
+
+    def acquire(self, priority: str, timeout: float = QUEUE_TIMEOUT_SECONDS) -> float:
+        """Wait for a slot.
+
+        Args:
+            priority: One of PRIORITY_CLASSES
+            timeout: Maximum waiting time in seconds
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            ValueError: If the priority class is unknown
+            QueueTimeoutError: If no slot became free within the timeout
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class '{priority}', expected one of {', '.join(PRIORITY_CLASSES)}")
+        with self._condition:
+            ticket = (time.monotonic(), next(self._sequence))
+            if priority == "interactive":
+                self._last_interactive = ticket[0]
+            self._waiting[priority].append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._may_start(priority, ticket, now):
+                        break
+                    if now - ticket[0] >= timeout:
+                        self.timeouts[priority] += 1
+                        raise QueueTimeoutError(f"No Ollama slot for {priority} request within {timeout:.0f} seconds")
+                    # Reason: the idle window and batch aging change eligibility without a release, so re-check periodically
+                    self._condition.wait(min(timeout - (now - ticket[0]), 0.5))
+            finally:
+                self._waiting[priority].remove(ticket)
+                self._condition.notify_all()
+
+            waited = time.monotonic() - ticket[0]
+            self._in_flight[priority] += 1
+            self.granted[priority] += 1
+            self.wait_seconds[priority] += waited
+            self.max_wait_seconds[priority] = max(self.max_wait_seconds[priority], waited)
+            return waited
+
+    def release(self, priority: str) -> None:
+        """Return a slot taken with acquire()."""
+        with self._condition:
+            self._in_flight[priority] -= 1
+            if priority == "interactive":
+                self._last_interactive = time.monotonic()
+            self._condition.notify_all()
+
+    def stats(self) -> Dict:
+        """Return per-class queue statistics.
+
+        Returns:
+            Dict with slot configuration and one entry per priority class
+        """
+        with self._condition:
+            return {
+                "slots": self.slots,
+                "batch_slots_under_load": self.batch_slots,
+                "interactive_present": self.interactive_present(),
+                "classes": {name: {
+                    "waiting": len(self._waiting[name]),
+                    "in_flight": self._in_flight[name],
+                    "granted": self.granted[name],
+                    "timeouts": self.timeouts[name],
+                    "mean_wait_ms": 1000 * self.wait_seconds[name] / self.granted[name] if self.granted[name] else 0.0,
+                    "max_wait_ms": 1000 * self.max_wait_seconds[name],
+                } for name in PRIORITY_CLASSES},
+            }
+
+
+def request_priority(path: str, header: Optional[str]) -> Tuple[str, str]:
+    """Determine the priority class of a request and the upstream path.
+
+    Args:
+        path: Request path, optionally prefixed with a class name (/batch/api/embed)
+        header: Value of the PRIORITY_HEADER header
+
+    Returns:
+        Tuple of (priority class, path without class prefix)
+
+    Raises:
+        ValueError: If the header names an unknown class
+    """
+    for name in PRIORITY_CLASSES:
+        if path.startswith(f"/{name}/"):
+            return name, path[len(name) + 1:]
+    if header:
+        priority = header.strip().lower()
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class '{header}', expected one of {', '.join(PRIORITY_CLASSES)}")
+        return priority, path
+    return DEFAULT_PRIORITY, path
+
+
+class EmbeddingGatewayHandler(BaseHTTPRequestHandler):
+    """Proxies Ollama requests; model requests wait for a slot of the scheduler."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json; charset=utf-8") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error_json(self, status: int, message: str) -> None:
+        """Send an error in Ollama's format ({"error": "..."})."""
+        self._send(status, json.dumps({"error": message}, ensure_ascii=False).encode("utf-8"))
+
+    def _proxy(self) -> None:
+        """Forward the request to Ollama, scheduling model requests by priority."""
+        parsed = urlparse(self.path)
+        if parsed.path.rstrip("/") == "/gateway/stats":
+            self._send(200, json.dumps(self.server.scheduler.stats()).encode("utf-8"))
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_SIZE:
+            self.close_connection = True  # The unread body would otherwise be parsed as the next request
+            self._send_error_json(413, "Request body too large")
+            return
+        body = self.rfile.read(length) if length else None
+
+        try:
+            priority, path = request_priority(parsed.path, self.headers.get(PRIORITY_HEADER))
+        except ValueError as e:
+            self._send_error_json(400, str(e))
+            return
+        url = f"{self.server.upstream}{path}" + (f"?{parsed.query}" if parsed.query else "")
+        scheduled = path.rstrip("/") in SCHEDULED_PATHS
+
+        scheduler: PriorityScheduler = self.server.scheduler
+        if scheduled:
+            try:
+                waited = scheduler.acquire(priority)
+            except QueueTimeoutError as e:
+                logger.warning(str(e))
+                self._send_error_json(503, str(e))
+                return
+            if waited > 1:
+                logger.info(f"{priority} request to {path} waited {waited:.1f} seconds for a slot")
+        try:
+            response = self.server.session.request(
+                self.command, url, data=body,
+                headers={"Content-Type": self.headers.get("Content-Type", "application/json")},
+                timeout=UPSTREAM_TIMEOUT_SECONDS
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Upstream request {self.command} {path} failed: {e}")
+            self._send_error_json(502, f"Ollama upstream error: {e}")
+            return
+        finally:
+            if scheduled:
+                scheduler.release(priority)
+        self._send(response.status_code, response.content,
+                   response.headers.get("Content-Type", "application/json; charset=utf-8"))
+
+    def do_GET(self) -> None:
+        self._proxy()
+
+    def do_POST(self) -> None:
+        self._proxy()
+
+    def do_DELETE(self) -> None:
+        self._proxy()
+
+
+def create_gateway(upstream: str, host: str, port: int, scheduler: PriorityScheduler) -> ThreadingHTTPServer:
+    """Create the gateway server (not yet serving).
+
+    Args:
+        upstream: Ollama base URL
+        host: Interface to bind to
+        port: Port to listen on (0 picks a free port)
+        scheduler: Slot scheduler shared by all request threads
+
+    Returns:
+        The server; call serve_forever() to start it
+    """
+    server = ThreadingHTTPServer((host, port), EmbeddingGatewayHandler)
+    server.daemon_threads = True
+    server.upstream = upstream.rstrip("/")
+    server.scheduler = scheduler
+    server.session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=64)
+    server.session.mount("http://", adapter)
+    server.session.mount("https://", adapter)
+    return server
+
+
+def main():
+    """Main function to run the embedding gateway."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Priority gateway between search/indexing and Ollama")
+    parser.add_argument("--upstream", type=str, default=DEFAULT_UPSTREAM,
+                        help=f"Ollama base URL (default: OLLAMA_UPSTREAM env or {DEFAULT_UPSTREAM})")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to bind to (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_GATEWAY_PORT,
+                        help=f"Port (default: EMBEDDING_GATEWAY_PORT env or {DEFAULT_GATEWAY_PORT})")
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS,
+                        help=f"Model requests in flight at Ollama, like OLLAMA_NUM_PARALLEL (default: {DEFAULT_SLOTS})")
+    parser.add_argument("--batch-slots", type=int, default=None,
+                        help="Batch requests in flight while search traffic is present (default: slots - 1)")
+    parser.add_argument("--idle-seconds", type=float, default=DEFAULT_IDLE_SECONDS,
+                        help=f"Search traffic counts as present this long after its last request "
+                             f"(default: {DEFAULT_IDLE_SECONDS})")
+    parser.add_argument("--max-batch-wait", type=float, default=DEFAULT_MAX_BATCH_WAIT,
+                        help=f"Batch requests waiting longer ignore the batch limit (default: {DEFAULT_MAX_BATCH_WAIT})")
+    parser.add_argument("--docker", action="store_true", help=f"Use the Docker Ollama endpoint ({DOCKER_UPSTREAM})")
+    args = parser.parse_args()
+
+    try:
+        scheduler = PriorityScheduler(args.slots, args.batch_slots, args.idle_seconds, args.max_batch_wait)
+    except ValueError as e:
+        parser.error(str(e))
+    upstream = DOCKER_UPSTREAM if args.docker else args.upstream
+    server = create_gateway(upstream, args.host, args.port, scheduler)
+    logger.info(f"Embedding gateway on http://{args.host}:{args.port} -> {upstream} "
+                f"({scheduler.slots} slots, {scheduler.batch_slots} for batch traffic while searches run)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Embedding gateway stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Vector Reduction Evaluation
+
+This script measures how much recall reduced vectors lose compared to exact search
+over the full 1024-dim embeddings, and how fast Qdrant answers with them. For every
+candidate dimension the corpus is projected into a temporary Qdrant collection,
+the query set is replayed, and recall@k plus p50/p95 latency are reported. Use it to
+pick the smallest dimension that still holds recall.
+
+Usage:
+    python3 evaluate_vector_reduction.py --dims 128,256,384,512 [--method pca|truncate] [--k 10]
+
+Options:
+    --dims          Comma-separated candidate dimensions
+    --method        'pca' (fitted on the corpus) or 'truncate' (Matryoshka-style, default: pca)
+    --k             Cut-off for recall@k (default: 10)
+    --queries-file  Query file (text or JSONL), default: built-in German legal queries
+    --corpus-limit  Maximum number of corpus vectors to load (default: all)
+    --output        Write the report as JSON to this file
+    --docker        Use Docker network endpoints instead of localhost
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+import requests
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qdrant_models
+
+from ollama_pool import OllamaEndpointPool, parse_endpoints
+from query_sets import default_queries, load_queries
+from vector_reduction import FULL_VECTOR_NAME, REDUCTION_METHODS, VectorProjection, load_collection_vectors
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger(__name__)
+
+# Configuration constants
+DEFAULT_OLLAMA_ENDPOINT = "http://localhost:11434"
+DEFAULT_QDRANT_ENDPOINT = "http://localhost:6333"
+DOCKER_OLLAMA_ENDPOINT = "http://ollama:11434"
+DOCKER_QDRANT_ENDPOINT = "http://qdrant:6333"
+OLLAMA_ENDPOINTS = os.environ.get("OLLAMA_ENDPOINTS", os.environ.get("OLLAMA_ENDPOINT", DEFAULT_OLLAMA_ENDPOINT))
+QDRANT_ENDPOINT = os.environ.get("QDRANT_ENDPOINT", DEFAULT_QDRANT_ENDPOINT)
+COLLECTION_NAME = "deutsche_gesetze"
+EMBEDDING_MODEL = "qllama/multilingual-e5-large-instruct:latest"
+UPLOAD_BATCH_SIZE = 256
+
+
+def embed_queries(pool: OllamaEndpointPool, queries: List[str]) -> np.ndarray:
+    """Generate full embeddings for the evaluation queries.
+
+    Args:
+        pool: Ollama endpoint pool
+        queries: Query texts
+
+    Returns:
+        Matrix of query embeddings, shape (n, source_dim)
+    """
+    embeddings = []
+    for query in queries:
+        with pool.lease() as endpoint:
+            response = requests.post(
+                f"{endpoint}/api/embeddings",
+                json={"model": EMBEDDING_MODEL, "prompt": query},
+                timeout=30
+            )
+        response.raise_for_status()
+        embeddings.append(response.json()["embedding"])
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> List[List[int]]:
+    """Exact cosine top-k over the full embeddings (ground truth).
+
+    Args:
+        corpus: Corpus embeddings, shape (n, dim)
+        queries: Query embeddings, shape (q, dim)
+        k: Number of neighbours
+
+    Returns:
+        For each query, the corpus row indices of the k nearest neighbours
+    """
+    corpus_norm = corpus / np.maximum(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12)
+    queries_norm = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+    scores = queries_norm @ corpus_norm.T
+    return np.argsort(-scores, axis=1)[:, :k].tolist()
+
+
+def evaluate_dimension(client: QdrantClient, name: str, corpus: np.ndarray, queries: np.ndarray,
+                       truth: List[List[int]], k: int, keep: bool = False) -> Dict:
+    """Index projected vectors into a temporary collection and measure recall and latency.
+
+    Args:
+        client: Qdrant client
+        name: Name of the temporary collection
+        corpus: Projected corpus vectors
+        queries: Projected query vectors
+        truth: Exact top-k row indices per query
+        k: Cut-off for recall@k
+        keep: Keep the temporary collection after the run
+
+    Returns:
+        Dict with dim, recall_at_k, p50_ms, p95_ms and vector_memory_mb
+    """
+    dim = corpus.shape[1]
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=qdrant_models.VectorParams(size=dim, distance=qdrant_models.Distance.COSINE)
+    )
+
+    try:
+        for start in range(0, len(corpus), UPLOAD_BATCH_SIZE):
+            batch = corpus[start:start + UPLOAD_BATCH_SIZE]
+            client.upsert(
+                collection_name=name,
+                points=qdrant_models.Batch(ids=list(range(start, start + len(batch))), vectors=batch.tolist()),
+                wait=True
+            )
+
+        latencies = []
+        recalls = []
+        for query_vector, expected in zip(queries, truth):
+            start_time = time.perf_counter()
+            result = client.query_points(collection_name=name, query=query_vector.tolist(), limit=k)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+            found = {point.id for point in result.points}
+            recalls.append(len(found & set(expected)) / len(expected))
+
+        return {
+            "dim": dim,
+            "recall_at_k": float(np.mean(recalls)),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "vector_memory_mb": corpus.shape[0] * dim * 4 / 1024 / 1024,
+        }
+    finally:
+        if not keep:
+            client.delete_collection(name)
+
+
+def main():
+    """Main function to run the evaluation."""
+    parser = argparse.ArgumentParser(description="Evaluate reduced vectors against full-dimension exact search")
+    parser.add_argument("--dims", type=str, required=True,
+                        help="Comma-separated candidate dimensions (e.g. 128,256,512)")
+    parser.add_argument("--method", choices=REDUCTION_METHODS, default="pca",
+                        help="Reduction method (default: pca)")
+    parser.add_argument("--k", type=int, default=10,
+                        help="Cut-off for recall@k (default: 10)")
+    parser.add_argument("--queries-file", type=str, default=None,
+                        help="Query file, one query per line or JSONL (default: built-in query set)")
+    parser.add_argument("--corpus-limit", type=int, default=None,
+                        help="Maximum number of corpus vectors to load (default: all)")
+    parser.add_argument("--collection", type=str, default=COLLECTION_NAME,
+                        help=f"Collection with full embeddings (default: {COLLECTION_NAME})")
+    parser.add_argument("--keep-collections", action="store_true",
+                        help="Keep the temporary evaluation collections")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Write the report as JSON to this file")
+    parser.add_argument("--docker", action="store_true",
+                        help="Use Docker network endpoints instead of localhost")
+    args = parser.parse_args()
+
+    qdrant_endpoint = DOCKER_QDRANT_ENDPOINT if args.docker else QDRANT_ENDPOINT
+    ollama_endpoints = DOCKER_OLLAMA_ENDPOINT if args.docker else OLLAMA_ENDPOINTS
+
+    try:
+        dims = sorted(int(d) for d in args.dims.split(","))
+        queries = [q["query"] for q in (load_queries(args.queries_file) if args.queries_file else default_queries())]
+
+        client = QdrantClient(url=qdrant_endpoint)
+        vectors_config = client.get_collection(args.collection).config.params.vectors
+        source_vector_name = FULL_VECTOR_NAME if isinstance(vectors_config, dict) else None
+
+        corpus = load_collection_vectors(client, args.collection, vector_name=source_vector_name,
+                                         limit=args.corpus_limit)
+        query_vectors = embed_queries(OllamaEndpointPool(parse_endpoints(ollama_endpoints), EMBEDDING_MODEL), queries)
+        truth = exact_top_k(corpus, query_vectors, args.k)
+        logger.info(f"Evaluating {len(queries)} queries against {len(corpus)} vectors, k={args.k}")
+
+        # Full dimension first as the latency baseline
+        report = [evaluate_dimension(client, f"{args.collection}_eval_full", corpus, query_vectors,
+                                     truth, args.k, keep=args.keep_collections)]
+        for dim in dims:
+            if args.method == "pca" and dim > len(corpus):
+                logger.warning(f"Skipping dim {dim}: PCA needs at least {dim} corpus vectors")
+                continue
+            if args.method == "pca":
+                projection = VectorProjection.fit_pca(corpus, dim)
+            else:
+                projection = VectorProjection.truncation(corpus.shape[1], dim)
+            report.append(evaluate_dimension(
+                client, f"{args.collection}_eval_{args.method}_{dim}",
+                projection.transform_many(corpus), projection.transform_many(query_vectors),
+                truth, args.k, keep=args.keep_collections
+            ))
+
+        print(f"\n{'dim':>6} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p95 ms':>8} {'vectors MB':>11}")
+        for row in report:
+            print(f"{row['dim']:>6} {row['recall_at_k']:>10.3f} {row['p50_ms']:>8.2f} "
+                  f"{row['p95_ms']:>8.2f} {row['vector_memory_mb']:>11.1f}")
+
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"method": args.method, "k": args.k, "queries": len(queries),
+                           "corpus_size": len(corpus), "results": report}, f, indent=2)
+            logger.info(f"Report written to {args.output}")
+
+    except Exception as e:
+        logger.error(f"Error during evaluation: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
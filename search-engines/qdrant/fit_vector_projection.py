@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Vector Projection Fitting
+
+This script fits a dimensionality reduction for the E5 embeddings offline on the
+indexed corpus and saves it as a projection file. The indexer uses the file to
+store reduced vectors, and HybridSearcher applies the same transform to queries.
+
+Usage:
+    python3 fit_vector_projection.py --dim 256 --output projection_pca_256.npz [--method pca|truncate]
+
+Options:
+    --dim           Dimension of the reduced vectors
+    --output        Path of the projection file to write
+    --method        'pca' (fitted on the corpus) or 'truncate' (Matryoshka-style, default: pca)
+    --vector-mode   Vector mode the projection is used with: 'reduced' or 'both' (default: both)
+    --sample        Maximum number of corpus vectors used for fitting (default: 20000)
+    --docker        Use Docker network endpoints instead of localhost
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from qdrant_client import QdrantClient
+
+from vector_reduction import (
+    FULL_VECTOR_NAME,
+    REDUCED_VECTOR_NAME,
+    REDUCTION_METHODS,
+    VectorProjection,
+    load_collection_vectors,
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger(__name__)
+
+# Configuration constants
+DEFAULT_QDRANT_ENDPOINT = "http://localhost:6333"
+DOCKER_QDRANT_ENDPOINT = "http://qdrant:6333"
+QDRANT_ENDPOINT = os.environ.get("QDRANT_ENDPOINT", DEFAULT_QDRANT_ENDPOINT)
+COLLECTION_NAME = "deutsche_gesetze"
+DEFAULT_SAMPLE_SIZE = 20000  # PCA on 20k x 1024 fits comfortably in memory
+
+
+def main():
+    """Main function to fit and save the projection."""
+    parser = argparse.ArgumentParser(description="Fit a dimensionality reduction for the E5 embeddings")
+    parser.add_argument("--dim", type=int, required=True,
+                        help="Dimension of the reduced vectors")
+    parser.add_argument("--output", type=str, required=True,
+                        help="Path of the projection file to write (.npz)")
+    parser.add_argument("--method", choices=REDUCTION_METHODS, default="pca",
+                        help="Reduction method (default: pca)")
+    parser.add_argument("--vector-mode", choices=["reduced", "both"], default="both",
+                        help="Vector mode the projection is used with in qdrant_indexer.py (default: both)")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE_SIZE,
+                        help=f"Maximum number of corpus vectors used for fitting (default: {DEFAULT_SAMPLE_SIZE})")
+    parser.add_argument("--collection", type=str, default=COLLECTION_NAME,
+                        help=f"Collection with full embeddings to fit on (default: {COLLECTION_NAME})")
+    parser.add_argument("--docker", action="store_true",
+                        help="Use Docker network endpoints instead of localhost")
+    parser.add_argument("--qdrant", type=str, default=None,
+                        help="Qdrant endpoint URL (default: from env or localhost)")
+    args = parser.parse_args()
+
+    qdrant_endpoint = DOCKER_QDRANT_ENDPOINT if args.docker else (args.qdrant or QDRANT_ENDPOINT)
+    vector_name = REDUCED_VECTOR_NAME if args.vector_mode == "both" else None
+
+    try:
+        client = QdrantClient(url=qdrant_endpoint)
+
+        # Read full embeddings; collections storing both variants keep them in a named vector
+        vectors_config = client.get_collection(args.collection).config.params.vectors
+        source_vector_name = FULL_VECTOR_NAME if isinstance(vectors_config, dict) else None
+        source_dim = (vectors_config[FULL_VECTOR_NAME] if source_vector_name else vectors_config).size
+
+        if args.method == "truncate":
+            projection = VectorProjection.truncation(source_dim, args.dim, vector_name=vector_name)
+        else:
+            vectors = load_collection_vectors(client, args.collection, vector_name=source_vector_name,
+                                              limit=args.sample)
+            projection = VectorProjection.fit_pca(vectors, args.dim, vector_name=vector_name)
+
+        projection.save(args.output)
+
+    except Exception as e:
+        logger.error(f"Error fitting projection: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
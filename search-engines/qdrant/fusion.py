@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Result Fusion
+
+Strategies for fusing Solr (keyword) and Qdrant (semantic) result lists into one
+ranking. Every strategy takes both ranked lists and the normalized weights and returns
+per-document score information keyed by document ID.
+
+Strategies:
+    sigmoid  Sigmoid over the raw Solr score plus weighted cosine score (legacy)
+    rrf      Reciprocal Rank Fusion, uses only the ranks of both lists
+    minmax   Min-max normalized scores per list, linearly combined
+"""
+
+import math
+from typing import Callable, Dict, List
+
+from tracing import span
+
+FUSION_STRATEGIES = ("sigmoid", "rrf", "minmax")
+DEFAULT_FUSION = "sigmoid"
+RRF_K = 60  # Rank constant from the RRF paper; dampens the influence of top ranks
+
+# Candidate pool per side = max(limit * factor, minimum). Rank-based strategies need
+# a smaller pool than the uncalibrated sigmoid fusion.
+CANDIDATE_POOL_FACTORS = {"sigmoid": 3, "rrf": 2, "minmax": 2}
+CANDIDATE_POOL_MINIMUMS = {"sigmoid": 20, "rrf": 10, "minmax": 10}
+
+
+def candidate_pool_size(limit: int, strategy: str = DEFAULT_FUSION) -> int:
+    """Return the default number of candidates fetched per side for a strategy.
+
+    Args:
+        limit: Number of results requested
+        strategy: Fusion strategy name
+
+    Returns:
+        Number of candidates to fetch from Solr and Qdrant each
+    """
+    return max(limit * CANDIDATE_POOL_FACTORS[strategy], CANDIDATE_POOL_MINIMUMS[strategy])
+
+
+def _score_entry(keyword_score: float, semantic_score: float, keyword_weight: float,
+                 semantic_weight: float, in_keyword: bool, in_semantic: bool) -> Dict:
+    """Build the score information of one fused document."""
+    if in_keyword and in_semantic:
+        source = "hybrid"
+    elif in_semantic:
+        source = "semantic"
+    else:
+        source = "keyword"
+    return {
+        "keyword_score": keyword_score,
+        "semantic_score": semantic_score,
+        "combined_score": keyword_score * keyword_weight + semantic_score * semantic_weight,
+        "search_source": source,
+    }
+
+
+def _fuse_normalized(keyword_scores: Dict[str, float], semantic_scores: Dict[str, float],
+                     keyword_weight: float, semantic_weight: float) -> Dict[str, Dict]:
+    """Combine per-list normalized scores (keyword order first, then semantic-only)."""
+    if not semantic_scores:
+        # Keyword-only search: the keyword score is the combined score
+        keyword_weight, semantic_weight = 1.0, 0.0
+
+    fused = {}
+    for doc_id in list(keyword_scores) + [d for d in semantic_scores if d not in keyword_scores]:
+        fused[doc_id] = _score_entry(
+            keyword_scores.get(doc_id, 0.0), semantic_scores.get(doc_id, 0.0),
+            keyword_weight, semantic_weight,
+            doc_id in keyword_scores, doc_id in semantic_scores
+        )
+    return fused
+
+
+def sigmoid_fusion(keyword_results: List[Dict], semantic_results: List[Dict],
+                   keyword_weight: float, semantic_weight: float) -> Dict[str, Dict]:
+    """Legacy fusion: sigmoid over the raw Solr score, cosine score as is.
+
+    Args:
+        keyword_results: Solr results in rank order (with raw "score")
+        semantic_results: Qdrant results in rank order (with cosine "score")
+        keyword_weight: Normalized keyword weight
+        semantic_weight: Normalized semantic weight
+
+    Returns:
+        Dict mapping document ID to score information
+    """
+    # Sigmoid normalization of the Solr score (typically 0-20) to 0-1 with a smooth curve
+    keyword_scores = {doc["id"]: 1.0 / (1.0 + math.exp(-float(doc["score"]) / 5 + 1)) for doc in keyword_results}
+    semantic_scores = {doc["id"]: float(doc["score"]) for doc in semantic_results}
+    return _fuse_normalized(keyword_scores, semantic_scores, keyword_weight, semantic_weight)
+
+
+def rrf_fusion(keyword_results: List[Dict], semantic_results: List[Dict],
+               keyword_weight: float, semantic_weight: float, k: int = RRF_K) -> Dict[str, Dict]:
+    """Reciprocal Rank Fusion: each list contributes weight / (k + rank).
+
+    Args:
+        keyword_results: Solr results in rank order
+        semantic_results: Qdrant results in rank order
+        keyword_weight: Normalized keyword weight
+        semantic_weight: Normalized semantic weight
+        k: Rank constant
+
+    Returns:
+        Dict mapping document ID to score information
+    """
+    keyword_scores = {doc["id"]: 1.0 / (k + rank) for rank, doc in enumerate(keyword_results, start=1)}
+    semantic_scores = {doc["id"]: 1.0 / (k + rank) for rank, doc in enumerate(semantic_results, start=1)}
+    return _fuse_normalized(keyword_scores, semantic_scores, keyword_weight, semantic_weight)
+
+
+def _min_max(results: List[Dict]) -> Dict[str, float]:
+    """Scale the scores of one result list to 0-1."""
+    if not results:
+        return {}
+    scores = [float(doc["score"]) for doc in results]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return {doc["id"]: 1.0 for doc in results}
+    return {doc["id"]: (float(doc["score"]) - low) / (high - low) for doc in results}
+
+
+def minmax_fusion(keyword_results: List[Dict], semantic_results: List[Dict],
+                  keyword_weight: float, semantic_weight: float) -> Dict[str, Dict]:
+    """Linear fusion of min-max normalized scores.
+
+    Args:
+        keyword_results: Solr results in rank order
+        semantic_results: Qdrant results in rank order
+        keyword_weight: Normalized keyword weight
+        semantic_weight: Normalized semantic weight
+
+    Returns:
+        Dict mapping document ID to score information
+    """
+    return _fuse_normalized(_min_max(keyword_results), _min_max(semantic_results), keyword_weight, semantic_weight)
+
+
+FUSION_FUNCTIONS: Dict[str, Callable[..., Dict[str, Dict]]] = {
+    "sigmoid": sigmoid_fusion,
+    "rrf": rrf_fusion,
+    "minmax": minmax_fusion,
+}
+
+
+def fuse(strategy: str, keyword_results: List[Dict], semantic_results: List[Dict],
+         keyword_weight: float, semantic_weight: float) -> List[tuple]:
+    """Fuse both result lists with the given strategy and rank the documents.
+
+    Args:
+        strategy: Fusion strategy name (see FUSION_STRATEGIES)
+        keyword_results: Solr results in rank order
+        semantic_results: Qdrant results in rank order (empty for keyword-only searches)
+        keyword_weight: Normalized keyword weight
+        semantic_weight: Normalized semantic weight
+
+    Returns:
+        List of (document ID, score information) sorted by combined score
+
+    Raises:
+        ValueError: If the strategy is unknown
+    """
+    if strategy not in FUSION_FUNCTIONS:
+        raise ValueError(f"Unknown fusion strategy '{strategy}', expected one of {', '.join(FUSION_STRATEGIES)}")
+    with span("fusion", strategy=strategy) as current:
+        fused = FUSION_FUNCTIONS[strategy](keyword_results, semantic_results, keyword_weight, semantic_weight)
+        current.set_attribute("result_count", len(fused))
+        return sorted(fused.items(), key=lambda item: item[1]["combined_score"], reverse=True)
@@ -11,12 +11,23 @@ It accepts a query string and returns ranked results from both systems.
 
 Usage:
     python3 hybrid_search.py [--query "search query"] [--limit N] [--weights keyword,semantic]
+    python3 hybrid_search.py --serve [--host HOST] [--port PORT]
+    python3 hybrid_search.py --queries-file queries.jsonl [--output results.jsonl]
 
 Options:
     --query     The search query text
     --limit     Maximum number of results to return (default: 10)
     --weights   Relative weights for keyword vs semantic results, comma-separated (default: 0.5,0.5)
+    --fusion    Fusion strategy: sigmoid (legacy), rrf or minmax
+    --filter    Field filter pushed down to Solr and Qdrant, e.g. jurabk=BGB (repeatable)
+    --ann-preset  Qdrant accuracy preset: fast, default or exact (--hnsw-ef, --exact,
+                  --oversampling, --no-rescore and --score-threshold override single values)
+    --stream    Print keyword results first and the fused ranking later (NDJSON)
+    --vector-backend  Vector search in 'qdrant' or in the Solr vector field ('solr', no Qdrant needed)
+    --citation-index  Citation index for direct lookups of "§ 823 BGB" style queries
+    --queries-file  Run all queries of a text/JSONL file in batches and write JSONL results
     --docker    Use Docker network endpoints instead of localhost
+    --serve     Run as a long-running HTTP JSON service with a warm HybridSearcher
 """
 
 import argparse
@@ -25,14 +36,35 @@ import logging
 import math
 import os
 import re
+import secrets
+import sys
 import time
-from typing import Dict, List, Optional, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 import requests
 import numpy as np
+from requests.adapters import HTTPAdapter
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
 
+from adaptive_pool import AdaptivePoolStats, assess_stability, initial_pool_size
+from ann_params import ANN_PRESETS, DEFAULT_ANN_PRESET, AnnParams, resolve_ann_params
+from citation_index import CitationIndex
+from collection_aliases import resolve_alias
+from embedding_batcher import EmbeddingBatcher
+from embedding_gateway import PRIORITY_HEADER
+from fusion import DEFAULT_FUSION, FUSION_STRATEGIES, candidate_pool_size, fuse
+from latency_budget import CircuitBreaker, Deadline
+from model_residency import KEEP_ALIVE_PROFILES, ModelResidencyManager
+from ollama_pool import OllamaEndpointPool, fetch_model_digest, parse_endpoints
+from query_sets import load_queries, query_limit
+from search_cache import EmbeddingCache, ResultCache, TTLCache, normalize_query
+from search_filters import Filters, filter_key, normalize_filters, qdrant_filter, solr_filter_queries
+from solr_vectors import cosine_from_solr, knn_query
+from tracing import ensure_trace, span, submit_in_context
+from vector_reduction import FULL_VECTOR_NAME, VectorProjection
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -56,12 +88,91 @@ DOCKER_SOLR_ENDPOINT = "http://solr:8983/solr/documents"
 OLLAMA_ENDPOINT = os.environ.get("OLLAMA_ENDPOINT", DEFAULT_OLLAMA_ENDPOINT)
 QDRANT_ENDPOINT = os.environ.get("QDRANT_ENDPOINT", DEFAULT_QDRANT_ENDPOINT) 
 SOLR_ENDPOINT = os.environ.get("SOLR_ENDPOINT", DEFAULT_SOLR_ENDPOINT)
+# Comma-separated list of Ollama hosts; query embeddings go to the least-loaded one
+OLLAMA_ENDPOINTS = os.environ.get("OLLAMA_ENDPOINTS", OLLAMA_ENDPOINT)
+# Optional projection (.npz) for collections that store reduced vectors
+VECTOR_PROJECTION_FILE = os.environ.get("VECTOR_PROJECTION_FILE")
 COLLECTION_NAME = "deutsche_gesetze"
+# Vector search backend: Qdrant, or the DenseVectorField of the Solr core for deployments without Qdrant
+VECTOR_BACKENDS = ("qdrant", "solr")
+VECTOR_BACKEND = os.environ.get("HYBRID_VECTOR_BACKEND", "qdrant")
 EMBEDDING_MODEL = "qllama/multilingual-e5-large-instruct:latest"
 
 # Default search parameters
 DEFAULT_LIMIT = 10  # Default number of results to return
 DEFAULT_WEIGHTS = (0.5, 0.5)  # Default weights for keyword vs semantic search
+HYBRID_FUSION = os.environ.get("HYBRID_FUSION", DEFAULT_FUSION)  # Default fusion strategy
+SOLR_DOCUMENT_FIELDS = "id,enbez,kurzue,langue,norm_type,parent_document_id,jurabk,amtabk,text_content,text_content_html,fussnoten_content_html"
+SOLR_RANKING_FIELDS = "id"  # Paginated searches rank on IDs and hydrate only the requested page
+SOLR_METADATA_FIELDS = "id,enbez,kurzue,langue,norm_type,parent_document_id,jurabk,amtabk"
+SOLR_QUERY_FIELDS = "text_content^1.0 enbez^2.0 kurzue^1.5 amtabk^1.8 jurabk^1.8"
+
+# Result modes: full documents, or metadata plus highlighted snippets (text loaded on demand)
+RESULT_MODES = ("full", "snippets")
+SNIPPET_FIELD = "text_content"
+SNIPPET_COUNT = 2  # Snippets per document
+SNIPPET_FRAGSIZE = 200  # Characters per snippet
+HTTP_POOL_SIZE = 32  # Pooled keep-alive connections per host (Solr, Ollama)
+SEMANTIC_WORKERS = 16  # Threads running the Ollama-then-Qdrant path next to the Solr query
+# Query-time ANN parameters (hnsw_ef, exact search, quantization rescoring, score threshold)
+HYBRID_ANN_PRESET = os.environ.get("HYBRID_ANN_PRESET", DEFAULT_ANN_PRESET)  # fast, default or exact
+FILTER_COUNT_TTL_SECONDS = 300  # How long the size of a filtered subset is reused for the exact_below check
+FILTER_COUNT_CACHE_SIZE = 1000  # Distinct filters whose subset size is remembered
+
+# Query embedding cache (optional SQLite file shared by several service workers)
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_CACHE_TTL = int(os.environ.get("EMBEDDING_CACHE_TTL", str(24 * 60 * 60)))
+EMBEDDING_CACHE_DB = os.environ.get("EMBEDDING_CACHE_DB")
+MODEL_DIGEST_REFRESH_SECONDS = 300  # How often the model digest in the cache key is re-checked
+
+# Micro-batching of concurrent query embeddings; identical queries in flight share one Ollama call
+EMBEDDING_MICRO_BATCH = os.environ.get("HYBRID_EMBEDDING_BATCHING", "1").lower() in ("1", "true", "yes", "on")
+EMBEDDING_BATCH_WAIT_MS = float(os.environ.get("HYBRID_EMBEDDING_BATCH_WAIT_MS", "5"))  # Collection window under load
+EMBEDDING_MICRO_BATCH_SIZE = 32  # Query texts per micro-batch
+EMBEDDING_BATCH_WORKERS = int(os.environ.get("HYBRID_EMBEDDING_BATCH_WORKERS", "1"))  # Micro-batches in flight per Ollama host
+
+# Adaptive candidate pool: start small and fetch the full pool only when the fused top-k is unstable
+ADAPTIVE_CANDIDATE_POOL = os.environ.get("HYBRID_ADAPTIVE_POOL", "0").lower() in ("1", "true", "yes", "on")
+
+# Result cache for fused result lists, dropped when the Solr or Qdrant index changes
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL = int(os.environ.get("RESULT_CACHE_TTL", "600"))
+RESULT_CACHE_MAX_MB = int(os.environ.get("RESULT_CACHE_MAX_MB", "64"))
+INDEX_VERSION_CHECK_SECONDS = 5  # Index versions are re-read at most this often
+
+# Latency budget per search, split into retrieval (Solr and the semantic path) and hydration
+SEARCH_BUDGET_SECONDS = float(os.environ.get("HYBRID_SEARCH_BUDGET", "2.0"))
+RETRIEVAL_BUDGET_SHARE = 0.7  # Share of the budget for retrieval; the rest is left for hydration
+HYDRATION_MIN_TIMEOUT = 1.0  # Keyword results are always hydrated, even when the budget is spent
+SOLR_TIMEOUT_SECONDS = 10  # Upper bound for single Solr requests
+EMBEDDING_TIMEOUT_SECONDS = 10  # Upper bound for query embedding requests
+
+# Circuit breaker for Ollama: skip the semantic path while it fails or is slow
+OLLAMA_FAILURE_THRESHOLD = 5  # Consecutive failures (or slow calls) that open the breaker
+OLLAMA_RESET_SECONDS = 30  # Time before a trial request is let through
+OLLAMA_SLOW_CALL_SECONDS = 1.5  # Embedding requests slower than this count as failures
+
+# Pagination: fused candidate pools are kept under an opaque cursor
+PAGE_POOL_SIZE = int(os.environ.get("HYBRID_PAGE_POOL", "50"))  # Minimum candidates per side for paging
+CURSOR_CACHE_SIZE = 1000  # Maximum number of live cursors
+CURSOR_TTL_SECONDS = 15 * 60  # Cursor lifetime
+
+# Citation fast path: "§ 823 BGB" style queries are resolved through the index written at import time
+CITATION_INDEX_FILE = os.environ.get(
+    "CITATION_INDEX_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "citation_index.json"))
+CITATION_SCORE = 1.0  # Keyword and combined score of citation hits
+
+# Batch mode (combined_search_many, --queries-file) for offline evaluations
+EMBEDDING_BATCH_SIZE = 64  # Query texts per Ollama /api/embed request
+QDRANT_BATCH_SIZE = 64  # Searches per Qdrant batch query request
+HYDRATION_BATCH_SIZE = 200  # Document IDs per Solr /get request (keeps the URL short)
+BATCH_SOLR_WORKERS = 8  # Concurrent Solr queries
+BATCH_TIMEOUT_SECONDS = 120  # Timeout of batch requests to Ollama and Qdrant
+DEFAULT_QUERY_BATCH = 256  # Queries per combined_search_many call in --queries-file mode
+
+# Service mode
+DEFAULT_SERVICE_HOST = "127.0.0.1"
+DEFAULT_SERVICE_PORT = int(os.environ.get("HYBRID_SEARCH_PORT", "8765"))
 
 # German stopwords list - common words that should not trigger semantic search
 GERMAN_STOPWORDS = {
@@ -90,21 +201,131 @@ GERMAN_STOPWORDS = {
 class HybridSearcher:
     """Class for hybrid search combining keyword and semantic search."""
     
-    def __init__(self, weights: Tuple[float, float] = DEFAULT_WEIGHTS):
+    def __init__(self, weights: Tuple[float, float] = DEFAULT_WEIGHTS, ann: Optional[AnnParams] = None,
+                 vector_backend: Optional[str] = None):
         """Initialize the hybrid search service.
         
         Args:
             weights: Tuple of weights (keyword_weight, semantic_weight) for combining results
+            ann: Default ANN parameters of semantic searches (default: HYBRID_ANN_PRESET)
+            vector_backend: "qdrant" or "solr" (default: VECTOR_BACKEND)
+            
+        Raises:
+            ValueError: If the vector backend is unknown
         """
-        self.qdrant_client = QdrantClient(url=QDRANT_ENDPOINT)
-        self.keyword_weight, self.semantic_weight = weights
-        # Normalize weights to sum to 1.0
-        weight_sum = self.keyword_weight + self.semantic_weight
-        self.keyword_weight /= weight_sum
-        self.semantic_weight /= weight_sum
+        self.vector_backend = vector_backend or VECTOR_BACKEND
+        if self.vector_backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend '{self.vector_backend}', "
+                             f"expected one of {', '.join(VECTOR_BACKENDS)}")
+        # Solr-only deployments have no Qdrant; the client is only created for the Qdrant backend
+        self.qdrant_client = QdrantClient(url=QDRANT_ENDPOINT) if self.vector_backend == "qdrant" else None
+        # Keep-alive connections to Solr and Ollama are reused across searches
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Query embeddings take precedence over indexing behind an embedding gateway (embedding_gateway.py)
+        self.session.headers[PRIORITY_HEADER] = "interactive"
+        self.endpoint_pool = OllamaEndpointPool(parse_endpoints(OLLAMA_ENDPOINTS), EMBEDDING_MODEL)
+        # keep_alive of every embedding request; the search service also warms and watches the model
+        self.residency = ModelResidencyManager(self.endpoint_pool.urls, EMBEDDING_MODEL, KEEP_ALIVE_PROFILES["search"],
+                                               headers={PRIORITY_HEADER: "interactive"})
+        self.embedding_cache = EmbeddingCache(EMBEDDING_MODEL, max_entries=EMBEDDING_CACHE_SIZE,
+                                              ttl_seconds=EMBEDDING_CACHE_TTL, sqlite_path=EMBEDDING_CACHE_DB)
+        self._model_digest_checked_at = 0.0
+        self.result_cache = ResultCache(max_entries=RESULT_CACHE_SIZE, ttl_seconds=RESULT_CACHE_TTL,
+                                        max_bytes=RESULT_CACHE_MAX_MB * 1024 * 1024)
+        self._index_version_checked_at = 0.0
+        self._index_version_known = False
+        self.cursor_cache = TTLCache(max_entries=CURSOR_CACHE_SIZE, ttl_seconds=CURSOR_TTL_SECONDS)
+        self.ann = ann or resolve_ann_params(HYBRID_ANN_PRESET)
+        self.filter_counts = TTLCache(max_entries=FILTER_COUNT_CACHE_SIZE, ttl_seconds=FILTER_COUNT_TTL_SECONDS)
+        self.ollama_breaker = CircuitBreaker("ollama", failure_threshold=OLLAMA_FAILURE_THRESHOLD,
+                                             reset_seconds=OLLAMA_RESET_SECONDS,
+                                             slow_call_seconds=OLLAMA_SLOW_CALL_SECONDS)
+        # Semantic retrieval runs on this pool while the calling thread queries Solr
+        self.semantic_executor = ThreadPoolExecutor(max_workers=SEMANTIC_WORKERS,
+                                                    thread_name_prefix="semantic-search")
+        # Query embeddings get the same dimensionality reduction as the indexed documents
+        self.projection = VectorProjection.load(VECTOR_PROJECTION_FILE) if VECTOR_PROJECTION_FILE else None
+        # Concurrent query embeddings are sent to Ollama together (see embedding_batcher.py)
+        self.embedding_batcher = None
+        # Reason: /api/embed returns unit-length vectors, while the PCA mean was fitted on /api/embeddings output
+        if EMBEDDING_MICRO_BATCH and not (self.projection is not None and self.projection.method == "pca"):
+            self.embedding_batcher = EmbeddingBatcher(self.embed_query_batch, max_batch=EMBEDDING_MICRO_BATCH_SIZE,
+                                                      max_wait_ms=EMBEDDING_BATCH_WAIT_MS,
+                                                      workers=EMBEDDING_BATCH_WORKERS * len(self.endpoint_pool.endpoints))
+        # Searches without an explicit candidate pool start small (see adaptive_pool.py)
+        self.adaptive_pool = ADAPTIVE_CANDIDATE_POOL
+        self.pool_stats = AdaptivePoolStats()
+        self.citation_index = self.load_citation_index(CITATION_INDEX_FILE)
+        self._vector_name_resolved = False
+        self._vector_name = None
+        self.keyword_weight, self.semantic_weight = self.normalize_weights(weights)
         
         logger.info(f"Initialized hybrid search with weights: keyword={self.keyword_weight:.2f}, "
-                  f"semantic={self.semantic_weight:.2f}")
+                  f"semantic={self.semantic_weight:.2f}, vector backend: {self.vector_backend}, "
+                  f"ANN parameters: {self.ann}")
+    
+    @staticmethod
+    def load_citation_index(path: Optional[str]) -> Optional[CitationIndex]:
+        """Load the citation index; without one, citation queries take the regular path.
+        
+        Args:
+            path: Index file written by solr_import_norms.py or citation_index.py
+            
+        Returns:
+            The index, or None if the file is missing or unreadable
+        """
+        if not path or not os.path.exists(path):
+            logger.info("No citation index found, citation queries use the regular search")
+            return None
+        try:
+            return CitationIndex.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load citation index {path}: {e}")
+            return None
+    
+    def citation_ranking(self, query: str) -> Optional[List[Dict]]:
+        """Resolve a citation query ("§ 823 BGB", "Art. 1 GG", "§§ 1-5 BGB") by direct lookup.
+        
+        Args:
+            query: Search query text
+            
+        Returns:
+            Ranking entries (ID plus score information) in norm order, or None if the
+            query is not a citation found in the index
+        """
+        if self.citation_index is None:
+            return None
+        doc_ids = self.citation_index.resolve(query)
+        if not doc_ids:
+            return None
+        logger.info(f"Resolved citation '{query}' to {len(doc_ids)} norms")
+        return [{
+            "id": doc_id,
+            "keyword_score": CITATION_SCORE,
+            "semantic_score": 0.0,
+            "combined_score": CITATION_SCORE,
+            "search_source": "citation",
+        } for doc_id in doc_ids]
+    
+    @staticmethod
+    def normalize_weights(weights: Tuple[float, float]) -> Tuple[float, float]:
+        """Normalize keyword and semantic weights to sum to 1.0.
+        
+        Args:
+            weights: Tuple of weights (keyword_weight, semantic_weight)
+            
+        Returns:
+            Normalized tuple of weights
+        """
+        keyword_weight, semantic_weight = weights
+        weight_sum = keyword_weight + semantic_weight
+        if weight_sum <= 0:
+            logger.warning(f"Invalid weights {weights}. Using default: {DEFAULT_WEIGHTS}")
+            return DEFAULT_WEIGHTS
+        return keyword_weight / weight_sum, semantic_weight / weight_sum
     
     def is_stopword_query(self, query: str) -> bool:
         """Check if the query consists mainly of stopwords.
@@ -161,11 +382,32 @@ class HybridSearcher:
             
         return True
     
-    def generate_embedding(self, text: str) -> Optional[List[float]]:
+    def refresh_model_digest(self) -> None:
+        """Re-read the embedding model digest so a replaced model invalidates cached embeddings."""
+        now = time.time()
+        if now - self._model_digest_checked_at < MODEL_DIGEST_REFRESH_SECONDS:
+            return
+        if self.ollama_breaker.state != CircuitBreaker.CLOSED:
+            return  # Ollama is failing; keep the known digest
+        self._model_digest_checked_at = now
+        
+        try:
+            with self.endpoint_pool.lease() as endpoint:
+                digest = fetch_model_digest(endpoint, EMBEDDING_MODEL)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Could not refresh embedding model digest: {e}")
+            return
+        self.embedding_cache.set_model_digest(digest)
+    
+    def generate_embedding(self, text: str, timeout: float = EMBEDDING_TIMEOUT_SECONDS) -> Optional[List[float]]:
         """Generate an embedding for the search query.
         
+        Repeated queries are answered from the embedding cache without calling Ollama.
+        While the Ollama circuit breaker is open, uncached queries fail immediately.
+        
         Args:
             text: The search query text
+            timeout: Timeout of the Ollama request in seconds
             
         Returns:
             List of embedding values or None if generation failed
@@ -174,30 +416,240 @@ class HybridSearcher:
             logger.warning("Empty text provided for embedding generation.")
             return None
         
+        with span("embed") as current:
+            self.refresh_model_digest()
+            embedding = self.embedding_cache.get(text)
+            current.set_attribute("cache_hit", embedding is not None)
+            if embedding is not None:
+                return embedding
+        
+            if not self.ollama_breaker.allow():
+                logger.warning("Ollama circuit breaker is open, skipping query embedding")
+                current.set_attribute("breaker_open", True)
+                return None
+        
+            if self.embedding_batcher is not None:
+                current.set_attribute("batched", True)
+                return self.embedding_batcher.embed(text, timeout)
+        
+            try:
+                request_start = time.time()
+                with self.endpoint_pool.lease() as endpoint:
+                    response = self.session.post(
+                        f"{endpoint}/api/embeddings",
+                        json={"model": EMBEDDING_MODEL, "prompt": text, "keep_alive": self.residency.keep_alive},
+                        timeout=timeout
+                    )
+                response.raise_for_status()
+                current.set_attributes(endpoint=endpoint, bytes=len(response.content))
+                embedding = response.json().get("embedding", [])
+                self.ollama_breaker.record_success(time.time() - request_start)
+            
+                if not embedding:
+                    logger.warning(f"Empty embedding returned for query: {text}")
+                    return None
+            
+                self.embedding_cache.put(text, embedding)
+                return embedding
+            except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+                self.ollama_breaker.record_failure()
+                current.set_attribute("error", str(e))
+                logger.error(f"Error generating embedding: {e}")
+                return None
+    
+    def embed_query_batch(self, texts: List[str], timeout: float) -> List[Optional[List[float]]]:
+        """Send one micro-batch of query texts to Ollama /api/embed (called by the embedding batcher).
+        
+        Successful embeddings are stored in the embedding cache; the outcome is recorded
+        once per batch in the Ollama circuit breaker.
+        
+        Args:
+            texts: Query texts (uncached, distinct)
+            timeout: Timeout of the request in seconds
+            
+        Returns:
+            One embedding (or None if Ollama returned an empty one) per text
+            
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+            ValueError: If Ollama answers with a body that is not JSON
+        """
+        request_start = time.time()
         try:
-            response = requests.post(
-                f"{OLLAMA_ENDPOINT}/api/embeddings",
-                json={"model": EMBEDDING_MODEL, "prompt": text},
-                timeout=10  # shorter timeout for search queries
-            )
+            with self.endpoint_pool.lease() as endpoint:
+                response = self.session.post(
+                    f"{endpoint}/api/embed",
+                    json={"model": EMBEDDING_MODEL, "input": texts, "keep_alive": self.residency.keep_alive},
+                    timeout=timeout
+                )
             response.raise_for_status()
-            embedding = response.json().get("embedding", [])
-            
-            if not embedding:
+            payload = response.json()
+            embeddings = payload.get("embeddings", [])
+        except (requests.exceptions.RequestException, ValueError, AttributeError):
+            # Reason: every failed call must reach the breaker, or a half-open trial never ends
+            self.ollama_breaker.record_failure()
+            raise
+        self.residency.observe(endpoint, payload)
+        # Reason: a batch takes longer than one embedding, so only single texts are judged by the slow-call threshold
+        self.ollama_breaker.record_success(time.time() - request_start if len(texts) == 1 else None)
+        
+        for text, embedding in zip(texts, embeddings):
+            if embedding:
+                self.embedding_cache.put(text, embedding)
+            else:
                 logger.warning(f"Empty embedding returned for query: {text}")
-                return None
-                
-            return embedding
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error generating embedding: {e}")
-            return None
+        return [embedding or None for embedding in embeddings]
+    
+    def generate_embeddings(self, texts: List[str], timeout: float = BATCH_TIMEOUT_SECONDS) -> List[Optional[List[float]]]:
+        """Generate embeddings for several queries, batching cache misses into few Ollama calls.
+        
+        Args:
+            texts: Query texts
+            timeout: Timeout of each batch request in seconds
+            
+        Returns:
+            One embedding (or None if generation failed) per text, in input order
+        """
+        with span("embed", texts=len(texts)) as current:
+            self.refresh_model_digest()
+            embeddings: List[Optional[List[float]]] = [None] * len(texts)
+            missing: Dict[str, List[int]] = {}  # Uncached text -> positions
+            for position, text in enumerate(texts):
+                if not text or not text.strip():
+                    continue
+                embeddings[position] = self.embedding_cache.get(text)
+                if embeddings[position] is None:
+                    missing.setdefault(text, []).append(position)
+            current.set_attributes(cache_hits=sum(1 for e in embeddings if e is not None), cache_misses=len(missing))
+        
+            if missing and self.projection is not None and self.projection.method == "pca":
+                # Reason: /api/embed returns unit-length vectors, while the PCA mean was fitted on
+                # /api/embeddings output; single requests keep the projected vectors identical
+                for text, positions in missing.items():
+                    embedding = self.generate_embedding(text)
+                    for position in positions:
+                        embeddings[position] = embedding
+                return embeddings
+        
+            pending = list(missing)
+            received_bytes = 0
+            for offset in range(0, len(pending), EMBEDDING_BATCH_SIZE):
+                batch = pending[offset:offset + EMBEDDING_BATCH_SIZE]
+                if not self.ollama_breaker.allow():
+                    logger.warning(f"Ollama circuit breaker is open, skipping {len(pending) - offset} query embeddings")
+                    current.set_attribute("breaker_open", True)
+                    break
+            
+                try:
+                    request_start = time.time()
+                    with self.endpoint_pool.lease() as endpoint:
+                        response = self.session.post(
+                            f"{endpoint}/api/embed",
+                            json={"model": EMBEDDING_MODEL, "input": batch, "keep_alive": self.residency.keep_alive},
+                            headers={PRIORITY_HEADER: "batch"},  # Offline query batches yield to live searches
+                            timeout=timeout
+                        )
+                    response.raise_for_status()
+                    received_bytes += len(response.content)
+                    payload = response.json()
+                    self.residency.observe(endpoint, payload)
+                    batch_embeddings = payload.get("embeddings", [])
+                    # Reason: a batch takes longer than one embedding, so it is not judged by the slow-call threshold
+                    self.ollama_breaker.record_success()
+                    logger.info(f"Generated {len(batch_embeddings)} query embeddings in {time.time() - request_start:.2f} seconds")
+                except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+                    self.ollama_breaker.record_failure()
+                    logger.error(f"Error generating {len(batch)} query embeddings: {e}")
+                    continue
+            
+                if len(batch_embeddings) != len(batch):
+                    logger.warning(f"Ollama returned {len(batch_embeddings)} embeddings for {len(batch)} queries")
+                    continue
+                for text, embedding in zip(batch, batch_embeddings):
+                    if not embedding:
+                        continue
+                    self.embedding_cache.put(text, embedding)
+                    for position in missing[text]:
+                        embeddings[position] = embedding
+            current.set_attribute("bytes", received_bytes)
+            return embeddings
+    
+    def index_version(self) -> Tuple[str, str, int]:
+        """Read the current versions of the Solr index and the Qdrant collection.
+        
+        Returns:
+            Tuple of (Solr index version, Qdrant collection behind the alias, Qdrant point count);
+            with the Solr vector backend the Solr index version covers the vectors as well
+            
+        Raises:
+            requests.exceptions.RequestException: If Solr cannot be reached
+            Exception: If Qdrant cannot be reached
+        """
+        response = self.session.get(
+            f"{SOLR_ENDPOINT}/admin/luke",
+            params={"numTerms": 0, "show": "index", "wt": "json"},
+            timeout=5
+        )
+        response.raise_for_status()
+        solr_version = str(response.json().get("index", {}).get("version", ""))
+        if self.vector_backend == "solr":
+            return solr_version, "solr", 0
+        
+        # Blue/green rebuilds switch the alias; incremental updates change the point count
+        collection = resolve_alias(self.qdrant_client, COLLECTION_NAME) or COLLECTION_NAME
+        points_count = self.qdrant_client.get_collection(collection).points_count or 0
+        return solr_version, collection, points_count
     
-    def solr_search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+    def refresh_index_version(self) -> bool:
+        """Update the result cache with the current index version (throttled).
+        
+        Returns:
+            True if the index version is known and cached results may be used
+        """
+        now = time.time()
+        if now - self._index_version_checked_at < INDEX_VERSION_CHECK_SECONDS:
+            return self._index_version_known
+        self._index_version_checked_at = now
+        
+        try:
+            self.result_cache.set_index_version(self.index_version())
+            self._index_version_known = True
+        except Exception as e:
+            logger.warning(f"Could not read index versions, bypassing result cache: {e}")
+            self._index_version_known = False
+        return self._index_version_known
+    
+    def stats(self) -> Dict:
+        """Return cache and Ollama pool statistics of this searcher.
+        
+        Returns:
+            Dict with one entry per component
+        """
+        return {
+            "embedding_cache": self.embedding_cache.stats(),
+            "result_cache": self.result_cache.stats(),
+            "ollama_breaker": self.ollama_breaker.stats(),
+            "ollama_endpoints": self.endpoint_pool.stats(),
+            "citation_index": self.citation_index.stats() if self.citation_index else None,
+            "embedding_batcher": self.embedding_batcher.stats() if self.embedding_batcher else None,
+            "model_residency": self.residency.stats(),
+            "candidate_pool": dict(self.pool_stats.stats(), adaptive=self.adaptive_pool),
+            "ann": self.ann._asdict(),
+            "vector_backend": self.vector_backend,
+        }
+    
+    def solr_search(self, query: str, limit: int = DEFAULT_LIMIT, fields: Optional[str] = None,
+                    timeout: float = SOLR_TIMEOUT_SECONDS, filters: Optional[Filters] = None,
+                    start: int = 0) -> List[Dict]:
         """Perform keyword search using Solr.
         
         Args:
             query: Search query text
             limit: Maximum number of results to return
+            fields: Stored fields to return (default: full document fields)
+            timeout: Request timeout in seconds (also passed to Solr as timeAllowed)
+            filters: Normalized field filters, sent as one fq clause per field
+            start: Rank of the first result (continues an earlier search with the same query)
             
         Returns:
             List of document dicts with search scores
@@ -209,24 +661,38 @@ class HybridSearcher:
             params = {
                 "q": query,
                 # No longer need fq filters - weggefallen docs are excluded at index time
+                "start": start,
                 "rows": limit,
-                "fl": "id,enbez,kurzue,langue,norm_type,parent_document_id,jurabk,amtabk,text_content,text_content_html,fussnoten_content_html,score",
+                "fl": f"{fields or SOLR_DOCUMENT_FIELDS},score",
                 "defType": "edismax",
-                "qf": "text_content^1.0 enbez^2.0 kurzue^1.5 amtabk^1.8 jurabk^1.8",
+                "qf": SOLR_QUERY_FIELDS,
                 "mm": "2<70%",  # Match at least 70% of terms for multi-term queries
                 "pf": "enbez^4.0 text_content^2.0",  # Phrase fields
                 "ps": "2",  # Phrase slop
+                # Reason: the /select defaults enable highlighting, facets and spellcheck,
+                # none of which the hybrid result uses
+                "hl": "false",
+                "facet": "false",
+                "spellcheck": "false",
+                # Solr stops collecting after this time and returns partial results
+                "timeAllowed": int(timeout * 1000),
                 "wt": "json"
             }
+            if filters:
+                # Reason: each fq clause is cached separately in Solr's filterCache
+                params["fq"] = solr_filter_queries(filters)
             
-            response = requests.get(
-                f"{SOLR_ENDPOINT}/select",
-                params=params
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            docs = result.get("response", {}).get("docs", [])
+            with span("solr_search", rows=limit, filtered=bool(filters)) as current:
+                response = self.session.get(
+                    f"{SOLR_ENDPOINT}/select",
+                    params=params,
+                    timeout=timeout
+                )
+                response.raise_for_status()
+                result = response.json()
+                docs = result.get("response", {}).get("docs", [])
+                current.set_attributes(result_count=len(docs), bytes=len(response.content),
+                                       partial=bool(result.get("responseHeader", {}).get("partialResults")))
             
             # Add search source to each document
             for doc in docs:
@@ -239,11 +705,15 @@ class HybridSearcher:
             logger.error(f"Error in Solr search: {e}")
             return []
     
-    def get_solr_documents_by_ids(self, doc_ids: List[str]) -> Dict[str, Dict]:
+    def get_solr_documents_by_ids(self, doc_ids: List[str], timeout: float = SOLR_TIMEOUT_SECONDS) -> Dict[str, Dict]:
         """Retrieve full document data from Solr by document IDs.
         
+        Uses the realtime /get handler, which looks documents up by their unique key
+        instead of scoring a boolean query over all IDs.
+        
         Args:
             doc_ids: List of document IDs to retrieve
+            timeout: Request timeout in seconds
             
         Returns:
             Dictionary mapping document ID to full document data
@@ -254,25 +724,22 @@ class HybridSearcher:
         try:
             start_time = time.time()
             
-            # Build query to fetch documents by IDs
-            id_query = " OR ".join([f'id:"{doc_id}"' for doc_id in doc_ids])
-            
             params = {
-                "q": id_query,
-                # No longer need fq filters - weggefallen docs are excluded at index time
-                "rows": len(doc_ids),
-                "fl": "id,enbez,kurzue,langue,norm_type,parent_document_id,jurabk,amtabk,text_content,text_content_html,fussnoten_content_html",
+                "ids": ",".join(doc_ids),
+                "fl": SOLR_DOCUMENT_FIELDS,
                 "wt": "json"
             }
             
-            response = requests.get(
-                f"{SOLR_ENDPOINT}/select",
-                params=params
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            docs = result.get("response", {}).get("docs", [])
+            with span("solr_hydration", ids=len(doc_ids), mode="full") as current:
+                response = self.session.get(
+                    f"{SOLR_ENDPOINT}/get",
+                    params=params,
+                    timeout=timeout
+                )
+                response.raise_for_status()
+                result = response.json()
+                docs = result.get("response", {}).get("docs", [])
+                current.set_attributes(result_count=len(docs), bytes=len(response.content))
             
             # Create dictionary mapping ID to document
             doc_dict = {doc["id"]: doc for doc in docs}
@@ -284,193 +751,1242 @@ class HybridSearcher:
             logger.error(f"Error retrieving documents from Solr: {e}")
             return {}
     
-    def semantic_search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
-        """Perform semantic search using Qdrant.
+    def get_solr_snippets_by_ids(self, doc_ids: List[str], query: str,
+                                 timeout: float = SOLR_TIMEOUT_SECONDS) -> Dict[str, Dict]:
+        """Retrieve document metadata plus highlighted snippets from Solr by document IDs.
+        
+        The documents are selected with a terms filter on the ID; the snippets are
+        highlighted for the user query (hl.q), so semantic-only hits get a leading
+        summary of the text instead.
         
         Args:
-            query: Search query text
-            limit: Maximum number of results to return
+            doc_ids: List of document IDs to retrieve
+            query: User query the snippets are highlighted for
+            timeout: Request timeout in seconds
             
         Returns:
-            List of document dicts with search scores
+            Dictionary mapping document ID to metadata with a "snippets" list
         """
+        if not doc_ids:
+            return {}
+        
         try:
             start_time = time.time()
             
-            # Generate embedding for the query
-            embedding = self.generate_embedding(query)
-            if not embedding:
-                logger.warning("Could not generate embedding for semantic search.")
-                return []
+            params = {
+                "q": "{!terms f=id}" + ",".join(doc_ids),
+                "rows": len(doc_ids),
+                "fl": SOLR_METADATA_FIELDS,
+                "hl": "true",
+                "hl.method": "unified",
+                "hl.fl": SNIPPET_FIELD,
+                "hl.q": query,
+                "hl.qparser": "edismax",
+                "qf": SOLR_QUERY_FIELDS,
+                "hl.snippets": SNIPPET_COUNT,
+                "hl.fragsize": SNIPPET_FRAGSIZE,
+                "hl.defaultSummary": "true",  # Leading text for documents without a match
+                "hl.tag.pre": "<mark>",
+                "hl.tag.post": "</mark>",
+                "facet": "false",
+                "spellcheck": "false",
+                "wt": "json"
+            }
             
-            # Search in Qdrant using the correct parameters for query_points
-            search_results = self.qdrant_client.query_points(
-                collection_name=COLLECTION_NAME,
-                query=embedding,  # Changed from query_vector to query
-                limit=limit,
-                with_payload=True,
-                score_threshold=0.5  # Set minimum similarity threshold
-            )
-            
-            # Convert Qdrant results to a format similar to Solr (updated for query_points return structure)
-            docs = []
-            for point in search_results.points:
-                # Extract payload
-                payload = point.payload
+            with span("solr_hydration", ids=len(doc_ids), mode="snippets") as current:
+                response = self.session.get(
+                    f"{SOLR_ENDPOINT}/select",
+                    params=params,
+                    timeout=timeout
+                )
+                response.raise_for_status()
+                result = response.json()
+                current.set_attributes(result_count=result.get("response", {}).get("numFound", 0),
+                                       bytes=len(response.content))
+            
+            highlighting = result.get("highlighting", {})
+            doc_dict = {}
+            for doc in result.get("response", {}).get("docs", []):
+                doc["snippets"] = highlighting.get(doc["id"], {}).get(SNIPPET_FIELD, [])
+                doc_dict[doc["id"]] = doc
+            
+            logger.info(f"Retrieved {len(doc_dict)} document snippets from Solr in {time.time() - start_time:.2f} seconds")
+            return doc_dict
+        
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error retrieving snippets from Solr: {e}")
+            return {}
+    
+    def get_document(self, doc_id: str) -> Optional[Dict]:
+        """Retrieve one document with its full text, e.g. after a snippets search.
+        
+        Args:
+            doc_id: Document ID
+            
+        Returns:
+            Full document data, or None if the document does not exist
+        """
+        return self.get_solr_documents_by_ids([doc_id]).get(doc_id)
+    
+    def query_vector_name(self) -> Optional[str]:
+        """Determine which Qdrant vector the query embedding is searched against.
+        
+        Returns:
+            Name of the vector, or None for collections with a single unnamed vector
+        """
+        if self.projection is not None:
+            return self.projection.vector_name
+        
+        if not self._vector_name_resolved:
+            # Collections storing full and reduced vectors use named vectors
+            vectors_config = self.qdrant_client.get_collection(COLLECTION_NAME).config.params.vectors
+            self._vector_name = FULL_VECTOR_NAME if isinstance(vectors_config, dict) else None
+            self._vector_name_resolved = True
+        return self._vector_name
+    
+    def semantic_search(self, query: str, limit: int = DEFAULT_LIMIT, deadline: Optional[Deadline] = None,
+                        filters: Optional[Filters] = None, ann: Optional[AnnParams] = None,
+                        fields: Optional[str] = None, query_vector: Optional[Dict] = None) -> Optional[List[Dict]]:
+        """Perform semantic search using Qdrant (or the Solr vector field).
+        
+        Args:
+            query: Search query text
+            limit: Maximum number of results to return
+            deadline: Deadline of the semantic path; embedding and Qdrant timeouts derive from it
+            filters: Normalized field filters, applied as Qdrant payload filter during the search
+            ann: ANN parameters (default: the searcher's)
+            fields: Stored fields of Solr kNN hits (Solr backend only, default: full document fields)
+            query_vector: Query embedding of an earlier round of the same search under "embedding";
+                without one the generated embedding is stored there for later rounds
+            
+        Returns:
+            List of document dicts with search scores, or None if the semantic path failed
+        """
+        with span("semantic_search", limit=limit) as semantic_span:
+            try:
+                start_time = time.time()
+            
+                # Reason: a wider pool searches with the same vector, so expanding costs no second embedding
+                embedding = query_vector.get("embedding") if query_vector is not None else None
+                if embedding is None:
+                    # Generate embedding for the query
+                    embedding_timeout = (deadline.timeout(cap=EMBEDDING_TIMEOUT_SECONDS) if deadline
+                                         else EMBEDDING_TIMEOUT_SECONDS)
+                    embedding = self.generate_embedding(query, timeout=embedding_timeout)
+                    if not embedding:
+                        logger.warning("Could not generate embedding for semantic search.")
+                        return None
+                    if query_vector is not None:
+                        query_vector["embedding"] = embedding
                 
-                # Filter out repealed documents at the semantic search level
-                norm_type = payload.get("norm_type", "")
-                titel = payload.get("titel", "")
-                text_content = payload.get("text_content", "")
+                ann = ann or self.ann
+                if self.vector_backend == "solr":
+                    solr_timeout = deadline.timeout(cap=SOLR_TIMEOUT_SECONDS) if deadline else SOLR_TIMEOUT_SECONDS
+                    docs = self.solr_knn_search(embedding, limit, filters, ann, fields, timeout=solr_timeout)
+                    semantic_span.set_attribute("result_count", len(docs))
+                    logger.info(f"Solr kNN search returned {len(docs)} results in {time.time() - start_time:.2f} seconds")
+                    return docs
+            
+                if self.projection is not None:
+                    embedding = self.projection.transform(embedding)
+            
+                exact = ann.exact or self.is_small_subset(filters, ann.exact_below)
                 
-                # Skip documents that are repealed or contain "(weggefallen)"
-                if (norm_type == "repealed" or 
-                    titel == "(weggefallen)" or 
-                    text_content == "(weggefallen)"):
+                # Search in Qdrant using the correct parameters for query_points
+                with span("qdrant", limit=limit, filtered=bool(filters), exact=exact,
+                          hnsw_ef=ann.hnsw_ef or 0) as current:
+                    search_results = self.qdrant_client.query_points(
+                        collection_name=COLLECTION_NAME,
+                        query=embedding,  # Changed from query_vector to query
+                        using=self.query_vector_name(),
+                        query_filter=qdrant_filter(filters),
+                        search_params=ann.search_params(exact),
+                        limit=limit,
+                        with_payload=True,
+                        score_threshold=ann.score_threshold,  # Set minimum similarity threshold
+                        timeout=max(1, math.ceil(deadline.remaining())) if deadline else None
+                    )
+                    current.set_attribute("result_count", len(search_results.points))
+            
+                docs = self.semantic_documents(search_results.points)
+                semantic_span.set_attribute("result_count", len(docs))
+                logger.info(f"Semantic search returned {len(docs)} results in {time.time() - start_time:.2f} seconds")
+                return docs
+            
+            except Exception as e:
+                logger.error(f"Error in semantic search: {e}")
+                return None
+    
+    def solr_knn_search(self, embedding: List[float], limit: int, filters: Optional[Filters] = None,
+                        ann: Optional[AnnParams] = None, fields: Optional[str] = None,
+                        timeout: float = SOLR_TIMEOUT_SECONDS) -> List[Dict]:
+        """Search the Solr vector field with {!knn} (Solr backend).
+        
+        The hits come from the same core as the keyword results and carry the requested
+        stored fields, so semantic-only documents need no separate hydration request.
+        Solr's HNSW search has no ef parameter; hnsw_ef widens topK instead and the
+        extra neighbours are cut off afterwards. exact and the quantization parameters
+        do not apply to Solr.
+        
+        Args:
+            embedding: Full query embedding (the Solr field stores unreduced vectors)
+            limit: Maximum number of results to return
+            filters: Normalized field filters, sent as fq (Solr pre-filters kNN with them)
+            ann: ANN parameters (default: the searcher's)
+            fields: Stored fields to return (default: full document fields)
+            timeout: Request timeout in seconds
+            
+        Returns:
+            List of document dicts with cosine similarity scores
+            
+        Raises:
+            requests.exceptions.RequestException: If the Solr request fails
+        """
+        ann = ann or self.ann
+        top_k = max(limit, ann.hnsw_ef or 0)
+        params = {
+            "q": knn_query(embedding, top_k),
+            "rows": top_k,
+            "fl": f"{fields or SOLR_DOCUMENT_FIELDS},score",
+            "hl": "false",
+            "facet": "false",
+            "spellcheck": "false",
+            "wt": "json"
+        }
+        if filters:
+            params["fq"] = solr_filter_queries(filters)
+        
+        with span("solr_knn", top_k=top_k, filtered=bool(filters)) as current:
+            # Reason: a 1024-dimensional vector does not fit into a GET URL reliably
+            response = self.session.post(f"{SOLR_ENDPOINT}/select", data=params, timeout=timeout)
+            response.raise_for_status()
+            docs = response.json().get("response", {}).get("docs", [])
+            current.set_attributes(result_count=len(docs), bytes=len(response.content))
+        
+        results = []
+        for doc in docs[:limit]:
+            # Same score scale as Qdrant, so the threshold and the fusion behave alike
+            doc["score"] = cosine_from_solr(doc.get("score", 0.0))
+            if ann.score_threshold is not None and doc["score"] < ann.score_threshold:
+                continue
+            doc["search_source"] = "semantic"
+            results.append(doc)
+        return results
+    
+    def is_small_subset(self, filters: Optional[Filters], exact_below: int) -> bool:
+        """Check whether a filtered search covers few enough points to run exactly.
+        
+        On a small subset the HNSW graph is sparse and an exact scan is both cheaper and
+        complete. The subset size is an estimate from Qdrant's payload index, cached per filter.
+        
+        Args:
+            filters: Normalized field filters
+            exact_below: Maximum subset size for exact search (0 disables the check)
+            
+        Returns:
+            True if the filtered subset has at most exact_below points
+        """
+        if not filters or exact_below <= 0:
+            return False
+        key = filter_key(filters)
+        count = self.filter_counts.get(key)
+        if count is None:
+            try:
+                count = self.qdrant_client.count(COLLECTION_NAME, count_filter=qdrant_filter(filters),
+                                                 exact=False).count
+            except Exception as e:
+                logger.warning(f"Could not count points for filter {key}: {e}")
+                return False
+            self.filter_counts.put(key, count)
+        return count <= exact_below
+    
+    @staticmethod
+    def semantic_documents(points: List) -> List[Dict]:
+        """Convert Qdrant points into Solr-like result documents.
+        
+        Args:
+            points: Scored points returned by Qdrant
+            
+        Returns:
+            List of document dicts with search scores, repealed norms removed
+        """
+        docs = []
+        for point in points:
+            # Extract payload
+            payload = point.payload
+            
+            # Filter out repealed documents at the semantic search level
+            norm_type = payload.get("norm_type", "")
+            titel = payload.get("titel", "")
+            text_content = payload.get("text_content", "")
+            
+            # Skip documents that are repealed or contain "(weggefallen)"
+            if (norm_type == "repealed" or 
+                titel == "(weggefallen)" or 
+                text_content == "(weggefallen)"):
+                continue
+            
+            # Create a document dict similar to Solr's output
+            doc = {
+                "id": payload.get("original_id", ""),
+                "enbez": payload.get("enbez", ""),
+                "kurzue": payload.get("kurzue", ""),
+                "langue": payload.get("langue", ""),
+                "norm_type": norm_type,
+                "parent_document_id": payload.get("parent_document_id", ""),
+                "jurabk": payload.get("jurabk", ""),
+                "amtabk": payload.get("amtabk", ""),
+                "score": point.score,  # Similarity score from Qdrant (0-1)
+                "search_source": "semantic"
+            }
+            docs.append(doc)
+        return docs
+    
+    def semantic_search_many(self, queries: List[str], limit: int = DEFAULT_LIMIT,
+                             ann: Optional[AnnParams] = None,
+                             filters: Optional[Filters] = None) -> List[Optional[List[Dict]]]:
+        """Semantic search for several queries with batched embeddings and Qdrant batch queries.
+        
+        Args:
+            queries: Search query texts
+            limit: Maximum number of results per query
+            ann: ANN parameters (default: the searcher's)
+            filters: Normalized field filters shared by all queries
+            
+        Returns:
+            One result list per query (None where the embedding or the Qdrant query failed)
+        """
+        start_time = time.time()
+        results: List[Optional[List[Dict]]] = [None] * len(queries)
+        
+        embeddings = self.generate_embeddings(queries)
+        ann = ann or self.ann
+        
+        if self.vector_backend == "solr":
+            # Reason: Solr has no batch kNN endpoint; the keyword queries of the batch run concurrently meanwhile
+            for position, embedding in enumerate(embeddings):
+                if not embedding:
                     continue
+                try:
+                    results[position] = self.solr_knn_search(embedding, limit, filters, ann=ann,
+                                                             timeout=BATCH_TIMEOUT_SECONDS)
+                except requests.exceptions.RequestException as e:
+                    logger.error(f"Error in Solr kNN search for query {position}: {e}")
+            logger.info(f"Solr kNN search for {len(queries)} queries took {time.time() - start_time:.2f} seconds")
+            return results
                 
-                # Create a document dict similar to Solr's output
-                doc = {
-                    "id": payload.get("original_id", ""),
-                    "enbez": payload.get("enbez", ""),
-                    "kurzue": payload.get("kurzue", ""),
-                    "langue": payload.get("langue", ""),
-                    "norm_type": norm_type,
-                    "parent_document_id": payload.get("parent_document_id", ""),
-                    "jurabk": payload.get("jurabk", ""),
-                    "amtabk": payload.get("amtabk", ""),
-                    "score": point.score,  # Similarity score from Qdrant (0-1)
-                    "search_source": "semantic"
-                }
-                docs.append(doc)
-            
-            logger.info(f"Semantic search returned {len(docs)} results in {time.time() - start_time:.2f} seconds")
-            return docs
+        query_filter = qdrant_filter(filters)
+        exact = ann.exact or self.is_small_subset(filters, ann.exact_below)
+        query_requests = []
+        positions = []
+        for position, embedding in enumerate(embeddings):
+            if not embedding:
+                continue
+            if self.projection is not None:
+                embedding = self.projection.transform(embedding)
+            query_requests.append(qdrant_models.QueryRequest(
+                query=embedding,
+                using=self.query_vector_name(),
+                filter=query_filter,
+                params=ann.search_params(exact),
+                limit=limit,
+                with_payload=True,
+                score_threshold=ann.score_threshold
+            ))
+            positions.append(position)
+        
+        for offset in range(0, len(query_requests), QDRANT_BATCH_SIZE):
+            try:
+                batch = query_requests[offset:offset + QDRANT_BATCH_SIZE]
+                with span("qdrant", queries=len(batch), limit=limit) as current:
+                    responses = self.qdrant_client.query_batch_points(
+                        collection_name=COLLECTION_NAME,
+                        requests=batch,
+                        timeout=BATCH_TIMEOUT_SECONDS
+                    )
+                    current.set_attribute("result_count", sum(len(response.points) for response in responses))
+            except Exception as e:
+                logger.error(f"Error in batched semantic search: {e}")
+                continue
+            for position, response in zip(positions[offset:offset + QDRANT_BATCH_SIZE], responses):
+                results[position] = self.semantic_documents(response.points)
+        
+        logger.info(f"Batched semantic search for {len(queries)} queries took {time.time() - start_time:.2f} seconds")
+        return results
+    
+    def submit_semantic_search(self, query: str, pool_size: int, deadline: Optional[Deadline] = None,
+                               filters: Optional[Filters] = None, ann: Optional[AnnParams] = None,
+                               fields: Optional[str] = None, query_vector: Optional[Dict] = None) -> Optional[Future]:
+        """Start semantic retrieval in the background if the query qualifies for it.
+        
+        Args:
+            query: Search query text
+            pool_size: Number of candidates to fetch
+            deadline: Deadline of the semantic path
+            filters: Normalized field filters
+            ann: ANN parameters (default: the searcher's)
+            fields: Stored fields of Solr kNN hits (Solr backend only)
+            query_vector: Holder of the query embedding shared by the rounds of one search
+
+        Returns:
+            Future with the semantic results, or None if semantic search is skipped
+        """
+        # Determine if we should use semantic search based on query quality
+        if not self.should_use_semantic_search(query):
+            logger.info("Semantic search skipped - using keyword results only")
+            return None
+        # Reason: the Solr query and the embedding-then-Qdrant chain are independent, so the
+        # semantic path starts first on the executor and hybrid latency becomes max(), not sum()
+        return submit_in_context(self.semantic_executor, self.semantic_search, query, pool_size, deadline,
+                                 filters, ann, fields, query_vector)
+    
+    @staticmethod
+    def collect_semantic_results(semantic_future: Optional[Future],
+                                 deadline: Optional[Deadline] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Wait for the semantic results, but not beyond the deadline.
+        
+        Args:
+            semantic_future: Future from submit_semantic_search (None if skipped)
+            deadline: Deadline of the semantic path
             
-        except Exception as e:
-            logger.error(f"Error in semantic search: {e}")
-            return []
+        Returns:
+            Tuple of (semantic results, degraded reason); the reason is None unless the
+            semantic path missed its budget ("semantic_timeout") or failed ("semantic_unavailable")
+        """
+        if semantic_future is None:
+            return [], None
+        try:
+            semantic_results = semantic_future.result(timeout=deadline.remaining() if deadline else None)
+        except FutureTimeoutError:
+            logger.warning("Semantic search missed its latency budget - returning keyword results only")
+            return [], "semantic_timeout"
+        if semantic_results is None:
+            return [], "semantic_unavailable"
+        return semantic_results, None
+    
+    def retrieve_candidates(self, query: str, pool_size: int, keyword_fields: Optional[str] = None,
+                            deadline: Optional[Deadline] = None, filters: Optional[Filters] = None,
+                            ann: Optional[AnnParams] = None, keyword_start: int = 0,
+                            query_vector: Optional[Dict] = None) -> Tuple[List[Dict], List[Dict], Optional[str]]:
+        """Fetch the ranked candidate lists from Solr and Qdrant.
+        
+        Both engines apply the filters themselves, so a filtered pool holds pool_size
+        matching candidates per side instead of a filtered subset of the unfiltered pool.
+
+        Args:
+            query: Search query text
+            pool_size: Number of candidates to fetch from each side
+            keyword_fields: Stored fields of the Solr candidates (default: full document fields); with
+                the Solr vector backend also those of the semantic candidates
+            deadline: Deadline of the retrieval stage (default: no budget)
+            filters: Normalized field filters
+            ann: ANN parameters of the semantic side (default: the searcher's)
+            keyword_start: Keyword candidates already fetched; only Solr ranks from here up to
+                pool_size are returned
+            query_vector: Holder of the query embedding shared by the rounds of one search
+
+        Returns:
+            Tuple of (keyword results, semantic results, degraded reason). Semantic results
+            are empty when semantic search is skipped, missed its budget or failed; the
+            degraded reason tells the last two apart from a regular skip.
+        """
+        semantic_future = self.submit_semantic_search(query, pool_size, deadline, filters, ann, keyword_fields,
+                                                      query_vector)
+        
+        # Always run keyword search (in the calling thread)
+        solr_timeout = deadline.timeout(cap=SOLR_TIMEOUT_SECONDS) if deadline else SOLR_TIMEOUT_SECONDS
+        solr_results = self.solr_search(query, limit=pool_size - keyword_start, fields=keyword_fields,
+                                        timeout=solr_timeout, filters=filters, start=keyword_start)
+        
+        semantic_results, degraded_reason = self.collect_semantic_results(semantic_future, deadline)
+        return solr_results, semantic_results, degraded_reason
+    
+    def retrieve_and_fuse(self, query: str, limit: int, pool_size: int, fusion: str,
+                          keyword_weight: float, semantic_weight: float, adaptive: bool,
+                          deadline: Optional[Deadline] = None, filters: Optional[Filters] = None,
+                          ann: Optional[AnnParams] = None, keyword_fields: Optional[str] = None,
+                          query_vector: Optional[Dict] = None
+                          ) -> Tuple[List[Dict], List[Dict], List[tuple], Optional[str], Dict]:
+        """Retrieve candidates and fuse them, starting with a small pool if adaptive.
+        
+        An adaptive search fetches initial_pool_size candidates per side first and the
+        full pool_size only if the fused top-k of the small pool is unstable (see
+        adaptive_pool.py).
+        
+        Args:
+            query: Search query text
+            limit: Number of results the ranking has to cover
+            pool_size: Full candidate pool per side
+            fusion: Fusion strategy
+            keyword_weight: Normalized keyword weight
+            semantic_weight: Normalized semantic weight
+            adaptive: Start with the small pool
+            deadline: Deadline of the retrieval stage (default: no budget)
+            filters: Normalized field filters
+            ann: ANN parameters of the semantic side (default: the searcher's)
+            keyword_fields: Stored fields of the Solr candidates (default: full document fields)
+            query_vector: Holder of the query embedding (default: one for this call only)
+            
+        Returns:
+            Tuple of (keyword results, semantic results, fused ranking, degraded reason,
+            pool information with initial, final, expanded and the stability assessment)
+        """
+        initial_pool = initial_pool_size(limit, pool_size, fusion) if adaptive else pool_size
+        query_vector = {} if query_vector is None else query_vector
+        solr_results, semantic_results, degraded_reason = self.retrieve_candidates(
+            query, initial_pool, keyword_fields=keyword_fields, deadline=deadline, filters=filters, ann=ann,
+            query_vector=query_vector)
+        solr_results, semantic_results, ranked, pool_info = self.settle_pool(
+            query, limit, initial_pool, pool_size, fusion, keyword_weight, semantic_weight, solr_results,
+            semantic_results, degraded_reason, deadline, filters, ann, keyword_fields, query_vector)
+        return solr_results, semantic_results, ranked, degraded_reason, pool_info
+    
+    def settle_pool(self, query: str, limit: int, initial_pool: int, pool_size: int, fusion: str,
+                    keyword_weight: float, semantic_weight: float, solr_results: List[Dict],
+                    semantic_results: List[Dict], degraded_reason: Optional[str],
+                    deadline: Optional[Deadline] = None, filters: Optional[Filters] = None,
+                    ann: Optional[AnnParams] = None, keyword_fields: Optional[str] = None,
+                    query_vector: Optional[Dict] = None) -> Tuple[List[Dict], List[Dict], List[tuple], Dict]:
+        """Fuse the candidates of the initial pool and expand it if its top-k is unstable.
+        
+        Args:
+            query: Search query text
+            limit: Number of results the ranking has to cover
+            initial_pool: Candidates per side fetched so far
+            pool_size: Full candidate pool per side
+            fusion: Fusion strategy
+            keyword_weight: Normalized keyword weight
+            semantic_weight: Normalized semantic weight
+            solr_results: Keyword candidates of the initial pool
+            semantic_results: Semantic candidates of the initial pool
+            degraded_reason: Degraded reason of the initial retrieval
+            deadline: Deadline of the retrieval stage (default: no budget)
+            filters: Normalized field filters
+            ann: ANN parameters of the semantic side (default: the searcher's)
+            keyword_fields: Stored fields of the Solr candidates (default: full document fields)
+            query_vector: Holder of the query embedding filled by the initial retrieval
+            
+        Returns:
+            Tuple of (keyword results, semantic results, fused ranking, pool information)
+        """
+        ranked = fuse(fusion, solr_results, semantic_results, keyword_weight, semantic_weight)
+        pool_info = {"initial": initial_pool, "final": initial_pool, "expanded": False, "assessment": None}
+        if initial_pool >= pool_size:
+            return solr_results, semantic_results, ranked, pool_info
+        
+        assessment = assess_stability(ranked, len(solr_results), len(semantic_results), initial_pool, limit,
+                                      keyword_weight, semantic_weight)
+        pool_info["assessment"] = assessment
+        # Reason: a degraded first round has no semantic side to be unstable about, and an
+        # expired budget would turn the expansion into keyword-only results
+        if not assessment["stable"] and degraded_reason is None and not (deadline and deadline.expired()):
+            more_keyword, more_semantic, expanded_reason = self.expand_candidates(
+                query, pool_size, solr_results, deadline, filters, ann, keyword_fields, query_vector)
+            if expanded_reason is None:
+                solr_results, semantic_results = more_keyword, more_semantic
+                ranked = fuse(fusion, solr_results, semantic_results, keyword_weight, semantic_weight)
+                pool_info.update(final=pool_size, expanded=True)
+            else:
+                logger.warning(f"Expanded candidate pool degraded ({expanded_reason}) - keeping the initial pool")
+        self.pool_stats.record(initial_pool, pool_info["final"], pool_size, assessment)
+        return solr_results, semantic_results, ranked, pool_info
     
-    def combined_search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+    def expand_candidates(self, query: str, pool_size: int, solr_results: List[Dict],
+                          deadline: Optional[Deadline] = None, filters: Optional[Filters] = None,
+                          ann: Optional[AnnParams] = None, keyword_fields: Optional[str] = None,
+                          query_vector: Optional[Dict] = None) -> Tuple[List[Dict], List[Dict], Optional[str]]:
+        """Fetch the full candidate pool, continuing the keyword side after the known candidates.
+        
+        Args:
+            query: Search query text
+            pool_size: Full candidate pool per side
+            solr_results: Keyword candidates fetched so far
+            deadline: Deadline of the retrieval stage (default: no budget)
+            filters: Normalized field filters
+            ann: ANN parameters of the semantic side (default: the searcher's)
+            keyword_fields: Stored fields of the Solr candidates (default: full document fields)
+            query_vector: Holder of the query embedding of the first round, reused for the wider search
+            
+        Returns:
+            Tuple of (all keyword results, semantic results of the full pool, degraded reason)
+        """
+        # Reason: Solr candidates carry full documents, so only the ranks beyond the known ones are fetched
+        more_keyword, semantic_results, degraded_reason = self.retrieve_candidates(
+            query, pool_size, keyword_fields=keyword_fields, deadline=deadline, filters=filters, ann=ann,
+            keyword_start=len(solr_results), query_vector=query_vector)
+        known_ids = {doc["id"] for doc in solr_results}
+        keyword_results = solr_results + [doc for doc in more_keyword if doc["id"] not in known_ids]
+        return keyword_results, semantic_results, degraded_reason
+    
+    @staticmethod
+    def merge_scores(full_doc: Dict, score_info: Dict) -> Dict:
+        """Merge fusion scores into a full Solr document.
+        
+        Args:
+            full_doc: Document with full content from Solr
+            score_info: Fusion score information of the document
+            
+        Returns:
+            The updated document
+        """
+        full_doc.update({
+            "keyword_score": score_info["keyword_score"],
+            "semantic_score": score_info["semantic_score"],
+            "combined_score": score_info["combined_score"],
+            "search_source": score_info["search_source"],
+            "score": score_info["combined_score"]  # Set score to combined score for sorting
+        })
+        return full_doc
+    
+    def resolve_search_options(self, limit: int, weights: Optional[Tuple[float, float]],
+                               fusion: Optional[str], candidate_pool: Optional[int]) -> Tuple[float, float, str, int]:
+        """Apply defaults to per-request search options and validate them.
+        
+        Args:
+            limit: Number of results the pool has to cover
+            weights: Per-request weights or None
+            fusion: Fusion strategy or None
+            candidate_pool: Candidates per side or None
+            
+        Returns:
+            Tuple of (keyword_weight, semantic_weight, fusion, pool_size)
+            
+        Raises:
+            ValueError: If the fusion strategy is unknown
+        """
+        if weights is None:
+            keyword_weight, semantic_weight = self.keyword_weight, self.semantic_weight
+        else:
+            keyword_weight, semantic_weight = self.normalize_weights(weights)
+        
+        fusion = fusion or HYBRID_FUSION
+        if fusion not in FUSION_STRATEGIES:
+            raise ValueError(f"Unknown fusion strategy '{fusion}', expected one of {', '.join(FUSION_STRATEGIES)}")
+        pool_size = max(candidate_pool or candidate_pool_size(limit, fusion), limit)
+        return keyword_weight, semantic_weight, fusion, pool_size
+    
+    def combined_search(self, query: str, limit: int = DEFAULT_LIMIT,
+                        weights: Optional[Tuple[float, float]] = None, use_cache: bool = True,
+                        fusion: Optional[str] = None, candidate_pool: Optional[int] = None,
+                        budget: Optional[float] = None,
+                        filters: Optional[Dict[str, Union[str, List[str]]]] = None,
+                        ann: Optional[AnnParams] = None) -> List[Dict]:
         """Perform hybrid search combining results from both keyword and semantic search.
         
         This method uses a two-stage approach:
-        1. Get relevance scores from both Solr (keyword) and Qdrant (semantic)
-        2. Retrieve full document data from Solr for all relevant documents
+        1. Get relevance scores from Solr (keyword) and Qdrant (semantic) concurrently
+        2. Fuse and rank, then fetch full document data from Solr only for semantic-only
+           documents in the result (keyword hits already carry it)
         
         Smart filtering is applied to avoid irrelevant semantic matches for stopword queries.
-        
+        Citation queries ("§ 823 BGB") are resolved through the citation index without
+        Ollama or Qdrant. Repeated searches are answered from the result cache until an
+        index changes. Filters are pushed down to Solr (fq) and Qdrant (payload filter);
+        filtered searches skip the citation lookup.
+
         Args:
             query: Search query text
             limit: Maximum number of results to return
-            
+            weights: Per-request (keyword_weight, semantic_weight), defaults to the searcher's weights
+            use_cache: Read and fill the result cache
+            fusion: Fusion strategy (sigmoid, rrf, minmax), defaults to HYBRID_FUSION
+            candidate_pool: Candidates fetched per side, defaults to the strategy's pool size
+            budget: Latency budget in seconds, defaults to SEARCH_BUDGET_SECONDS. If the semantic
+                path misses it, keyword-only results are returned (and not cached)
+            filters: Field -> value or list of values (see search_filters.FILTER_FIELDS)
+            ann: ANN parameters of the Qdrant search (see ann_params), defaults to the searcher's
+
         Returns:
             List of document dicts with combined ranking and full content
+            
+        Raises:
+            ValueError: If the fusion strategy or a filter field is unknown
         """
-        # Start both searches
-        start_time = time.time()
+        with span("combined_search", limit=limit) as current:
+            start_time = time.time()
+            deadline = Deadline(budget or SEARCH_BUDGET_SECONDS)
         
-        # Always run keyword search
-        fetch_limit = max(limit * 3, 20)  # Get at least 20 results or 3x requested limit
-        solr_results = self.solr_search(query, limit=fetch_limit)
+            keyword_weight, semantic_weight, fusion, pool_size = self.resolve_search_options(
+                limit, weights, fusion, candidate_pool)
+            filters = normalize_filters(filters)
+            ann = ann or self.ann
+            current.set_attributes(fusion=fusion, candidate_pool=pool_size, filters=filter_key(filters))
+            
+            citation_ranking = self.citation_ranking(query) if filters is None else None
+            if citation_ranking is not None:
+                results = self.hydrate_page(citation_ranking[:limit], query, timeout=deadline.timeout(
+                    cap=SOLR_TIMEOUT_SECONDS, minimum=HYDRATION_MIN_TIMEOUT))
+                current.set_attributes(citation=True, result_count=len(results))
+                logger.info(f"Citation lookup returned {len(results)} results in {time.time() - start_time:.3f} seconds")
+                return results
         
-        # Determine if we should use semantic search based on query quality
-        use_semantic = self.should_use_semantic_search(query)
+            cache_key = None
+            if use_cache and self.refresh_index_version():
+                cache_key = ResultCache.key(query, limit, round(keyword_weight, 4), round(semantic_weight, 4),
+                                            fusion, pool_size, filter_key(filters), ann)
+                cached_results = self.result_cache.get(cache_key)
+                current.set_attribute("cache_hit", cached_results is not None)
+                if cached_results is not None:
+                    current.set_attribute("result_count", len(cached_results))
+                    logger.info(f"Returning {len(cached_results)} cached results for query: '{query}'")
+                    return cached_results
         
-        if use_semantic:
-            # Run semantic search only for meaningful queries
-            semantic_results = self.semantic_search(query, limit=fetch_limit)
-        else:
-            # Skip semantic search for stopword/low-quality queries
-            semantic_results = []
-            logger.info("Semantic search skipped - using keyword results only")
+            solr_results, semantic_results, ranked, degraded_reason, pool_info = self.retrieve_and_fuse(
+                query, limit, pool_size, fusion, keyword_weight, semantic_weight,
+                adaptive=self.adaptive_pool and candidate_pool is None,
+                deadline=deadline.child(RETRIEVAL_BUDGET_SHARE), filters=filters, ann=ann)
+            current.set_attributes(initial_pool=pool_info["initial"], pool_expanded=pool_info["expanded"])
         
-        # Create a dictionary to combine results by document ID
-        combined_results = {}
-        all_doc_ids = set()
-        
-        # Process Solr results
-        for doc in solr_results:
-            doc_id = doc["id"]
-            all_doc_ids.add(doc_id)
-            # Normalize Solr score (typically 0-20) to 0-1 scale
-            raw_score = float(doc["score"])
-            
-            # Sigmoid normalization (ensures values between 0-1 with a smoother curve)
-            normalized_score = 1.0 / (1.0 + math.exp(-raw_score / 5 + 1))
-            
-            # If semantic search was skipped, give full weight to keyword results
-            if not use_semantic:
-                combined_results[doc_id] = {
-                    "keyword_score": normalized_score,
-                    "semantic_score": 0.0,
-                    "combined_score": normalized_score,  # Full score since no semantic
-                    "search_source": "keyword"
-                }
-            else:
-                combined_results[doc_id] = {
-                    "keyword_score": normalized_score,
-                    "semantic_score": 0.0,
-                    "combined_score": normalized_score * self.keyword_weight,
-                    "search_source": "keyword"
-                }
-        
-        # Process semantic results only if semantic search was used
-        if use_semantic:
-            for doc in semantic_results:
-                doc_id = doc["id"]
-                all_doc_ids.add(doc_id)
-                
-                if doc_id in combined_results:
-                    # Document exists in both result sets - update scores
-                    combined_results[doc_id]["semantic_score"] = doc["score"]
-                    combined_results[doc_id]["combined_score"] += doc["score"] * self.semantic_weight
-                    combined_results[doc_id]["search_source"] = "hybrid"
-                else:
-                    # New document from semantic search only
-                    combined_results[doc_id] = {
-                        "keyword_score": 0.0,
-                        "semantic_score": doc["score"],
-                        "combined_score": doc["score"] * self.semantic_weight,
-                        "search_source": "semantic"
-                    }
-        
-        # Retrieve full document data from Solr for all document IDs
-        logger.info(f"Retrieving full document data for {len(all_doc_ids)} documents from Solr")
-        full_documents = self.get_solr_documents_by_ids(list(all_doc_ids))
-        
-        # Merge scoring information with full document data
+            # Full document data: Solr already returned it for keyword hits, so only
+            # semantic-only documents that make it into the result are fetched
+            full_documents = {doc["id"]: doc for doc in solr_results}
+            if self.vector_backend == "solr":
+                # Solr kNN hits come from the same core and carry their full data as well
+                full_documents.update({doc["id"]: doc for doc in semantic_results if doc["id"] not in full_documents})
+            final_results = self.hydrate_ranked(ranked, full_documents, limit, deadline)
+        
+            search_type = "hybrid" if semantic_results else "keyword-only"
+            current.set_attributes(result_count=len(final_results), search_type=search_type,
+                                   degraded=degraded_reason or "")
+            logger.info(f"{search_type.title()} search ({fusion}) returned {len(final_results)} results "
+                       f"(from {len(solr_results)} keyword and {len(semantic_results)} semantic"
+                       + (f", pool expanded from {pool_info['initial']} to {pool_info['final']}: "
+                          f"{pool_info['assessment']['reason']}" if pool_info["expanded"] else "")
+                       + f") in {time.time() - start_time:.2f} seconds"
+                       + (f", degraded: {degraded_reason}" if degraded_reason else ""))
+        
+            if cache_key is not None and degraded_reason is None:
+                self.result_cache.put(cache_key, final_results)
+        
+            return final_results
+    
+    def hydrate_ranked(self, ranked: List[tuple], full_documents: Dict[str, Dict], limit: int,
+                       deadline: Optional[Deadline] = None) -> List[Dict]:
+        """Turn the top of a fused ranking into full result documents.
+        
+        Args:
+            ranked: Fused (document ID, score information) pairs in rank order
+            full_documents: Documents loaded so far, keyed by ID; missing ones are added
+            limit: Number of results
+            deadline: Deadline of the search; hydration always gets HYDRATION_MIN_TIMEOUT
+            
+        Returns:
+            Up to limit documents with merged scores
+        """
         final_results = []
-        for doc_id, score_info in combined_results.items():
-            if doc_id in full_documents:
-                # Merge full document data with hybrid search scores
-                full_doc = full_documents[doc_id]
-                
-                # No longer need safety filter - weggefallen docs are excluded at index time
+        position = 0
+        while len(final_results) < limit and position < len(ranked):
+            # Reason: a document missing in Solr is skipped, so the next window backfills the result
+            window = ranked[position:position + limit - len(final_results)]
+            position += len(window)
+            
+            missing_ids = [doc_id for doc_id, _ in window if doc_id not in full_documents]
+            if missing_ids:
+                logger.info(f"Retrieving full document data for {len(missing_ids)} semantic-only documents from Solr")
+                timeout = (deadline.timeout(cap=SOLR_TIMEOUT_SECONDS, minimum=HYDRATION_MIN_TIMEOUT)
+                           if deadline else SOLR_TIMEOUT_SECONDS)
+                full_documents.update(self.get_solr_documents_by_ids(missing_ids, timeout=timeout))
+            
+            # Merge scoring information with full document data
+            for doc_id, score_info in window:
+                if doc_id not in full_documents:
+                    logger.warning(f"Document {doc_id} not found in Solr but was in search results")
+                    continue
                 
-                full_doc.update({
-                    "keyword_score": score_info["keyword_score"],
-                    "semantic_score": score_info["semantic_score"], 
-                    "combined_score": score_info["combined_score"],
-                    "search_source": score_info["search_source"],
-                    "score": score_info["combined_score"]  # Set score to combined score for sorting
-                })
-                final_results.append(full_doc)
+                final_results.append(self.merge_scores(dict(full_documents[doc_id]), score_info))
+        return final_results
+    
+    def combined_search_many(self, queries: List[str], limit: int = DEFAULT_LIMIT,
+                             weights: Optional[Tuple[float, float]] = None, use_cache: bool = True,
+                             fusion: Optional[str] = None, candidate_pool: Optional[int] = None,
+                             ann: Optional[AnnParams] = None,
+                             filters: Optional[Dict[str, Union[str, List[str]]]] = None) -> List[List[Dict]]:
+        """Run combined_search for many queries at batch throughput.
+        
+        Query embeddings are generated with one Ollama request per EMBEDDING_BATCH_SIZE
+        uncached queries, Qdrant is queried through its batch endpoint and the Solr
+        queries run concurrently meanwhile. Semantic-only documents of all queries are
+        loaded from Solr together. There is no latency budget; queries whose semantic
+        path failed get keyword-only results (which are not cached).
+        
+        Args:
+            queries: Search query texts
+            limit: Maximum number of results per query
+            weights: Per-request (keyword_weight, semantic_weight), defaults to the searcher's weights
+            use_cache: Read and fill the result cache
+            fusion: Fusion strategy (sigmoid, rrf, minmax), defaults to HYBRID_FUSION
+            candidate_pool: Candidates fetched per side, defaults to the strategy's pool size
+            ann: ANN parameters of the Qdrant batch search, defaults to the searcher's
+            filters: Field -> value or list of values, applied to every query (see search_filters.FILTER_FIELDS)
+            
+        Returns:
+            One result list per query, in input order
+            
+        Raises:
+            ValueError: If the fusion strategy or a filter field is unknown
+        """
+        start_time = time.time()
+        keyword_weight, semantic_weight, fusion, pool_size = self.resolve_search_options(
+            limit, weights, fusion, candidate_pool)
+        use_cache = use_cache and self.refresh_index_version()
+        ann = ann or self.ann
+        filters = normalize_filters(filters)
+        
+        results: List[List[Dict]] = [[] for _ in queries]
+        cache_keys = {}
+        pending = []
+        for position, query in enumerate(queries):
+            citation_ranking = self.citation_ranking(query) if filters is None else None
+            if citation_ranking is not None:
+                results[position] = self.hydrate_page(citation_ranking[:limit], query)
+                continue
+            if use_cache:
+                cache_keys[position] = ResultCache.key(query, limit, round(keyword_weight, 4), round(semantic_weight, 4),
+                                                       fusion, pool_size, filter_key(filters), ann)
+                cached_results = self.result_cache.get(cache_keys[position])
+                if cached_results is not None:
+                    results[position] = cached_results
+                    continue
+            pending.append(position)
+        
+        # Solr queries run on a thread pool while this thread batches the semantic side
+        with ThreadPoolExecutor(max_workers=BATCH_SOLR_WORKERS, thread_name_prefix="batch-solr") as executor:
+            solr_futures = {position: submit_in_context(executor, self.solr_search, queries[position], pool_size,
+                                                        filters=filters)
+                            for position in pending}
+            semantic_positions = [position for position in pending
+                                  if self.should_use_semantic_search(queries[position])]
+            semantic_results = dict(zip(semantic_positions, self.semantic_search_many(
+                [queries[position] for position in semantic_positions], pool_size, ann, filters)))
+            solr_results = {position: future.result() for position, future in solr_futures.items()}
+        
+        ranked = {position: fuse(fusion, solr_results[position], semantic_results.get(position) or [],
+                                 keyword_weight, semantic_weight)
+                  for position in pending}
+        
+        # Semantic-only documents on the first page of every query are loaded together
+        full_documents = {doc["id"]: doc for position in pending for doc in solr_results[position]}
+        if self.vector_backend == "solr":
+            for position in pending:
+                for doc in semantic_results.get(position) or []:
+                    full_documents.setdefault(doc["id"], doc)
+        missing_ids = list(dict.fromkeys(doc_id for position in pending for doc_id, _ in ranked[position][:limit]
+                                         if doc_id not in full_documents))
+        for offset in range(0, len(missing_ids), HYDRATION_BATCH_SIZE):
+            full_documents.update(self.get_solr_documents_by_ids(missing_ids[offset:offset + HYDRATION_BATCH_SIZE]))
+        
+        degraded = 0
+        for position in pending:
+            results[position] = self.hydrate_ranked(ranked[position], full_documents, limit)
+            if position in semantic_results and semantic_results[position] is None:
+                degraded += 1  # Semantic path failed, keyword-only results are not cached
+            elif position in cache_keys:
+                self.result_cache.put(cache_keys[position], results[position])
+        
+        logger.info(f"Batch of {len(queries)} queries ({len(pending)} searched, {degraded} keyword-only "
+                    f"after semantic failures) took {time.time() - start_time:.2f} seconds")
+        return results
+    
+    def search(self, query: str, limit: int = DEFAULT_LIMIT, start: int = 0, cursor: Optional[str] = None,
+               weights: Optional[Tuple[float, float]] = None, fusion: Optional[str] = None,
+               candidate_pool: Optional[int] = None, mode: str = "full", budget: Optional[float] = None,
+               timings: bool = False, filters: Optional[Dict[str, Union[str, List[str]]]] = None,
+               ann: Optional[AnnParams] = None) -> Dict:
+        """Paginated hybrid search over a cached, fused candidate pool.
+        
+        The first request fuses a candidate pool and keeps its ranking under an opaque
+        cursor. With the adaptive candidate pool, the pool is sized for the first page
+        and widened to the full paging pool (at least PAGE_POOL_SIZE per side) only when a
+        later page runs past the part of the ranking it is stable for. Requests that pass
+        the cursor back are served as slices of that ranking; only the documents on the
+        requested page are fetched from Solr. A later page without a valid cursor builds
+        the pool of the first page and widens it the same way, so it gets the same slice. Citation queries get the cited norms as ranking unless filters
+        are set; filters are pushed down to Solr and Qdrant.
+
+        Args:
+            query: Search query text
+            limit: Page size
+            start: Offset of the page within the fused ranking
+            cursor: Cursor returned by an earlier page of the same search; a cursor of another
+                query, filter set, ANN setting, weighting or fusion is ignored
+            weights: Per-request (keyword_weight, semantic_weight), defaults to the searcher's weights
+            fusion: Fusion strategy (sigmoid, rrf, minmax), defaults to HYBRID_FUSION
+            candidate_pool: Candidates fetched per side, defaults to the strategy's pool size
+            mode: "full" for full documents, "snippets" for metadata plus highlighted snippets
+            budget: Latency budget in seconds, defaults to SEARCH_BUDGET_SECONDS
+            timings: Trace the search and add a timings block (see tracing.Trace.timings)
+            filters: Field -> value or list of values (see search_filters.FILTER_FIELDS)
+            ann: ANN parameters of the Qdrant search (see ann_params), defaults to the searcher's
+
+        Returns:
+            Dict with numFound (size of the fused pool, which grows when a later page widens
+            it), start, cursor, docs and degraded. degraded is True (with degraded_reason) if
+            the semantic path missed its budget or failed and the ranking is keyword-only;
+            such rankings are not cached. With timings, the dict also carries the spans of
+            this search.
+        
+        Raises:
+            ValueError: If the fusion strategy, the result mode or a filter field is unknown
+        """
+        if mode not in RESULT_MODES:
+            raise ValueError(f"Unknown result mode '{mode}', expected one of {', '.join(RESULT_MODES)}")
+        
+        with ensure_trace(timings) as trace, span("search", limit=limit, start=start, mode=mode) as current:
+            start_time = time.time()
+            deadline = Deadline(budget or SEARCH_BUDGET_SECONDS)
+            filters = normalize_filters(filters)
+            ann = ann or self.ann
+            keyword_weight, semantic_weight, fusion, pool_size = self.resolve_search_options(
+                limit, weights, fusion, candidate_pool)
+            fingerprint = self.cursor_fingerprint(query, filters, ann, keyword_weight, semantic_weight, fusion)
+            
+            pool = self.cursor_cache.get(cursor) if cursor else None
+            if pool is not None and pool["fingerprint"] != fingerprint:
+                logger.warning(f"Cursor {cursor} belongs to another search, computing a new pool")
+                pool = None
+            elif cursor and pool is None:
+                logger.info(f"Cursor {cursor} expired, computing a new pool")
+            current.set_attribute("cursor_hit", pool is not None)
+        
+            if pool is None:
+                pool_size = max(pool_size, PAGE_POOL_SIZE)
+            
+                # The pool (IDs and scores only) is shared by all cursors of the same search
+                cache_key = None
+                citation_ranking = self.citation_ranking(query) if filters is None else None
+                if citation_ranking is not None:
+                    pool = {"ranking": citation_ranking, "candidates": None, "degraded_reason": None}
+                elif self.refresh_index_version():
+                    cache_key = ResultCache.key(query, pool_size, "pool", round(keyword_weight, 4),
+                                                round(semantic_weight, 4), fusion, filter_key(filters), ann)
+                    # Reason: the result cache holds lists of dicts, so the pool is cached as a one-element list
+                    pool = next(iter(self.result_cache.get(cache_key) or []), None)
+                    current.set_attribute("cache_hit", pool is not None)
+            
+                if pool is None:
+                    # Reason: the pool is always built for the first page and widened below, so a page
+                    # without a (valid) cursor is cut from the same ranking as one reached by cursor
+                    query_vector: Dict = {}
+                    solr_results, semantic_results, ranked, degraded_reason, pool_info = self.retrieve_and_fuse(
+                        query, limit, pool_size, fusion, keyword_weight, semantic_weight,
+                        adaptive=self.adaptive_pool and candidate_pool is None,
+                        deadline=deadline.child(RETRIEVAL_BUDGET_SHARE), filters=filters, ann=ann,
+                        keyword_fields=SOLR_RANKING_FIELDS, query_vector=query_vector)
+                    current.set_attributes(initial_pool=pool_info["initial"], pool_expanded=pool_info["expanded"])
+                    pool = self.paging_pool(ranked, solr_results, semantic_results, pool_info["final"], pool_size,
+                                            limit, degraded_reason, query_vector.get("embedding"))
+                    if cache_key is not None and degraded_reason is None:
+                        self.result_cache.put(cache_key, [pool])
+            
+                pool = dict(pool, fingerprint=fingerprint)
+                cursor = secrets.token_urlsafe(16)
+                self.cursor_cache.put(cursor, pool)
+            
+            widened = self.widen_pool(pool, query, start + limit, fusion, keyword_weight, semantic_weight,
+                                      deadline.child(RETRIEVAL_BUDGET_SHARE), filters, ann)
+            if widened is not pool:
+                pool = widened
+                self.cursor_cache.put(cursor, pool)
+        
+            ranking = pool["ranking"]
+            page = ranking[start:start + limit]
+            docs = self.hydrate_page(page, query, mode,
+                                     timeout=deadline.timeout(cap=SOLR_TIMEOUT_SECONDS, minimum=HYDRATION_MIN_TIMEOUT))
+        
+            logger.info(f"Page {start}-{start + len(page)} of {len(ranking)} fused results for query '{query}' "
+                        f"in {time.time() - start_time:.2f} seconds")
+            response = self._envelope({"numFound": len(ranking), "start": start, "cursor": cursor, "docs": docs},
+                                      pool["degraded_reason"])
+            current.set_attributes(result_count=len(docs), pool_size=len(ranking), degraded=response["degraded"])
+        
+        if timings and trace is not None:
+            response["timings"] = trace.timings()
+        return response
+    
+    @staticmethod
+    def paging_pool(ranked: List[tuple], solr_results: List[Dict], semantic_results: List[Dict], pool_size: int,
+                    full_pool: int, covered: int, degraded_reason: Optional[str],
+                    query_embedding: Optional[List[float]] = None) -> Dict:
+        """Build the cached state of a paginated search.
+        
+        Args:
+            ranked: Fused (document ID, score information) pairs in rank order
+            solr_results: Keyword candidates the ranking was fused from
+            semantic_results: Semantic candidates the ranking was fused from
+            pool_size: Candidates per side fetched
+            full_pool: Candidates per side of the full paging pool
+            covered: Number of ranks the pool is known to be stable for
+            degraded_reason: Degraded reason of the retrieval, or None
+            query_embedding: Query embedding of the retrieval, reused for widening
+            
+        Returns:
+            Dict with ranking, candidates (IDs and scores, for widening), pool_size,
+            full_pool, covered, degraded_reason and query_embedding (only while the pool
+            can still be widened)
+        """
+        return {
+            "ranking": [dict(score_info, id=doc_id) for doc_id, score_info in ranked],
+            "candidates": {side: [{"id": doc["id"], "score": doc["score"]} for doc in results]
+                           for side, results in (("keyword", solr_results), ("semantic", semantic_results))},
+            "pool_size": pool_size,
+            "full_pool": full_pool,
+            "covered": covered,
+            "degraded_reason": degraded_reason,
+            "query_embedding": query_embedding if pool_size < full_pool else None,
+        }
+    
+    def widen_pool(self, pool: Dict, query: str, end: int, fusion: str, keyword_weight: float,
+                   semantic_weight: float, deadline: Optional[Deadline] = None,
+                   filters: Optional[Filters] = None, ann: Optional[AnnParams] = None) -> Dict:
+        """Make a paging pool cover the ranking up to the end of a page.
+        
+        An adaptive pool is only known to be stable for the page it was fused for. A
+        later page is served from it as long as the pool is still stable up to the page
+        end; otherwise the full paging pool is fetched once, continuing the keyword side
+        after the known candidates.
+        
+        Args:
+            pool: Paging pool (see paging_pool)
+            query: Search query text
+            end: End of the requested page in the ranking
+            fusion: Fusion strategy
+            keyword_weight: Normalized keyword weight
+            semantic_weight: Normalized semantic weight
+            deadline: Deadline of the retrieval stage (default: no budget)
+            filters: Normalized field filters
+            ann: ANN parameters of the semantic side (default: the searcher's)
+            
+        Returns:
+            The given pool if it covers the page, otherwise a new, widened pool
+        """
+        if pool["candidates"] is None or end <= pool["covered"] or pool["pool_size"] >= pool["full_pool"]:
+            return pool
+        keyword_results, semantic_results = pool["candidates"]["keyword"], pool["candidates"]["semantic"]
+        if end <= pool["pool_size"]:
+            ranked = [(entry["id"], entry) for entry in pool["ranking"]]
+            assessment = assess_stability(ranked, len(keyword_results), len(semantic_results), pool["pool_size"],
+                                          end, keyword_weight, semantic_weight)
+            if assessment["stable"]:
+                return dict(pool, covered=end)
+        
+        query_vector = {"embedding": pool["query_embedding"]} if pool.get("query_embedding") else None
+        keyword_results, more_semantic, degraded_reason = self.expand_candidates(
+            query, pool["full_pool"], keyword_results, deadline, filters, ann, SOLR_RANKING_FIELDS, query_vector)
+        if degraded_reason is not None and pool["degraded_reason"] is None:
+            # Reason: fusing full keyword candidates with no semantic side would reorder the pages served so far
+            logger.warning(f"Widened candidate pool degraded ({degraded_reason}) - keeping the initial pool")
+            return dict(pool, full_pool=pool["pool_size"])
+        logger.info(f"Widened the candidate pool of query '{query}' from {pool['pool_size']} to "
+                    f"{pool['full_pool']} per side for a page ending at {end}")
+        ranked = fuse(fusion, keyword_results, more_semantic, keyword_weight, semantic_weight)
+        return dict(self.paging_pool(ranked, keyword_results, more_semantic, pool["full_pool"], pool["full_pool"],
+                                     end, degraded_reason), fingerprint=pool.get("fingerprint"))
+    
+    @staticmethod
+    def cursor_fingerprint(query: str, filters: Optional[Dict[str, List[str]]], ann: AnnParams,
+                           keyword_weight: float, semantic_weight: float, fusion: str) -> tuple:
+        """Return everything a cached ranking depends on, to match cursors against requests.
+        
+        Args:
+            query: Search query text
+            filters: Normalized filters or None
+            ann: ANN parameters of the Qdrant search
+            keyword_weight: Normalized keyword weight
+            semantic_weight: Normalized semantic weight
+            fusion: Fusion strategy
+            
+        Returns:
+            Hashable tuple that differs whenever the ranking could differ
+        """
+        return (normalize_query(query), filter_key(filters), ann, round(keyword_weight, 4),
+                round(semantic_weight, 4), fusion)
+    
+    @staticmethod
+    def _envelope(response: Dict, degraded_reason: Optional[str]) -> Dict:
+        """Add the degraded flag (and its reason) to a search response."""
+        response["degraded"] = degraded_reason is not None
+        if degraded_reason is not None:
+            response["degraded_reason"] = degraded_reason
+        return response
+    
+    def hydrate_page(self, page: List[Dict], query: str, mode: str = "full",
+                     known_documents: Optional[Dict[str, Dict]] = None,
+                     timeout: float = SOLR_TIMEOUT_SECONDS) -> List[Dict]:
+        """Load the documents of a ranking page from Solr and merge their scores.
+        
+        Args:
+            page: Ranking entries (document ID plus score information) in page order
+            query: User query (used for snippet highlighting)
+            mode: "full" or "snippets"
+            known_documents: Documents loaded earlier, keyed by ID; missing ones are added
+            timeout: Timeout of the Solr request in seconds
+            
+        Returns:
+            Documents of the page in ranking order (documents missing in Solr are skipped)
+        """
+        known_documents = known_documents if known_documents is not None else {}
+        missing_ids = [entry["id"] for entry in page if entry["id"] not in known_documents]
+        if missing_ids:
+            if mode == "snippets":
+                known_documents.update(self.get_solr_snippets_by_ids(missing_ids, query, timeout=timeout))
             else:
-                logger.warning(f"Document {doc_id} not found in Solr but was in search results")
+                known_documents.update(self.get_solr_documents_by_ids(missing_ids, timeout=timeout))
+        
+        docs = []
+        for entry in page:
+            if entry["id"] not in known_documents:
+                logger.warning(f"Document {entry['id']} not found in Solr but was in search results")
+                continue
+            docs.append(self.merge_scores(dict(known_documents[entry["id"]]), entry))
+        return docs
+    
+    def search_stream(self, query: str, limit: int = DEFAULT_LIMIT,
+                      weights: Optional[Tuple[float, float]] = None, fusion: Optional[str] = None,
+                      candidate_pool: Optional[int] = None, mode: str = "full",
+                      budget: Optional[float] = None,
+                      filters: Optional[Dict[str, Union[str, List[str]]]] = None,
+                      ann: Optional[AnnParams] = None) -> Iterator[Dict]:
+        """Progressive hybrid search: keyword results first, the fused ranking later.
+        
+        Yields a "keyword" event as soon as Solr has answered, ranked by keyword score
+        alone, and a "final" event with the fused ranking once the semantic results
+        have arrived. Queries without semantic search and citation queries only yield the
+        "final" event. The final event carries a cursor for further pages via search().
+        Like search(), the stream starts with an adaptive pool sized for the first page.
+        
+        Args:
+            query: Search query text
+            limit: Page size
+            weights: Per-request (keyword_weight, semantic_weight), defaults to the searcher's weights
+            fusion: Fusion strategy (sigmoid, rrf, minmax), defaults to HYBRID_FUSION
+            candidate_pool: Candidates fetched per side, defaults to the strategy's pool size
+            mode: "full" for full documents, "snippets" for metadata plus highlighted snippets
+            budget: Latency budget in seconds, defaults to SEARCH_BUDGET_SECONDS
+            filters: Field -> value or list of values (see search_filters.FILTER_FIELDS)
+            ann: ANN parameters of the Qdrant search (see ann_params), defaults to the searcher's
+            
+        Yields:
+            Event dicts with event ("keyword" or "final"), numFound, start and docs; the
+            final event also carries cursor and the degraded flag
+            
+        Raises:
+            ValueError: If the fusion strategy, the result mode or a filter field is unknown
+        """
+        if mode not in RESULT_MODES:
+            raise ValueError(f"Unknown result mode '{mode}', expected one of {', '.join(RESULT_MODES)}")
         
-        # Sort by combined score
-        final_results.sort(key=lambda x: x["combined_score"], reverse=True)
+        start_time = time.time()
+        deadline = Deadline(budget or SEARCH_BUDGET_SECONDS)
+        retrieval_deadline = deadline.child(RETRIEVAL_BUDGET_SHARE)
+        keyword_weight, semantic_weight, fusion, pool_size = self.resolve_search_options(
+            limit, weights, fusion, candidate_pool)
+        pool_size = max(pool_size, PAGE_POOL_SIZE)
+        adaptive = self.adaptive_pool and candidate_pool is None
+        initial_pool = initial_pool_size(limit, pool_size, fusion) if adaptive else pool_size
+        filters = normalize_filters(filters)
+        ann = ann or self.ann
+        fingerprint = self.cursor_fingerprint(query, filters, ann, keyword_weight, semantic_weight, fusion)
         
-        # Limit results
-        final_results = final_results[:limit]
+        citation_ranking = self.citation_ranking(query) if filters is None else None
+        if citation_ranking is not None:
+            cursor = secrets.token_urlsafe(16)
+            self.cursor_cache.put(cursor, {"fingerprint": fingerprint, "ranking": citation_ranking,
+                                           "candidates": None, "degraded_reason": None})
+            docs = self.hydrate_page(citation_ranking[:limit], query, mode, timeout=deadline.timeout(
+                cap=SOLR_TIMEOUT_SECONDS, minimum=HYDRATION_MIN_TIMEOUT))
+            yield self._envelope({"event": "final", "numFound": len(citation_ranking), "start": 0,
+                                  "cursor": cursor, "docs": docs}, None)
+            return
         
-        search_type = "keyword-only" if not use_semantic else "hybrid"
-        logger.info(f"{search_type.title()} search returned {len(final_results)} results "
-                   f"(from {len(solr_results)} keyword and {len(semantic_results)} semantic) "
-                   f"in {time.time() - start_time:.2f} seconds")
+        query_vector: Dict = {}
+        semantic_future = self.submit_semantic_search(query, initial_pool, retrieval_deadline, filters, ann,
+                                                      SOLR_RANKING_FIELDS, query_vector)
+        solr_results = self.solr_search(query, limit=initial_pool, fields=SOLR_RANKING_FIELDS,
+                                        timeout=retrieval_deadline.timeout(cap=SOLR_TIMEOUT_SECONDS),
+                                        filters=filters)
         
-        return final_results
+        # Documents hydrated for the keyword event are reused for the final event
+        known_documents: Dict[str, Dict] = {}
+        if semantic_future is not None:
+            keyword_ranking = [dict(score_info, id=doc_id)
+                               for doc_id, score_info in fuse(fusion, solr_results, [], 1.0, 0.0)]
+            docs = self.hydrate_page(keyword_ranking[:limit], query, mode, known_documents,
+                                     timeout=deadline.timeout(cap=SOLR_TIMEOUT_SECONDS, minimum=HYDRATION_MIN_TIMEOUT))
+            logger.info(f"Streamed {len(docs)} keyword results after {time.time() - start_time:.2f} seconds")
+            yield {"event": "keyword", "numFound": len(keyword_ranking), "start": 0, "docs": docs}
+        
+        semantic_results, degraded_reason = self.collect_semantic_results(semantic_future, retrieval_deadline)
+        solr_results, semantic_results, ranked, pool_info = self.settle_pool(
+            query, limit, initial_pool, pool_size, fusion, keyword_weight, semantic_weight, solr_results,
+            semantic_results, degraded_reason, retrieval_deadline, filters, ann, SOLR_RANKING_FIELDS, query_vector)
+        pool = self.paging_pool(ranked, solr_results, semantic_results, pool_info["final"], pool_size, limit,
+                                degraded_reason, query_vector.get("embedding"))
+        ranking = pool["ranking"]
+        cursor = secrets.token_urlsafe(16)
+        self.cursor_cache.put(cursor, dict(pool, fingerprint=fingerprint))
+        
+        docs = self.hydrate_page(ranking[:limit], query, mode, known_documents,
+                                 timeout=deadline.timeout(cap=SOLR_TIMEOUT_SECONDS, minimum=HYDRATION_MIN_TIMEOUT))
+        logger.info(f"Streamed {len(docs)} fused results after {time.time() - start_time:.2f} seconds")
+        yield self._envelope({"event": "final", "numFound": len(ranking), "start": 0, "cursor": cursor,
+                              "docs": docs}, degraded_reason)
+
+
+def run_queries_file(searcher: HybridSearcher, queries_file: str, output_file: Optional[str], limit: int,
+                     batch_size: int = DEFAULT_QUERY_BATCH, fusion: Optional[str] = None,
+                     candidate_pool: Optional[int] = None,
+                     filters: Optional[Dict[str, List[str]]] = None) -> int:
+    """Search all queries of a file in batches and write one JSON line per query.
+    
+    Every output line is the input entry (with any extra fields such as "id") plus
+    a "results" list. Entries with a "limit" field get that many results; each batch
+    makes one combined_search_many call per distinct limit.
+    
+    Args:
+        searcher: Hybrid searcher
+        queries_file: Query file, one query per line or JSONL with a "query" field
+        output_file: JSONL output file, or None for stdout
+        limit: Maximum number of results of queries without their own "limit"
+        batch_size: Queries per batch
+        fusion: Fusion strategy
+        candidate_pool: Candidates fetched per side
+        filters: Field filters applied to every query
+        
+    Returns:
+        Number of queries processed
+        
+    Raises:
+        ValueError: If an entry has an invalid "limit"
+    """
+    start_time = time.time()
+    entries = load_queries(queries_file)
+    limits = [query_limit(entry, limit) for entry in entries]
+    output = open(output_file, "w", encoding="utf-8") if output_file else sys.stdout
+    try:
+        for offset in range(0, len(entries), batch_size):
+            batch = entries[offset:offset + batch_size]
+            # Reason: combined_search_many takes one limit, so queries are grouped by theirs
+            positions_by_limit: Dict[int, List[int]] = {}
+            for position, entry_limit in enumerate(limits[offset:offset + batch_size]):
+                positions_by_limit.setdefault(entry_limit, []).append(position)
+            batch_results: List[List[Dict]] = [[] for _ in batch]
+            for entry_limit, positions in positions_by_limit.items():
+                group_results = searcher.combined_search_many([batch[position]["query"] for position in positions],
+                                                              entry_limit, fusion=fusion,
+                                                              candidate_pool=candidate_pool, filters=filters)
+                for position, results in zip(positions, group_results):
+                    batch_results[position] = results
+            for entry, results in zip(batch, batch_results):
+                output.write(json.dumps(dict(entry, results=results), ensure_ascii=False) + "\n")
+            output.flush()
+    finally:
+        if output_file:
+            output.close()
+    
+    elapsed = time.time() - start_time
+    logger.info(f"Processed {len(entries)} queries in {elapsed:.1f} seconds "
+                f"({len(entries) / elapsed if elapsed else 0:.1f} queries/s)")
+    return len(entries)
 
 
 def main():
@@ -479,8 +1995,8 @@ def main():
     parser.add_argument(
         "--query",
         type=str,
-        required=True,
-        help="Search query text"
+        default=None,
+        help="Search query text (required unless --serve or --queries-file is used)"
     )
     parser.add_argument(
         "--limit",
@@ -495,6 +2011,18 @@ def main():
         help=f"Relative weights for keyword vs semantic search as comma-separated values "
              f"(default: {DEFAULT_WEIGHTS[0]},{DEFAULT_WEIGHTS[1]})"
     )
+    parser.add_argument(
+        "--fusion",
+        choices=FUSION_STRATEGIES,
+        default=None,
+        help=f"Fusion strategy for keyword and semantic results (default: HYBRID_FUSION env or {DEFAULT_FUSION})"
+    )
+    parser.add_argument(
+        "--candidate-pool",
+        type=int,
+        default=None,
+        help="Candidates fetched per side before fusion (default: depends on the fusion strategy)"
+    )
     parser.add_argument(
         "--docker",
         action="store_true",
@@ -510,7 +2038,7 @@ def main():
         "--ollama",
         type=str,
         default=None,
-        help="Ollama endpoint URL (default: from env or localhost)"
+        help="Ollama endpoint URL, or a comma-separated list of URLs (default: from env or localhost)"
     )
     parser.add_argument(
         "--solr",
@@ -518,27 +2046,147 @@ def main():
         default=None,
         help="Solr endpoint URL (default: from env or localhost)"
     )
+    parser.add_argument(
+        "--projection-file",
+        type=str,
+        default=None,
+        help="Projection file (.npz) for collections with reduced vectors (default: VECTOR_PROJECTION_FILE env)"
+    )
+    parser.add_argument(
+        "--embedding-cache-db",
+        type=str,
+        default=None,
+        help="SQLite file for query embeddings shared by several workers (default: EMBEDDING_CACHE_DB env)"
+    )
+    parser.add_argument(
+        "--vector-backend",
+        choices=VECTOR_BACKENDS,
+        default=None,
+        help="Vector search in Qdrant or in the Solr vector field of the documents core "
+             "(default: HYBRID_VECTOR_BACKEND env or qdrant)"
+    )
+    parser.add_argument(
+        "--citation-index",
+        type=str,
+        default=None,
+        help="Citation index for direct lookups of citation queries (default: CITATION_INDEX_FILE env "
+             "or citation_index.json next to this script)"
+    )
+    parser.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="Restrict the search to a field value, e.g. jurabk=BGB (repeatable; values of one field are OR-ed)"
+    )
+    parser.add_argument(
+        "--ann-preset",
+        choices=list(ANN_PRESETS),
+        default=None,
+        help=f"Query-time ANN accuracy preset (default: HYBRID_ANN_PRESET env or {DEFAULT_ANN_PRESET})"
+    )
+    parser.add_argument(
+        "--hnsw-ef",
+        type=int,
+        default=None,
+        help="HNSW candidate list size of the Qdrant search (overrides the preset)"
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Exact (brute-force) Qdrant search instead of the HNSW index"
+    )
+    parser.add_argument(
+        "--oversampling",
+        type=float,
+        default=None,
+        help="Quantized candidates fetched per result before rescoring (overrides the preset)"
+    )
+    parser.add_argument(
+        "--no-rescore",
+        action="store_true",
+        help="Do not rescore quantized candidates with the original vectors"
+    )
+    parser.add_argument(
+        "--score-threshold",
+        type=float,
+        default=None,
+        help="Minimum cosine similarity of semantic candidates (overrides the preset)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print keyword results first and the fused ranking later, one JSON event per line"
+    )
+    parser.add_argument(
+        "--queries-file",
+        type=str,
+        default=None,
+        help="Run all queries of a file (one per line, or JSONL with a \"query\" field) and write JSONL results"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Output file for --queries-file (default: stdout)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_QUERY_BATCH,
+        help=f"Queries per batch for --queries-file (default: {DEFAULT_QUERY_BATCH})"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a long-running HTTP JSON service instead of a single search"
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default=DEFAULT_SERVICE_HOST,
+        help=f"Interface for --serve to bind to (default: {DEFAULT_SERVICE_HOST})"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_SERVICE_PORT,
+        help=f"Port for --serve (default: HYBRID_SEARCH_PORT env or {DEFAULT_SERVICE_PORT})"
+    )
     
     args = parser.parse_args()
     
+    if not args.serve and not args.query and not args.queries_file:
+        parser.error("--query is required unless --serve or --queries-file is used")
+    
     # Set endpoints based on arguments
-    global QDRANT_ENDPOINT, OLLAMA_ENDPOINT, SOLR_ENDPOINT
+    global QDRANT_ENDPOINT, OLLAMA_ENDPOINT, OLLAMA_ENDPOINTS, SOLR_ENDPOINT, VECTOR_PROJECTION_FILE, EMBEDDING_CACHE_DB
+    global CITATION_INDEX_FILE
     
     if args.docker:
         logger.info("Using Docker network endpoints")
         QDRANT_ENDPOINT = DOCKER_QDRANT_ENDPOINT
         OLLAMA_ENDPOINT = DOCKER_OLLAMA_ENDPOINT
+        OLLAMA_ENDPOINTS = DOCKER_OLLAMA_ENDPOINT
         SOLR_ENDPOINT = DOCKER_SOLR_ENDPOINT
     else:
         if args.qdrant:
             QDRANT_ENDPOINT = args.qdrant
         if args.ollama:
             OLLAMA_ENDPOINT = args.ollama
+            OLLAMA_ENDPOINTS = args.ollama
         if args.solr:
             SOLR_ENDPOINT = args.solr
     
+    if args.projection_file:
+        VECTOR_PROJECTION_FILE = args.projection_file
+    if args.embedding_cache_db:
+        EMBEDDING_CACHE_DB = args.embedding_cache_db
+    if args.citation_index:
+        CITATION_INDEX_FILE = args.citation_index
+    
     logger.info(f"Using Qdrant endpoint: {QDRANT_ENDPOINT}")
-    logger.info(f"Using Ollama endpoint: {OLLAMA_ENDPOINT}")
+    logger.info(f"Using Ollama endpoint(s): {OLLAMA_ENDPOINTS}")
     logger.info(f"Using Solr endpoint: {SOLR_ENDPOINT}")
     
     # Parse weights
@@ -549,11 +2197,46 @@ def main():
         logger.warning(f"Invalid weights format: {args.weights}. Using default: {DEFAULT_WEIGHTS}")
         weights = DEFAULT_WEIGHTS
     
+    filters: Dict[str, List[str]] = {}
+    for entry in args.filter:
+        field, separator, value = entry.partition("=")
+        if not separator:
+            parser.error(f"--filter expects FIELD=VALUE, got '{entry}'")
+        filters.setdefault(field.strip(), []).append(value)
+    
+    try:
+        ann = resolve_ann_params(args.ann_preset or HYBRID_ANN_PRESET, hnsw_ef=args.hnsw_ef,
+                                 exact=args.exact or None, oversampling=args.oversampling,
+                                 rescore=False if args.no_rescore else None, score_threshold=args.score_threshold)
+    except ValueError as e:
+        parser.error(str(e))
+    
     # Initialize hybrid searcher
-    hybrid_searcher = HybridSearcher(weights=weights)
+    hybrid_searcher = HybridSearcher(weights=weights, ann=ann, vector_backend=args.vector_backend)
+
+    if args.serve:
+        # Imported lazily so single searches do not pay for the HTTP server module
+        from hybrid_server import serve
+        # Reason: the first queries would otherwise pay for loading the embedding model
+        hybrid_searcher.residency.warmup()
+        hybrid_searcher.residency.start()
+        serve(hybrid_searcher, args.host, args.port, default_limit=args.limit)
+        return
+    
+    if args.queries_file:
+        run_queries_file(hybrid_searcher, args.queries_file, args.output, args.limit, args.batch_size,
+                         fusion=args.fusion, candidate_pool=args.candidate_pool, filters=filters)
+        return
+    
+    if args.stream:
+        for event in hybrid_searcher.search_stream(args.query, args.limit, fusion=args.fusion,
+                                                   candidate_pool=args.candidate_pool, filters=filters):
+            print(json.dumps(event, ensure_ascii=False), flush=True)
+        return
     
     # Perform search
-    results = hybrid_searcher.combined_search(args.query, args.limit)
+    results = hybrid_searcher.combined_search(args.query, args.limit, fusion=args.fusion,
+                                              candidate_pool=args.candidate_pool, filters=filters)
     
     # Print results
     if results:
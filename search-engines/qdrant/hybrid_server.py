@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Hybrid Search Service
+
+Long-running HTTP JSON API around a warm HybridSearcher. The searcher, its Qdrant
+client and its pooled Solr/Ollama connections are created once, so each query only
+pays for the actual search instead of interpreter startup, imports and new
+connections. Started through `hybrid_search.py --serve`.
+
+With `mode=snippets` search hits carry metadata plus highlighted snippets instead of
+the full text. Search responses carry an opaque `cursor`. Passing it back with a new `start` pages
+through the cached fused pool without repeating the search.
+
+Endpoints:
+    GET  /health                      Service status
+    GET  /search/stream?q=...         NDJSON: keyword results first, then the fused ranking
+    POST /search/stream  {...}        Same parameters as /search (without start/cursor)
+    GET  /stats                       Cache hit rates and Ollama pool statistics
+    GET  /documents/<id>              Full document (text loaded on demand after a snippets search)
+    GET  /search?q=...&rows=10&start=0&cursor=...&keyword_weight=0.5&semantic_weight=0.5&fusion=rrf&budget_ms=2000
+    POST /search  {"query": "...", "rows": 10, "keyword_weight": 0.5, "semantic_weight": 0.5, "fusion": "rrf"}
+
+Filters restrict both engines to field values: `filter_jurabk=BGB&filter_norm_type=article`
+(GET, repeatable) or `"filters": {"jurabk": ["BGB"], "norm_type": "article"}` (POST).
+
+ANN accuracy is chosen per request with `ann_preset=fast|default|exact`; `hnsw_ef`,
+`exact`, `oversampling`, `rescore` and `score_threshold` override single values.
+
+With `timings=true` the search response (for /search/stream the final event) carries a
+`timings` block with the spans of the search. Set HYBRID_TRACE_FILE to append every
+search as an OTLP JSON line to that file.
+"""
+
+import json
+import logging
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, unquote, urlparse
+
+from ann_params import resolve_ann_params
+from fusion import FUSION_STRATEGIES
+from search_filters import FILTER_FIELDS, normalize_filters
+from tracing import ensure_trace, export_otel_json
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1024 * 1024  # Upper bound for JSON request bodies
+RESULT_MODES = ("full", "snippets")  # Same as hybrid_search.RESULT_MODES
+TRACE_FILE = os.environ.get("HYBRID_TRACE_FILE") or None  # OTLP JSON lines file for all searches
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+class BadRequestError(ValueError):
+    """Raised for invalid search parameters (answered with HTTP 400)."""
+
+
+def _first(params: Dict, *names: str, default=None):
+    """Return the first parameter present under any of the given names."""
+    for name in names:
+        value = params.get(name)
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if value is not None and value != "":
+            return value
+    return default
+
+
+def parse_search_params(params: Dict, default_limit: int) -> Dict:
+    """Extract the search arguments from GET parameters or a JSON body.
+
+    Args:
+        params: Parsed query string (values are lists) or JSON body
+        default_limit: Limit used when the request does not specify one
+
+    Returns:
+        Keyword arguments for HybridSearcher.search (query, limit, start, cursor, mode,
+        weights, fusion, candidate_pool, budget, timings, filters, ann); weights is None if the request
+        does not set any, ann is None if the request does not set an ANN parameter
+
+    Raises:
+        BadRequestError: If the query is missing or a parameter is invalid
+    """
+    query = _first(params, "query", "q")
+    if not query or not str(query).strip():
+        raise BadRequestError("Query parameter is required")
+
+    try:
+        limit = int(_first(params, "limit", "rows", default=default_limit))
+        start = int(_first(params, "start", default=0))
+        keyword_weight = _first(params, "keyword_weight")
+        semantic_weight = _first(params, "semantic_weight")
+        weights = None
+        if keyword_weight is not None or semantic_weight is not None:
+            weights = (float(keyword_weight if keyword_weight is not None else 0.5),
+                       float(semantic_weight if semantic_weight is not None else 0.5))
+        candidate_pool = _first(params, "candidate_pool")
+        candidate_pool = int(candidate_pool) if candidate_pool is not None else None
+        budget_ms = _first(params, "budget_ms")
+        budget = float(budget_ms) / 1000 if budget_ms is not None else None
+    except (TypeError, ValueError) as e:
+        raise BadRequestError(f"Invalid search parameter: {e}")
+
+    if limit <= 0:
+        raise BadRequestError("limit must be positive")
+    if start < 0:
+        raise BadRequestError("start must not be negative")
+    if candidate_pool is not None and candidate_pool <= 0:
+        raise BadRequestError("candidate_pool must be positive")
+    if budget is not None and budget <= 0:
+        raise BadRequestError("budget_ms must be positive")
+
+    fusion = _first(params, "fusion")
+    if fusion is not None and fusion not in FUSION_STRATEGIES:
+        raise BadRequestError(f"Unknown fusion strategy '{fusion}', expected one of {', '.join(FUSION_STRATEGIES)}")
+
+    mode = _first(params, "mode", default="full")
+    if mode not in RESULT_MODES:
+        raise BadRequestError(f"Unknown result mode '{mode}', expected one of {', '.join(RESULT_MODES)}")
+
+    filters = params.get("filters") or {}
+    if not isinstance(filters, dict):
+        raise BadRequestError("filters must be an object mapping fields to values")
+    filters = dict(filters)
+    for field in FILTER_FIELDS:
+        # Reason: GET requests carry filters as repeated filter_<field> parameters, like /api/search
+        if f"filter_{field}" in params:
+            filters[field] = params[f"filter_{field}"]
+    try:
+        filters = normalize_filters(filters)
+    except ValueError as e:
+        raise BadRequestError(str(e))
+
+    ann = None
+    ann_options = {name: _first(params, name) for name in ("hnsw_ef", "exact", "oversampling", "rescore",
+                                                           "score_threshold")}
+    ann_preset = _first(params, "ann_preset")
+    if ann_preset is not None or any(value is not None for value in ann_options.values()):
+        try:
+            for name, convert in (("hnsw_ef", int), ("oversampling", float), ("score_threshold", float)):
+                if ann_options[name] is not None:
+                    ann_options[name] = convert(ann_options[name])
+            for name in ("exact", "rescore"):
+                if ann_options[name] is not None:
+                    ann_options[name] = str(ann_options[name]).lower() in TRUE_VALUES
+            ann = resolve_ann_params(ann_preset, **ann_options)
+        except (TypeError, ValueError) as e:
+            raise BadRequestError(f"Invalid ANN parameter: {e}")
+    
+    return {
+        "query": str(query),
+        "limit": limit,
+        "start": start,
+        "cursor": _first(params, "cursor"),
+        "mode": mode,
+        "weights": weights,
+        "fusion": fusion,
+        "candidate_pool": candidate_pool,
+        "budget": budget,
+        "timings": str(_first(params, "timings", default=False)).lower() in TRUE_VALUES,
+        "filters": filters,
+        "ann": ann,
+    }
+
+
+class HybridSearchRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler answering search requests with the server's shared HybridSearcher."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive for the Node API proxy
+
+    def log_message(self, format: str, *args) -> None:
+        """Route the default access log through the module logger."""
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        """Serialize and send a JSON response."""
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        """Read the raw request body announced by Content-Length."""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise BadRequestError("Invalid Content-Length header")
+        if length < 0 or length > MAX_BODY_SIZE:
+            raise BadRequestError("Request body too large" if length > 0 else "Invalid Content-Length header")
+        return self.rfile.read(length) if length else b""
+
+    @staticmethod
+    def _parse_json_body(raw: bytes) -> Dict:
+        """Parse a JSON request body."""
+        if not raw:
+            return {}
+        try:
+            body = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise BadRequestError(f"Invalid JSON body: {e}")
+        if not isinstance(body, dict):
+            raise BadRequestError("JSON body must be an object")
+        return body
+
+    def _handle_search(self, params: Dict) -> None:
+        """Run a search and send the result envelope (numFound, start, cursor, docs)."""
+        search_args = parse_search_params(params, self.server.default_limit)
+
+        start_time = time.time()
+        with ensure_trace(TRACE_FILE is not None) as trace:
+            result = self.server.searcher.search(**search_args)
+        if trace is not None:
+            export_otel_json(trace, TRACE_FILE)
+        logger.info(f"Served search '{search_args['query']}' ({len(result['docs'])} results) "
+                    f"in {time.time() - start_time:.2f} seconds")
+
+        self._send_json(200, result)
+
+    def _handle_search_stream(self, params: Dict) -> None:
+        """Stream search events as NDJSON using chunked transfer encoding."""
+        search_args = parse_search_params(params, self.server.default_limit)
+        search_args.pop("start")
+        search_args.pop("cursor")
+        timings = search_args.pop("timings")
+        events = self.server.searcher.search_stream(**search_args)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        # Reason: the generator runs in this thread, so its spans land in the handler's trace
+        with ensure_trace(timings or TRACE_FILE is not None) as trace:
+            try:
+                for event in events:
+                    if timings and event.get("event") == "final":
+                        event["timings"] = trace.timings()
+                    self._write_chunk(event)
+            except Exception as e:
+                # Reason: the status line is already sent, so errors travel as a last event
+                logger.exception(f"Error while streaming search '{search_args['query']}': {e}")
+                self._write_chunk({"event": "error", "error": True, "message": str(e)})
+        if trace is not None and TRACE_FILE is not None:
+            export_otel_json(trace, TRACE_FILE)
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_chunk(self, event: Dict) -> None:
+        """Write one event as an NDJSON line in its own HTTP chunk."""
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def _handle_document(self, doc_id: str) -> None:
+        """Send one full document."""
+        document = self.server.searcher.get_document(doc_id)
+        if document is None:
+            self._send_json(404, {"error": True, "message": f"Document not found: {doc_id}"})
+        else:
+            self._send_json(200, document)
+
+    def _dispatch(self, params_loader) -> None:
+        """Route a request and translate errors into JSON responses."""
+        path = urlparse(self.path).path.rstrip("/")
+        try:
+            if path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif path == "/stats":
+                self._send_json(200, self.server.searcher.stats())
+            elif path == "/search":
+                self._handle_search(params_loader())
+            elif path == "/search/stream":
+                self._handle_search_stream(params_loader())
+            elif path.startswith("/documents/") and self.command == "GET":
+                self._handle_document(unquote(path[len("/documents/"):]))
+            else:
+                self._send_json(404, {"error": True, "message": f"Unknown endpoint: {path}"})
+        except BadRequestError as e:
+            self._send_json(400, {"error": True, "message": str(e), "numFound": 0, "docs": []})
+        except Exception as e:
+            logger.exception(f"Error handling {self.command} {path}: {e}")
+            self._send_json(500, {"error": True, "message": str(e), "numFound": 0, "docs": []})
+
+    def do_GET(self) -> None:
+        self._dispatch(lambda: parse_qs(urlparse(self.path).query))
+
+    def do_POST(self) -> None:
+        # Reason: read the body before routing, so that no error response leaves it in the
+        # keep-alive stream where it would be parsed as the next request
+        try:
+            raw = self._read_body()
+        except BadRequestError as e:
+            self.close_connection = True  # The unread body cannot be skipped reliably
+            self._send_json(400, {"error": True, "message": str(e), "numFound": 0, "docs": []})
+            return
+        self._dispatch(lambda: self._parse_json_body(raw))
+
+
+def serve(searcher, host: str, port: int, default_limit: int = 10) -> None:
+    """Serve hybrid search over HTTP until interrupted.
+
+    Args:
+        searcher: Warm HybridSearcher shared by all request threads
+        host: Interface to bind to
+        port: Port to listen on
+        default_limit: Result limit for requests that do not specify one
+    """
+    server = ThreadingHTTPServer((host, port), HybridSearchRequestHandler)
+    server.daemon_threads = True
+    server.searcher = searcher
+    server.default_limit = default_limit
+
+    logger.info(f"Hybrid search service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Hybrid search service stopped")
+    finally:
+        server.server_close()
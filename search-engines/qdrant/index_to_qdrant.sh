@@ -12,7 +12,8 @@ if [[ "$1" == "--help" || "$1" == "-h" ]]; then
   echo "  --limit N            Maximum number of documents to process"
   echo "  --docker             Use Docker network endpoints (ollama, qdrant, solr)"
   echo "  --qdrant URL         Qdrant endpoint URL (default: http://localhost:6333)"
-  echo "  --ollama URL         Ollama endpoint URL (default: http://localhost:11434)"
+  echo "  --ollama-hosts URLS  Comma-separated Ollama endpoints (default: http://localhost:11434)"
+  echo "  --concurrency-per-host N  Concurrent embedding requests per Ollama host (default: 1)"
   echo "  --solr URL           Solr endpoint URL (default: http://localhost:8983/solr/documents)"
   echo "  --recreate           Recreate the collection if it exists"
   exit 0
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Latency Budgets
+
+Per-request deadlines and a circuit breaker for the hybrid search. A `Deadline` is
+created per search and split into stage budgets; every outgoing call derives its
+timeout from it. The `CircuitBreaker` tracks a dependency (Ollama) and short-circuits
+calls while it keeps failing or answering too slowly.
+
+Usage:
+    deadline = Deadline(2.0)
+    retrieval = deadline.child(0.7)           # 70 % of the budget for retrieval
+    requests.get(url, timeout=retrieval.timeout(cap=5))
+
+    breaker = CircuitBreaker("ollama", failure_threshold=5, reset_seconds=30, slow_call_seconds=2)
+    if breaker.allow():
+        ...
+        breaker.record_success(duration)      # or breaker.record_failure()
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MIN_TIMEOUT = 0.05  # Smallest timeout handed to a call, even when the budget is spent
+
+
+class Deadline:
+    """Point in time by which a request (or one of its stages) must be answered."""
+
+    def __init__(self, budget_seconds: float, parent: Optional["Deadline"] = None):
+        """Start a deadline.
+
+        Args:
+            budget_seconds: Time budget from now
+            parent: Enclosing deadline; this deadline never ends after it
+        """
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+        if parent is not None:
+            self.expires_at = min(self.expires_at, parent.expires_at)
+
+    def child(self, share: float) -> "Deadline":
+        """Create a stage deadline covering a share of this deadline's total budget.
+
+        Args:
+            share: Fraction of the total budget (0-1)
+
+        Returns:
+            Deadline that ends after share * budget or with this deadline, whichever is first
+        """
+        return Deadline(self.budget_seconds * share, parent=self)
+
+    def remaining(self) -> float:
+        """Seconds left until the deadline (0 if it has passed)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """True if the deadline has passed."""
+        return self.remaining() <= 0
+
+    def timeout(self, cap: Optional[float] = None, minimum: float = MIN_TIMEOUT) -> float:
+        """Timeout for the next call: the remaining time, bounded by cap and minimum.
+
+        Args:
+            cap: Upper bound, e.g. the usual timeout of the call
+            minimum: Lower bound, so calls that must happen still get a chance
+
+        Returns:
+            Timeout in seconds
+        """
+        timeout = self.remaining()
+        if cap is not None:
+            timeout = min(timeout, cap)
+        return max(timeout, minimum)
+
+
+class CircuitBreaker:
+    """Circuit breaker with closed, open and half-open states.
+
+    The breaker opens after failure_threshold consecutive failures (calls slower than
+    slow_call_seconds count as failures). While open, allow() returns False. After
+    reset_seconds a single trial call is let through; its outcome closes the breaker
+    again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30,
+                 slow_call_seconds: Optional[float] = None):
+        """Initialize the breaker.
+
+        Args:
+            name: Name of the protected dependency (for logs and stats)
+            failure_threshold: Consecutive failures that open the breaker
+            reset_seconds: Time the breaker stays open before a trial call
+            slow_call_seconds: Calls slower than this count as failures (None: disabled)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.rejected_calls = 0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            self.rejected_calls += 1
+            return False
+
+    def record_success(self, duration: Optional[float] = None) -> None:
+        """Record a finished call; slow calls count as failures.
+
+        Args:
+            duration: Duration of the call in seconds
+        """
+        if self.slow_call_seconds is not None and duration is not None and duration > self.slow_call_seconds:
+            logger.warning(f"{self.name} call took {duration:.2f}s (slow threshold {self.slow_call_seconds:.2f}s)")
+            self.record_failure()
+            return
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit breaker for {self.name} closed")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed (or too slow) call."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit breaker for {self.name} opened after "
+                                   f"{self.consecutive_failures} failures")
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+
+    def stats(self) -> Dict:
+        """Return state and counters."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "rejected_calls": self.rejected_calls,
+                "times_opened": self.times_opened,
+            }
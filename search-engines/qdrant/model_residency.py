@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Model Residency
+
+Keeps the E5 embedding model loaded in Ollama. Ollama unloads a model once its
+`keep_alive` expires (5 minutes after the last request by default). The next query then
+waits seconds for the reload, which shows up as cold-start spikes in the p99.
+
+The `ModelResidencyManager`
+- warms the model on every Ollama host at startup (`warmup()`),
+- provides the `keep_alive` value of the workload, which every embedding request sends
+  (`KEEP_ALIVE_PROFILES`: long for the search service, short for the indexer, so a
+  finished reindex frees the memory soon),
+- checks `/api/ps` periodically in a background thread (`start()`), reloads the model
+  if it was unloaded, and refreshes keep_alive before it runs out,
+- records load-time events: warmups, detected unloads, reloads, and cold starts seen in
+  the `load_duration` of regular /api/embed responses (`observe()`).
+
+Usage:
+    residency = ModelResidencyManager(["http://localhost:11434"], EMBEDDING_MODEL, KEEP_ALIVE_PROFILES["search"])
+    residency.warmup()
+    residency.start()
+    requests.post(f"{endpoint}/api/embed", json={"model": ..., "input": [...], "keep_alive": residency.keep_alive})
+    residency.stats()
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Union
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# keep_alive per workload: a duration ("30m"), seconds, or -1 to keep the model loaded indefinitely
+KEEP_ALIVE_PROFILES: Dict[str, str] = {
+    "search": os.environ.get("OLLAMA_KEEP_ALIVE_SEARCH", "30m"),  # Renewed by the residency check
+    "index": os.environ.get("OLLAMA_KEEP_ALIVE_INDEX", "2m"),  # Frees the model soon after a reindex
+}
+RESIDENCY_CHECK_SECONDS = int(os.environ.get("OLLAMA_RESIDENCY_CHECK_SECONDS", "60"))  # Interval of /api/ps checks
+WARMUP_TIMEOUT_SECONDS = 120  # Loading the model from disk can take long on CPU hosts
+PS_TIMEOUT_SECONDS = 5  # Timeout of /api/ps requests
+COLD_START_MS = 100  # load_duration above this counts as a cold start
+MAX_EVENTS = 100  # Load-time events kept for stats()
+WARMUP_INPUT = "Warmup"  # Text embedded to load the model
+_FRACTION = re.compile(r"(\.\d{6})\d+")  # Ollama reports nanoseconds; datetime takes microseconds
+
+
+def keep_alive_value(value: str) -> Union[str, int]:
+    """Convert a keep_alive setting for the Ollama API.
+
+    Ollama reads numbers as seconds and strings as Go durations, so plain numbers
+    ("-1", "3600") are sent as integers.
+
+    Args:
+        value: Setting such as "30m", "3600" or "-1"
+
+    Returns:
+        Value for the keep_alive field of a request
+    """
+    value = str(value).strip()
+    return int(value) if re.fullmatch(r"-?\d+", value) else value
+
+
+def parse_expires_at(value: Optional[str]) -> Optional[float]:
+    """Parse the expires_at timestamp of /api/ps into epoch seconds (None if missing or invalid)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(_FRACTION.sub(r"\1", value.replace("Z", "+00:00"))).timestamp()
+    except ValueError:
+        return None
+
+
+class ModelResidencyManager:
+    """Warms the embedding model, keeps it resident and reports load-time events."""
+
+    def __init__(self, endpoints: List[str], model: str, keep_alive: str = KEEP_ALIVE_PROFILES["search"],
+                 check_interval: float = RESIDENCY_CHECK_SECONDS, headers: Optional[Dict[str, str]] = None):
+        """Initialize the manager.
+
+        Args:
+            endpoints: Ollama endpoint URLs
+            model: Name of the embedding model
+            keep_alive: keep_alive setting of the workload (see KEEP_ALIVE_PROFILES)
+            check_interval: Seconds between two residency checks of the background thread
+            headers: Extra headers of warmup requests (e.g. the embedding gateway priority)
+        """
+        self.endpoints = list(endpoints)
+        self.model = model
+        self.keep_alive = keep_alive_value(keep_alive)
+        self.check_interval = check_interval
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.events: Deque[Dict] = deque(maxlen=MAX_EVENTS)
+        self.state: Dict[str, Dict] = {url: {"resident": None, "expires_at": None, "size_vram": None,
+                                             "checked_at": None, "last_load_ms": None} for url in self.endpoints}
+        self.loads = 0
+        self.unloads_detected = 0
+        self.cold_starts = 0
+
+    def _record(self, endpoint: str, event: str, load_ms: Optional[float] = None, **details) -> None:
+        """Store a load-time event and log it."""
+        entry = {"time": datetime.now(timezone.utc).isoformat(timespec="seconds"), "endpoint": endpoint,
+                 "event": event, "load_ms": round(load_ms, 1) if load_ms is not None else None}
+        entry.update(details)
+        with self._lock:
+            self.events.append(entry)
+            if load_ms is not None and endpoint in self.state:
+                self.state[endpoint]["last_load_ms"] = entry["load_ms"]
+        message = f"Model {self.model} at {endpoint}: {event}" + (f" ({load_ms:.0f} ms load)" if load_ms else "")
+        if event in ("unloaded", "cold_start"):
+            logger.warning(message)
+        else:
+            logger.info(message)
+
+    def warm(self, endpoint: str, event: str = "warmup") -> Optional[float]:
+        """Load the model on one host (no-op for Ollama if it is resident) and set keep_alive.
+
+        Args:
+            endpoint: Ollama endpoint URL
+            event: Event name recorded for the warmup
+
+        Returns:
+            Load time of the model in milliseconds (0 if it was resident), or None on failure
+        """
+        start_time = time.time()
+        try:
+            response = self.session.post(
+                f"{endpoint}/api/embed",
+                json={"model": self.model, "input": WARMUP_INPUT, "keep_alive": self.keep_alive},
+                timeout=WARMUP_TIMEOUT_SECONDS
+            )
+            response.raise_for_status()
+            load_ms = response.json().get("load_duration", 0) / 1e6
+        except (requests.exceptions.RequestException, ValueError, AttributeError, TypeError) as e:
+            # Reason: a proxy answering 200 with HTML must not abort --serve startup
+            logger.error(f"Could not warm model {self.model} at {endpoint}: {e}")
+            self._record(endpoint, "warmup_failed", error=str(e))
+            return None
+        with self._lock:
+            if load_ms >= COLD_START_MS:
+                self.loads += 1
+            if endpoint in self.state:
+                self.state[endpoint]["resident"] = True
+        self._record(endpoint, event, load_ms, total_ms=round((time.time() - start_time) * 1000, 1))
+        return load_ms
+
+    def warmup(self) -> int:
+        """Warm the model on all hosts.
+
+        Returns:
+            Number of hosts where the model is loaded
+        """
+        return sum(1 for endpoint in self.endpoints if self.warm(endpoint) is not None)
+
+    def resident_model(self, endpoint: str) -> Optional[Dict]:
+        """Return the /api/ps entry of the model on a host, or None if it is not loaded.
+
+        Raises:
+            requests.exceptions.RequestException: If /api/ps cannot be read
+            ValueError: If /api/ps does not answer with JSON
+        """
+        response = self.session.get(f"{endpoint}/api/ps", timeout=PS_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        for entry in response.json().get("models", []):
+            if self.model in (entry.get("name"), entry.get("model")):
+                return entry
+        return None
+
+    def check(self) -> None:
+        """Verify residency on all hosts; reload unloaded models and refresh expiring keep_alive."""
+        for endpoint in self.endpoints:
+            try:
+                entry = self.resident_model(endpoint)
+            except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+                logger.warning(f"Could not read loaded models from {endpoint}: {e}")
+                continue
+
+            now = time.time()
+            expires_at = parse_expires_at(entry.get("expires_at")) if entry else None
+            with self._lock:
+                was_resident = self.state[endpoint]["resident"]
+                self.state[endpoint].update(resident=entry is not None, checked_at=now,
+                                            expires_at=entry.get("expires_at") if entry else None,
+                                            size_vram=entry.get("size_vram") if entry else None)
+            if entry is None:
+                if was_resident:
+                    with self._lock:
+                        self.unloads_detected += 1
+                    self._record(endpoint, "unloaded")
+                self.warm(endpoint, event="reload" if was_resident else "warmup")
+            elif expires_at is not None and expires_at - now < 2 * self.check_interval:
+                # Reason: the next check could come too late, so an idle service renews keep_alive now
+                self.warm(endpoint, event="keep_alive_refresh")
+
+    def observe(self, endpoint: str, payload: Dict) -> None:
+        """Record a cold start seen in the load_duration of a regular /api/embed response.
+
+        Args:
+            endpoint: Ollama endpoint URL that answered
+            payload: Parsed JSON response
+        """
+        load_ms = payload.get("load_duration", 0) / 1e6
+        with self._lock:
+            if endpoint in self.state:
+                self.state[endpoint]["resident"] = True  # A served request means the model is loaded now
+            if load_ms < COLD_START_MS:
+                return
+            self.cold_starts += 1
+            self.loads += 1
+        self._record(endpoint, "cold_start", load_ms)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Model residency check failed: {e}")
+
+    def start(self) -> None:
+        """Start the periodic residency check in a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-residency", daemon=True)
+        self._thread.start()
+        logger.info(f"Checking residency of {self.model} every {self.check_interval} seconds "
+                    f"(keep_alive {self.keep_alive})")
+
+    def stop(self) -> None:
+        """Stop the background check."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict:
+        """Return residency state and recent load-time events.
+
+        Returns:
+            Dict with keep_alive, per-host state, counters and the last 20 events
+        """
+        with self._lock:
+            return {
+                "model": self.model,
+                "keep_alive": self.keep_alive,
+                "check_interval": self.check_interval,
+                "endpoints": {url: dict(state) for url, state in self.state.items()},
+                "loads": self.loads,
+                "unloads_detected": self.unloads_detected,
+                "cold_starts": self.cold_starts,
+                "events": list(self.events)[-20:],
+            }
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Ollama Endpoint Pool
+
+Distributes embedding requests across several Ollama hosts. Each request is routed
+to the healthy host with the fewest in-flight requests. Hosts that fail with
+consecutive connection errors are ejected for a cool-down period and health-checked
+again in a background thread before they receive new traffic, so acquiring a host
+never waits on a health check. Read timeouts do not eject a host: a slow
+long-text embedding or generate call says nothing about the host being down. The
+last host in rotation is never ejected, so a single-host setup keeps trying it.
+
+Usage:
+    pool = OllamaEndpointPool(["http://ollama-1:11434", "http://ollama-2:11434"], EMBEDDING_MODEL)
+    pool.check_health()
+    with pool.lease() as endpoint:
+        requests.post(f"{endpoint}/api/embeddings", json={...})
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Pool defaults
+DEFAULT_EJECT_SECONDS = 30  # Cool-down before an ejected host is health-checked again
+DEFAULT_EJECT_AFTER_FAILURES = 2  # Consecutive connection errors before a host is ejected
+HEALTH_CHECK_TIMEOUT = 5  # Timeout for the /api/tags health check in seconds
+
+
+def parse_endpoints(value: Optional[str]) -> List[str]:
+    """Parse a comma-separated list of Ollama endpoint URLs.
+
+    Args:
+        value: Comma-separated endpoint URLs (e.g. "http://a:11434,http://b:11434")
+
+    Returns:
+        List of endpoint URLs without trailing slashes, duplicates removed
+    """
+    endpoints = []
+    for part in (value or "").split(","):
+        url = part.strip().rstrip("/")
+        if url and url not in endpoints:
+            endpoints.append(url)
+    return endpoints
+
+
+def check_ollama_health(endpoint: str, model: str) -> bool:
+    """Check if an Ollama host is healthy and the model is available.
+
+    Args:
+        endpoint: Ollama endpoint URL
+        model: Name of the embedding model that must be available
+
+    Returns:
+        bool: True if Ollama is healthy, False otherwise
+    """
+    try:
+        logger.info(f"Checking Ollama health at {endpoint}...")
+
+        # Check if Ollama is running
+        response = requests.get(f"{endpoint}/api/tags", timeout=HEALTH_CHECK_TIMEOUT)
+        response.raise_for_status()
+
+        # Check if the model is available
+        tags = response.json().get("models", [])
+        available_models = [tag.get("name", "") for tag in tags]
+
+        if model not in available_models:
+            logger.warning(f"Model {model} not found in Ollama at {endpoint}. "
+                           f"Available models: {', '.join(available_models)}")
+            return False
+
+        logger.info(f"Ollama at {endpoint} is healthy and model {model} is available.")
+        return True
+
+    except requests.exceptions.ConnectionError:
+        logger.error(f"Could not connect to Ollama at {endpoint}. "
+                     f"Make sure Ollama is running and accessible.")
+        return False
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error checking Ollama health at {endpoint}: {e}")
+        return False
+
+
+def fetch_model_digest(endpoint: str, model: str) -> Optional[str]:
+    """Return the digest of a model as reported by /api/tags.
+
+    The digest changes whenever the model is re-pulled or replaced, so it identifies
+    the model version that produced an embedding.
+
+    Args:
+        endpoint: Ollama endpoint URL
+        model: Name of the model
+
+    Returns:
+        Model digest, or None if the host is unreachable or the model is missing
+    """
+    try:
+        response = requests.get(f"{endpoint}/api/tags", timeout=HEALTH_CHECK_TIMEOUT)
+        response.raise_for_status()
+        for tag in response.json().get("models", []):
+            if tag.get("name") == model:
+                return tag.get("digest")
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Could not read model digest from {endpoint}: {e}")
+    return None
+
+
+class OllamaEndpoint:
+    """Routing state of a single Ollama host."""
+
+    def __init__(self, url: str):
+        """Initialize the endpoint state.
+
+        Args:
+            url: Ollama endpoint URL
+        """
+        self.url = url
+        self.in_flight = 0
+        self.total_requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0  # 0 means the host is in rotation
+        self.last_request_time = 0.0
+
+
+class OllamaEndpointPool:
+    """Least-loaded routing of Ollama requests over a set of hosts."""
+
+    def __init__(self, endpoints: List[str], model: str,
+                 max_in_flight_per_endpoint: Optional[int] = None,
+                 throttle_delay: float = 0.0,
+                 eject_seconds: float = DEFAULT_EJECT_SECONDS,
+                 eject_after_failures: int = DEFAULT_EJECT_AFTER_FAILURES):
+        """Initialize the endpoint pool.
+
+        Hosts start out in rotation; call check_health() to verify them up front.
+
+        Args:
+            endpoints: List of Ollama endpoint URLs
+            model: Embedding model that must be available on each host
+            max_in_flight_per_endpoint: Maximum concurrent requests per host (None for unlimited)
+            throttle_delay: Minimum delay in seconds between two requests to the same host
+            eject_seconds: Cool-down in seconds before an ejected host is checked again
+            eject_after_failures: Consecutive connection errors that eject a host
+        """
+        if not endpoints:
+            raise ValueError("At least one Ollama endpoint is required")
+
+        self.model = model
+        self.max_in_flight_per_endpoint = max_in_flight_per_endpoint
+        self.throttle_delay = throttle_delay
+        self.eject_seconds = eject_seconds
+        self.eject_after_failures = eject_after_failures
+        self.endpoints = [OllamaEndpoint(url) for url in endpoints]
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    @property
+    def urls(self) -> List[str]:
+        """URLs of all hosts in the pool."""
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def check_health(self) -> int:
+        """Health-check all hosts and eject the unhealthy ones.
+
+        Returns:
+            int: Number of healthy hosts
+        """
+        healthy = 0
+        for endpoint in self.endpoints:
+            if check_ollama_health(endpoint.url, self.model):
+                self._readmit(endpoint)
+                healthy += 1
+            else:
+                self._eject(endpoint)
+
+        logger.info(f"Ollama endpoint pool: {healthy}/{len(self.endpoints)} hosts healthy")
+        return healthy
+
+    def _eject(self, endpoint: OllamaEndpoint) -> None:
+        """Take a host out of rotation for the cool-down period, unless it is the last one in rotation."""
+        with self._condition:
+            if not any(e.ejected_until == 0 for e in self.endpoints if e is not endpoint):
+                last_host = True
+            else:
+                last_host = False
+                endpoint.ejected_until = time.time() + self.eject_seconds
+        if last_host:
+            # Reason: ejecting the last host would fail every request instantly; trying it may still succeed
+            logger.warning(f"Ollama host {endpoint.url} is failing, but it is the last host in rotation")
+            return
+        logger.warning(f"Ejected Ollama host {endpoint.url} for {self.eject_seconds:.0f}s")
+
+    def _readmit(self, endpoint: OllamaEndpoint) -> None:
+        """Put a host back into rotation."""
+        with self._condition:
+            was_ejected = endpoint.ejected_until > 0
+            endpoint.ejected_until = 0.0
+            self._condition.notify_all()
+        if was_ejected:
+            logger.info(f"Ollama host {endpoint.url} is back in rotation")
+
+    def _retry_ejected(self) -> None:
+        """Start background health checks of ejected hosts whose cool-down has expired."""
+        now = time.time()
+        with self._condition:
+            due = [e for e in self.endpoints if 0 < e.ejected_until <= now]
+            # Reason: push the deadline forward so concurrent callers do not re-check the same host
+            for endpoint in due:
+                endpoint.ejected_until = now + self.eject_seconds
+        if due:
+            # Reason: a check can take HEALTH_CHECK_TIMEOUT; acquire() runs on the query path
+            # (and on the event loop of the async searcher), so it must not wait for it
+            threading.Thread(target=self._check_ejected, args=(due,), name="ollama-readmit", daemon=True).start()
+
+    def _check_ejected(self, due: List[OllamaEndpoint]) -> None:
+        """Health-check ejected hosts and put the healthy ones back into rotation."""
+        for endpoint in due:
+            if check_ollama_health(endpoint.url, self.model):
+                self._readmit(endpoint)
+
+    def _pick(self) -> Optional[OllamaEndpoint]:
+        """Select the healthy host with the fewest in-flight requests (caller holds the lock).
+
+        If no host is in rotation (all failed their health checks), every host is a candidate.
+        """
+        in_rotation = any(e.ejected_until == 0 for e in self.endpoints)
+        candidates = [
+            e for e in self.endpoints
+            if (e.ejected_until == 0 or not in_rotation) and (self.max_in_flight_per_endpoint is None
+                                                             or e.in_flight < self.max_in_flight_per_endpoint)
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda e: (e.in_flight, e.total_requests))
+
+    def acquire(self, timeout: Optional[float] = None) -> OllamaEndpoint:
+        """Reserve the least-loaded healthy host.
+
+        Blocks while all healthy hosts are at their concurrency limit. If no host is
+        healthy, the least-loaded host is tried anyway. Ejected hosts are health-checked
+        in the background; this request does not wait for the result.
+
+        Args:
+            timeout: Maximum time in seconds to wait for a free host (None waits indefinitely)
+
+        Returns:
+            The reserved endpoint; it must be returned with release()
+
+        Raises:
+            requests.exceptions.ConnectionError: If no host became free within the timeout
+        """
+        self._retry_ejected()
+        deadline = None if timeout is None else time.time() + timeout
+
+        with self._condition:
+            while True:
+                endpoint = self._pick()
+                if endpoint is not None:
+                    endpoint.in_flight += 1
+                    endpoint.total_requests += 1
+                    break
+
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise requests.exceptions.ConnectionError(
+                        "Timed out waiting for a free Ollama endpoint")
+                # Wake up periodically so ejected hosts can be re-admitted
+                self._condition.wait(min(remaining or self.eject_seconds, self.eject_seconds))
+
+            wait = endpoint.last_request_time + self.throttle_delay - time.time()
+            endpoint.last_request_time = max(time.time(), endpoint.last_request_time + self.throttle_delay)
+
+        if wait > 0:
+            logger.debug(f"Rate limiting applied for {endpoint.url}: waiting {wait:.2f} seconds")
+            time.sleep(wait)
+        return endpoint
+
+    def release(self, endpoint: OllamaEndpoint, failed: bool = False) -> None:
+        """Return a host reserved with acquire().
+
+        Args:
+            endpoint: The endpoint returned by acquire()
+            failed: True if the request failed with a connection error (not a read timeout)
+        """
+        with self._condition:
+            endpoint.in_flight -= 1
+            if failed:
+                endpoint.failures += 1
+                endpoint.consecutive_failures += 1
+            else:
+                endpoint.consecutive_failures = 0
+            eject = failed and endpoint.consecutive_failures >= self.eject_after_failures
+            self._condition.notify_all()
+        if eject:
+            self._eject(endpoint)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[str]:
+        """Context manager yielding the URL of the least-loaded healthy host.
+
+        Connection errors raised inside the block count towards ejecting the host; read
+        timeouts and other errors do not.
+
+        Args:
+            timeout: Maximum time in seconds to wait for a free host
+
+        Yields:
+            Endpoint URL to send the request to
+        """
+        endpoint = self.acquire(timeout=timeout)
+        failed = False
+        try:
+            yield endpoint.url
+        except requests.exceptions.ConnectionError:
+            # Reason: ConnectTimeout is a ConnectionError, ReadTimeout is not; a slow answer is no dead host
+            failed = True
+            raise
+        finally:
+            self.release(endpoint, failed=failed)
+
+    def stats(self) -> List[Dict]:
+        """Per-host routing statistics.
+
+        Returns:
+            List of dicts with url, in_flight, total_requests, failures and healthy flag
+        """
+        with self._condition:
+            return [
+                {
+                    "url": e.url,
+                    "in_flight": e.in_flight,
+                    "total_requests": e.total_requests,
+                    "failures": e.failures,
+                    "healthy": e.ejected_until == 0,
+                }
+                for e in self.endpoints
+            ]
@@ -14,8 +14,11 @@ Usage:
 Options:
     --source    Data source: 'solr' fetches from Solr index, 'xml' from source XML files (default: 'solr')
     --limit     Maximum number of documents to process (default: all)
-    --recreate  Recreate the Qdrant collection if it exists
+    --recreate  Rebuild into a new versioned collection and switch the alias after validation
     --docker    Use Docker network endpoints instead of localhost
+    --ollama-hosts  Comma-separated list of Ollama endpoints to spread embedding requests over
+    --vector-mode   Store 'full' embeddings, a 'reduced' vector instead, or 'both' (default: 'full')
+    --target    Write embeddings to 'qdrant', to the Solr vector field ('solr') or to 'both' (default: 'qdrant')
 """
 
 import argparse
@@ -34,6 +37,24 @@ from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
+from collection_aliases import (
+    garbage_collect_versions,
+    point_alias_to,
+    resolve_alias,
+    versioned_collection_name,
+)
+from embedding_gateway import PRIORITY_HEADER
+from model_residency import KEEP_ALIVE_PROFILES, ModelResidencyManager
+from ollama_pool import OllamaEndpointPool, parse_endpoints
+from search_filters import CASE_INSENSITIVE_FIELDS, PAYLOAD_INDEX_FIELDS, filter_payload, payload_field
+from solr_vectors import SolrVectorWriter
+from vector_reduction import (
+    FULL_VECTOR_NAME,
+    REDUCED_VECTOR_NAME,
+    REDUCTION_METHODS,
+    VectorProjection,
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -57,8 +78,12 @@ DOCKER_SOLR_ENDPOINT = "http://solr:8983/solr/documents"
 OLLAMA_ENDPOINT = os.environ.get("OLLAMA_ENDPOINT", DEFAULT_OLLAMA_ENDPOINT)
 QDRANT_ENDPOINT = os.environ.get("QDRANT_ENDPOINT", DEFAULT_QDRANT_ENDPOINT) 
 SOLR_ENDPOINT = os.environ.get("SOLR_ENDPOINT", DEFAULT_SOLR_ENDPOINT)
+# Comma-separated list of Ollama hosts; embedding requests are spread over all of them
+OLLAMA_ENDPOINTS = os.environ.get("OLLAMA_ENDPOINTS", OLLAMA_ENDPOINT)
 XML_DIR = "../solr/demodata"
-COLLECTION_NAME = "deutsche_gesetze"
+COLLECTION_NAME = "deutsche_gesetze"  # Alias used by all searchers (blue/green reindexing)
+KEEP_COLLECTION_VERSIONS = 2  # Live version plus one rollback candidate
+MIN_POINT_RATIO = 0.9  # A rebuild must contain at least 90% of the live collection's points
 EMBEDDING_MODEL = "qllama/multilingual-e5-large-instruct:latest"  # Updated to match exact model name with tag
 # Vector dimension for E5 model (needs to be determined by testing)
 VECTOR_SIZE = 1024  # This is an estimate, we'll verify after the first embedding
@@ -66,9 +91,11 @@ BATCH_SIZE = 5  # Reduzierte Batchgröße für stabilere Verarbeitung
 MAX_TEXT_LENGTH = 1950  # Optimiert basierend auf Textlängen-Analyse: erfasst 95% der Dokumente vollständig
 MAX_RETRIES = 3  # Anzahl von Wiederholungsversuchen
 RETRY_DELAY = 2  # Wartezeit zwischen Wiederholungsversuchen
-MAX_CONCURRENT_REQUESTS = 1  # Anzahl gleichzeitiger Anfragen an Ollama API
-REQUEST_THROTTLE_DELAY = 1  # Verzögerung zwischen aufeinanderfolgenden Anfragen in Sekunden
+MAX_CONCURRENT_REQUESTS = 1  # Anzahl gleichzeitiger Anfragen pro Ollama-Host
+REQUEST_THROTTLE_DELAY = 1  # Verzögerung zwischen aufeinanderfolgenden Anfragen an denselben Host in Sekunden
 CHUNK_SIZE = 1800  # Optimiert: weniger unnötiges Chunking, näher an MAX_TEXT_LENGTH
+OLLAMA_HEADERS = {PRIORITY_HEADER: "batch"}  # Indexierung weicht hinter einem Embedding-Gateway der Suche
+INDEX_TARGETS = ("qdrant", "solr", "both")  # Where embeddings are written; 'solr' for deployments without Qdrant
 
 
 def generate_consistent_numeric_id(id_string: str) -> int:
@@ -90,96 +117,237 @@ def generate_consistent_numeric_id(id_string: str) -> int:
 class QdrantIndexer:
     """Class to handle the indexing of documents into Qdrant."""
     
-    def __init__(self, recreate: bool = False):
+    def __init__(self, recreate: bool = False, projection: Optional[VectorProjection] = None,
+                 vector_mode: str = "full", target: str = "qdrant"):
         """Initialize the Qdrant indexer.
         
         Args:
-            recreate: Whether to recreate the collection if it exists
+            recreate: Whether to rebuild into a new versioned collection
+            projection: Dimensionality reduction applied for the 'reduced' and 'both' vector modes
+            vector_mode: 'full' embeddings only, 'reduced' vectors instead, or 'both' as named vectors
+            target: 'qdrant', 'solr' (full embeddings into the Solr vector field) or 'both'
         """
+        if vector_mode != "full" and projection is None:
+            raise ValueError(f"Vector mode '{vector_mode}' requires a projection")
+        if target not in INDEX_TARGETS:
+            raise ValueError(f"Unknown index target '{target}', expected one of {', '.join(INDEX_TARGETS)}")
+        self.write_qdrant = target in ("qdrant", "both")
+        # Solr bekommt immer die vollen Embeddings, die Projektion gilt nur für Qdrant
+        self.solr_writer = SolrVectorWriter(SOLR_ENDPOINT) if target in ("solr", "both") else None
+        self.projection = projection
+        self.vector_mode = vector_mode
         self.qdrant_client = QdrantClient(url=QDRANT_ENDPOINT)
+        # Collection that receives the points; a new version when rebuilding
+        self.collection_name = COLLECTION_NAME
         self.actual_vector_size = None  # Will be set after the first embedding
         self.recreate = recreate
-        self.last_request_time = 0  # Zeitstempel der letzten Anfrage für Rate Limiting
-        self.request_executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS)
+        # Embedding-Anfragen werden auf alle konfigurierten Ollama-Hosts verteilt
+        self.endpoint_pool = OllamaEndpointPool(
+            parse_endpoints(OLLAMA_ENDPOINTS),
+            EMBEDDING_MODEL,
+            max_in_flight_per_endpoint=MAX_CONCURRENT_REQUESTS,
+            throttle_delay=REQUEST_THROTTLE_DELAY
+        )
+        self.request_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_REQUESTS * len(self.endpoint_pool)
+        )
+        # Kurzes keep_alive: das Modell bleibt während der Indexierung geladen und wird danach bald freigegeben
+        self.residency = ModelResidencyManager(self.endpoint_pool.urls, EMBEDDING_MODEL, KEEP_ALIVE_PROFILES["index"],
+                                               headers=OLLAMA_HEADERS)
         
         # Check Ollama API health
-        self.check_ollama_health()
+        if self.check_ollama_health():
+            # Modell vorab laden, damit die ersten Dokumente nicht in den Timeout laufen
+            self.residency.warmup()
     
     def check_ollama_health(self) -> bool:
-        """Check if Ollama API is healthy and the model is available.
+        """Check if the Ollama hosts are healthy and the model is available.
+        
+        Unhealthy hosts are ejected from the endpoint pool and retried later.
         
         Returns:
-            bool: True if Ollama is healthy, False otherwise
+            bool: True if at least one Ollama host is healthy, False otherwise
         """
-        try:
-            logger.info(f"Checking Ollama health at {OLLAMA_ENDPOINT}...")
-            
-            # Check if Ollama is running
-            response = requests.get(f"{OLLAMA_ENDPOINT}/api/tags", timeout=5)
-            response.raise_for_status()
-            
-            # Check if the model is available
-            tags = response.json().get("models", [])
-            model_available = False
-            available_models = []
-            
-            for tag in tags:
-                model_name = tag.get("name", "")
-                available_models.append(model_name)
-                if model_name == EMBEDDING_MODEL:
-                    model_available = True
-                    break
-            
-            if not model_available:
-                logger.warning(f"Model {EMBEDDING_MODEL} not found in Ollama. "
-                              f"Available models: {', '.join(available_models)}")
-                logger.warning("Indexing may fail if the model is not available.")
-                return False
-                
-            logger.info(f"Ollama is healthy and model {EMBEDDING_MODEL} is available.")
-            return True
-            
-        except requests.exceptions.ConnectionError:
-            logger.error(f"Could not connect to Ollama at {OLLAMA_ENDPOINT}. "
-                        f"Make sure Ollama is running and accessible.")
-            return False
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error checking Ollama health: {e}")
+        healthy = self.endpoint_pool.check_health()
+        if healthy == 0:
+            logger.warning("Indexing may fail if the model is not available.")
             return False
+        return True
     
     def create_collection_if_not_exists(self) -> None:
-        """Check if the collection exists, if not create it."""
+        """Check if the collection exists, if not create it.
+        
+        With recreate, a new versioned collection is created next to the live one.
+        The alias keeps serving the old version until publish_collection() is called.
+        """
         try:
-            # Check if collection already exists
-            collections = self.qdrant_client.get_collections()
-            if COLLECTION_NAME in [c.name for c in collections.collections]:
-                if self.recreate:
-                    logger.info(f"Recreating collection '{COLLECTION_NAME}'...")
-                    self.qdrant_client.delete_collection(COLLECTION_NAME)
-                else:
-                    logger.info(f"Collection '{COLLECTION_NAME}' already exists.")
-                    # Get actual vector size from existing collection
-                    collection_info = self.qdrant_client.get_collection(COLLECTION_NAME)
-                    self.actual_vector_size = collection_info.config.params.vectors.size
-                    logger.info(f"Vector size in existing collection: {self.actual_vector_size}")
-                    return
+            collection_names = [c.name for c in self.qdrant_client.get_collections().collections]
+            
+            if self.recreate:
+                self.collection_name = versioned_collection_name(COLLECTION_NAME, collection_names)
+                logger.info(f"Building new collection version '{self.collection_name}' "
+                            f"(alias '{COLLECTION_NAME}' stays on the current version)")
+            elif COLLECTION_NAME in collection_names or resolve_alias(self.qdrant_client, COLLECTION_NAME):
+                logger.info(f"Collection '{COLLECTION_NAME}' already exists.")
+                # Get actual vector size from existing collection
+                collection_info = self.qdrant_client.get_collection(COLLECTION_NAME)
+                vectors_config = collection_info.config.params.vectors
+                if isinstance(vectors_config, dict):
+                    vectors_config = vectors_config.get(FULL_VECTOR_NAME, vectors_config.get(REDUCED_VECTOR_NAME))
+                self.actual_vector_size = vectors_config.size
+                logger.info(f"Vector size in existing collection: {self.actual_vector_size}")
+                self.create_payload_indexes(resolve_alias(self.qdrant_client, COLLECTION_NAME) or COLLECTION_NAME)
+                return
             
             # If we don't know the vector size yet, use the estimate
             vector_size = self.actual_vector_size or VECTOR_SIZE
             
             # Create a new collection
             self.qdrant_client.create_collection(
-                collection_name=COLLECTION_NAME,
-                vectors_config=qdrant_models.VectorParams(
-                    size=vector_size,
-                    distance=qdrant_models.Distance.COSINE
-                )
+                collection_name=self.collection_name,
+                vectors_config=self._vectors_config(vector_size)
             )
-            logger.info(f"Created collection '{COLLECTION_NAME}' with vector size {vector_size}")
+            logger.info(f"Created collection '{self.collection_name}' with vector size {vector_size} "
+                        f"(vector mode: {self.vector_mode})")
+            self.create_payload_indexes(self.collection_name)
         except Exception as e:
             logger.error(f"Error creating collection: {e}")
             raise
     
+    def create_payload_indexes(self, collection_name: str) -> None:
+        """Create keyword payload indexes on the fields the hybrid search filters on.
+        
+        Without an index Qdrant has to check the payload of every HNSW candidate;
+        with it, filtered searches plan over the matching points only. Existing
+        indexes are left as they are. Points indexed before the lowercased filter
+        copies existed get them before their index is created.
+        
+        Args:
+            collection_name: Collection to index
+        """
+        existing = self.qdrant_client.get_collection(collection_name).payload_schema or {}
+        missing_folded = [field for field in CASE_INSENSITIVE_FIELDS if payload_field(field) not in existing]
+        if missing_folded:
+            self.backfill_folded_payload(collection_name, missing_folded)
+        for field in PAYLOAD_INDEX_FIELDS:
+            if field in existing:
+                continue
+            self.qdrant_client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
+                wait=True
+            )
+            logger.info(f"Created payload index on '{field}' in '{collection_name}'")
+    
+    def backfill_folded_payload(self, collection_name: str, fields: List[str]) -> None:
+        """Add the lowercased filter copies of some fields to the existing points.
+        
+        Points are grouped by value, so there is one set_payload call per distinct
+        value (one per law for jurabk) instead of one per point.
+        
+        Args:
+            collection_name: Collection to update
+            fields: Case-insensitive filter fields whose copies are missing
+        """
+        points_by_value: Dict[Tuple[str, str], List[int]] = {}
+        offset = None
+        while True:
+            records, offset = self.qdrant_client.scroll(collection_name=collection_name, limit=1000,
+                                                        offset=offset, with_payload=fields, with_vectors=False)
+            for record in records:
+                payload = filter_payload({field: (record.payload or {}).get(field) for field in fields})
+                for field in fields:
+                    if payload_field(field) in payload:
+                        value = json.dumps(payload[payload_field(field)], ensure_ascii=False)
+                        points_by_value.setdefault((field, value), []).append(record.id)
+            if offset is None:
+                break
+        if not points_by_value:
+            return
+        
+        for (field, value), point_ids in points_by_value.items():
+            self.qdrant_client.set_payload(collection_name=collection_name,
+                                           payload={payload_field(field): json.loads(value)},
+                                           points=point_ids, wait=True)
+        logger.info(f"Added lowercased filter fields {', '.join(fields)} to the points of '{collection_name}' "
+                    f"({len(points_by_value)} distinct values)")
+    
+    def _vectors_config(self, vector_size: int) -> Union[qdrant_models.VectorParams, Dict]:
+        """Build the vectors config for the configured vector mode.
+        
+        Args:
+            vector_size: Dimension of the full embeddings
+            
+        Returns:
+            Unnamed vector params, or named vector params when storing both variants
+        """
+        full_params = qdrant_models.VectorParams(size=vector_size, distance=qdrant_models.Distance.COSINE)
+        if self.vector_mode == "full":
+            return full_params
+        
+        reduced_params = qdrant_models.VectorParams(size=self.projection.dim, distance=qdrant_models.Distance.COSINE)
+        if self.vector_mode == "reduced":
+            return reduced_params
+        return {FULL_VECTOR_NAME: full_params, REDUCED_VECTOR_NAME: reduced_params}
+    
+    def _point_vector(self, embedding: List[float]) -> Union[List[float], Dict[str, List[float]]]:
+        """Convert a full embedding into the vector(s) stored for a point.
+        
+        Args:
+            embedding: Full embedding from Ollama
+            
+        Returns:
+            Full embedding, reduced vector, or a dict of named vectors
+        """
+        if self.vector_mode == "full":
+            return embedding
+        
+        reduced = self.projection.transform(embedding)
+        if self.vector_mode == "reduced":
+            return reduced
+        return {FULL_VECTOR_NAME: embedding, REDUCED_VECTOR_NAME: reduced}
+    
+    def publish_collection(self, expected_points: int, keep_versions: int = KEEP_COLLECTION_VERSIONS,
+                           min_point_ratio: float = MIN_POINT_RATIO) -> bool:
+        """Validate a rebuilt collection and atomically switch the alias to it.
+        
+        Args:
+            expected_points: Number of documents that were indexed successfully
+            keep_versions: Number of collection versions to keep after switching
+            min_point_ratio: Minimum size of the rebuild relative to the live collection
+            
+        Returns:
+            bool: True if the alias was switched, False if validation failed
+        """
+        if self.collection_name == COLLECTION_NAME:
+            return False
+        
+        new_count = self.qdrant_client.count(self.collection_name, exact=True).count
+        if new_count == 0 or new_count < expected_points:
+            logger.error(f"Validation failed: '{self.collection_name}' contains {new_count} points, "
+                         f"expected {expected_points}. Alias '{COLLECTION_NAME}' was not switched.")
+            return False
+        
+        live_collection = resolve_alias(self.qdrant_client, COLLECTION_NAME)
+        if live_collection is None and COLLECTION_NAME in [c.name for c in self.qdrant_client.get_collections().collections]:
+            live_collection = COLLECTION_NAME  # Legacy layout without alias
+        
+        if live_collection is not None:
+            live_count = self.qdrant_client.count(live_collection, exact=True).count
+            if new_count < live_count * min_point_ratio:
+                logger.error(f"Validation failed: '{self.collection_name}' has {new_count} points, "
+                             f"live collection '{live_collection}' has {live_count} "
+                             f"(minimum ratio {min_point_ratio:.0%}). Alias '{COLLECTION_NAME}' was not switched.")
+                return False
+        
+        point_alias_to(self.qdrant_client, COLLECTION_NAME, self.collection_name)
+        
+        deleted = garbage_collect_versions(self.qdrant_client, COLLECTION_NAME, keep=keep_versions)
+        if deleted:
+            logger.info(f"Garbage-collected {len(deleted)} old collection versions: {', '.join(deleted)}")
+        return True
+    
     def _text_to_chunks(self, text: str, chunk_size: int = CHUNK_SIZE) -> List[str]:
         """Split text into chunks of approximately equal size.
         
@@ -307,19 +475,21 @@ Text:
 Zusammenfassung:"""
 
         try:
-            response = requests.post(
-                f"{OLLAMA_ENDPOINT}/api/generate",
-                json={
-                    "model": "llama3.2:3b",  # Kleineres Modell für Summarization
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,  # Konservativ für rechtliche Texte
-                        "top_p": 0.9
-                    }
-                },
-                timeout=60
-            )
+            with self.endpoint_pool.lease() as endpoint:
+                response = requests.post(
+                    f"{endpoint}/api/generate",
+                    json={
+                        "model": "llama3.2:3b",  # Kleineres Modell für Summarization
+                        "prompt": prompt,
+                        "stream": False,
+                        "options": {
+                            "temperature": 0.1,  # Konservativ für rechtliche Texte
+                            "top_p": 0.9
+                        }
+                    },
+                    headers=OLLAMA_HEADERS,
+                    timeout=60
+                )
             
             if response.status_code == 200:
                 summary = response.json().get("response", "").strip()
@@ -336,18 +506,6 @@ Zusammenfassung:"""
         
         return None
     
-    def _apply_rate_limit(self):
-        """Apply rate limiting to avoid overloading the Ollama API."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < REQUEST_THROTTLE_DELAY:
-            sleep_time = REQUEST_THROTTLE_DELAY - time_since_last_request
-            logger.debug(f"Rate limiting applied: waiting {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
-    
     def _single_embedding_request(self, text: str, timeout: int = 60) -> Optional[List[float]]:
         """Make a single request to the Ollama API for embedding generation.
         
@@ -358,17 +516,18 @@ Zusammenfassung:"""
         Returns:
             Embedding vector or None if request failed
         """
-        self._apply_rate_limit()
-        
-        request_data = {"model": EMBEDDING_MODEL, "prompt": text}
+        request_data = {"model": EMBEDDING_MODEL, "prompt": text, "keep_alive": self.residency.keep_alive}
         logger.debug(f"Sending embedding request for {len(text)} characters of text")
         
         try:
-            response = requests.post(
-                f"{OLLAMA_ENDPOINT}/api/embeddings",
-                json=request_data,
-                timeout=timeout
-            )
+            # Least-loaded Ollama host; the pool applies per-host rate limiting
+            with self.endpoint_pool.lease() as endpoint:
+                response = requests.post(
+                    f"{endpoint}/api/embeddings",
+                    json=request_data,
+                    headers=OLLAMA_HEADERS,
+                    timeout=timeout
+                )
             
             if response.status_code != 200:
                 logger.error(f"HTTP {response.status_code}: {response.text}")
@@ -564,20 +723,24 @@ Zusammenfassung:"""
             numeric_id = generate_consistent_numeric_id(doc_id)
             
             # Store original ID in payload
-            payload_with_id = payload.copy()
+            payload_with_id = filter_payload(payload.copy())
             payload_with_id["original_id"] = doc_id
             
+            if self.solr_writer is not None:
+                self.solr_writer.write({doc_id: embedding})
+            
             # Store in Qdrant
-            self.qdrant_client.upsert(
-                collection_name=COLLECTION_NAME,
-                points=[
-                    qdrant_models.PointStruct(
-                        id=numeric_id,
-                        payload=payload_with_id,
-                        vector=embedding
-                    )
-                ]
-            )
+            if self.write_qdrant:
+                self.qdrant_client.upsert(
+                    collection_name=self.collection_name,
+                    points=[
+                        qdrant_models.PointStruct(
+                            id=numeric_id,
+                            payload=payload_with_id,
+                            vector=self._point_vector(embedding)
+                        )
+                    ]
+                )
             logger.info(f"Indexed document {doc_id} (numeric ID: {numeric_id})")
             return True
         except Exception as e:
@@ -595,29 +758,39 @@ Zusammenfassung:"""
         """
         try:
             points = []
+            solr_vectors = {}
             success_count = 0
+            valid_docs = []
             
             for doc in documents:
+                doc_id = doc.get("id", "unknown")
+                
+                # Validate the doc has required fields
+                if not doc.get("text"):
+                    logger.warning(f"Document {doc_id} has no text content. Skipping.")
+                    continue
+                
+                text_length = len(doc["text"])
+                
+                if text_length < 10:  # Arbitrary minimum length for meaningful content
+                    logger.warning(f"Document {doc_id} has too little text ({text_length} chars). Skipping.")
+                    continue
+                
+                logger.info(f"Processing document {doc_id} with {text_length} characters")
+                valid_docs.append(doc)
+            
+            # Embeddings parallel erzeugen - die Parallelität skaliert mit der Anzahl der Ollama-Hosts
+            futures = [
+                (doc, self.request_executor.submit(self.generate_embedding, doc["text"]))
+                for doc in valid_docs
+            ]
+            
+            for doc, future in futures:
                 try:
                     doc_id = doc["id"]
+                    text_length = len(doc["text"])
                     
-                    # Validate the doc has required fields
-                    if not doc.get("text"):
-                        logger.warning(f"Document {doc_id} has no text content. Skipping.")
-                        continue
-                    
-                    # Get the text to index
-                    text_to_embed = doc["text"]
-                    text_length = len(text_to_embed)
-                    
-                    if text_length < 10:  # Arbitrary minimum length for meaningful content
-                        logger.warning(f"Document {doc_id} has too little text ({text_length} chars). Skipping.")
-                        continue
-                    
-                    logger.info(f"Processing document {doc_id} with {text_length} characters")
-                    
-                    # Generate embedding
-                    embedding = self.generate_embedding(text_to_embed)
+                    embedding = future.result()
                     
                     if not embedding:
                         logger.warning(f"Failed to generate embedding for document {doc_id}. Skipping.")
@@ -631,17 +804,21 @@ Zusammenfassung:"""
                     numeric_id = generate_consistent_numeric_id(doc_id)
                     
                     # Add original ID to payload
-                    payload = doc["payload"].copy()
+                    payload = filter_payload(doc["payload"].copy())
                     payload["original_id"] = doc_id
                     payload["text_length"] = text_length  # Speichere Textlänge für Diagnose
                     
+                    if self.solr_writer is not None:
+                        solr_vectors[doc_id] = embedding
+                    
                     # Create point
-                    point = qdrant_models.PointStruct(
-                        id=numeric_id,
-                        payload=payload,
-                        vector=embedding
-                    )
-                    points.append(point)
+                    if self.write_qdrant:
+                        point = qdrant_models.PointStruct(
+                            id=numeric_id,
+                            payload=payload,
+                            vector=self._point_vector(embedding)
+                        )
+                        points.append(point)
                     success_count += 1
                     
                     # Batch-Größe überprüfen und bei Bedarf schon jetzt indexieren
@@ -656,6 +833,8 @@ Zusammenfassung:"""
             # Restliche Punkte indexieren
             if points:
                 self._index_points_batch(points)
+            if solr_vectors:
+                self.solr_writer.write(solr_vectors)
             
             logger.info(f"Indexed batch with {success_count} documents successfully")
             return success_count
@@ -675,7 +854,7 @@ Zusammenfassung:"""
         try:
             logger.info(f"Indexing batch of {len(points)} points to Qdrant")
             self.qdrant_client.upsert(
-                collection_name=COLLECTION_NAME,
+                collection_name=self.collection_name,
                 points=points
             )
             logger.info(f"Successfully indexed {len(points)} points")
@@ -686,7 +865,7 @@ Zusammenfassung:"""
                 try:
                     logger.info(f"Attempting to index point {point.id} individually")
                     self.qdrant_client.upsert(
-                        collection_name=COLLECTION_NAME,
+                        collection_name=self.collection_name,
                         points=[point]
                     )
                 except Exception as e2:
@@ -983,7 +1162,8 @@ class XMLDocumentFetcher:
 def main():
     """Main function to run the indexer."""
     # Declare global variables first
-    global MAX_TEXT_LENGTH, BATCH_SIZE, CHUNK_SIZE
+    global MAX_TEXT_LENGTH, BATCH_SIZE, CHUNK_SIZE, MAX_CONCURRENT_REQUESTS
+    global OLLAMA_ENDPOINT, OLLAMA_ENDPOINTS, QDRANT_ENDPOINT, SOLR_ENDPOINT
     
     parser = argparse.ArgumentParser(description="Index documents into Qdrant vector database")
     parser.add_argument("--source", choices=["solr", "xml"], default="solr",
@@ -991,7 +1171,13 @@ def main():
     parser.add_argument("--limit", type=int, default=None,
                       help="Maximum number of documents to process (default: all)")
     parser.add_argument("--recreate", action="store_true",
-                      help="Recreate the Qdrant collection if it exists")
+                      help="Rebuild into a new versioned collection and switch the alias after validation")
+    parser.add_argument("--keep-versions", type=int, default=KEEP_COLLECTION_VERSIONS,
+                      help=f"Collection versions to keep after a rebuild, including the live one "
+                           f"(default: {KEEP_COLLECTION_VERSIONS})")
+    parser.add_argument("--min-point-ratio", type=float, default=MIN_POINT_RATIO,
+                      help=f"Minimum size of a rebuild relative to the live collection before the alias "
+                           f"is switched (default: {MIN_POINT_RATIO})")
     parser.add_argument("--docker", action="store_true",
                       help="Use Docker network endpoints instead of localhost")
     parser.add_argument("--debug", action="store_true",
@@ -1002,12 +1188,30 @@ def main():
                       help=f"Batch size for document processing (default: {BATCH_SIZE})")
     parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
                       help=f"Chunk size for text splitting (default: {CHUNK_SIZE})")
+    parser.add_argument("--ollama-hosts", type=str, default=None,
+                      help="Comma-separated list of Ollama endpoints for embedding generation "
+                           "(default: OLLAMA_ENDPOINTS env or the single Ollama endpoint)")
+    parser.add_argument("--concurrency-per-host", type=int, default=MAX_CONCURRENT_REQUESTS,
+                      help=f"Concurrent embedding requests per Ollama host (default: {MAX_CONCURRENT_REQUESTS})")
+    parser.add_argument("--vector-mode", choices=["full", "reduced", "both"], default="full",
+                      help="Store full embeddings, a reduced vector instead, or both as named vectors (default: full)")
+    parser.add_argument("--projection-file", type=str, default=None,
+                      help="Projection file (.npz) for reduced vectors, see fit_vector_projection.py")
+    parser.add_argument("--reduction", choices=REDUCTION_METHODS, default="truncate",
+                      help="Reduction method when the projection file does not exist yet; "
+                           "'pca' must be fitted with fit_vector_projection.py (default: truncate)")
+    parser.add_argument("--reduced-dim", type=int, default=256,
+                      help="Dimension of the reduced vectors for a new truncation projection (default: 256)")
+    parser.add_argument("--target", choices=INDEX_TARGETS, default="qdrant",
+                      help="Write embeddings to Qdrant, to the Solr vector field of the indexed documents, "
+                           "or to both (default: qdrant)")
     args = parser.parse_args()
     
     # Update global configuration based on arguments
     MAX_TEXT_LENGTH = args.max_text_length
     BATCH_SIZE = args.batch_size
     CHUNK_SIZE = args.chunk_size
+    MAX_CONCURRENT_REQUESTS = args.concurrency_per_host
     
     # Set log level
     if args.debug:
@@ -1016,23 +1220,51 @@ def main():
     
     # Use Docker endpoints if specified
     if args.docker:
-        global OLLAMA_ENDPOINT, QDRANT_ENDPOINT, SOLR_ENDPOINT
         OLLAMA_ENDPOINT = DOCKER_OLLAMA_ENDPOINT
+        OLLAMA_ENDPOINTS = DOCKER_OLLAMA_ENDPOINT
         QDRANT_ENDPOINT = DOCKER_QDRANT_ENDPOINT
         SOLR_ENDPOINT = DOCKER_SOLR_ENDPOINT
         logger.info("Using Docker network endpoints")
     
+    if args.ollama_hosts:
+        OLLAMA_ENDPOINTS = args.ollama_hosts
+    
     # Log configuration
     logger.info(f"Configuration: MAX_TEXT_LENGTH={MAX_TEXT_LENGTH}, BATCH_SIZE={BATCH_SIZE}, "
                 f"CHUNK_SIZE={CHUNK_SIZE}, MAX_RETRIES={MAX_RETRIES}")
-    logger.info(f"Endpoints: OLLAMA={OLLAMA_ENDPOINT}, QDRANT={QDRANT_ENDPOINT}, SOLR={SOLR_ENDPOINT}")
+    logger.info(f"Endpoints: OLLAMA={OLLAMA_ENDPOINTS}, QDRANT={QDRANT_ENDPOINT}, SOLR={SOLR_ENDPOINT}")
+    
+    # Load or create the projection for reduced vectors
+    projection = None
+    if args.vector_mode != "full":
+        if not args.projection_file:
+            logger.error(f"--vector-mode {args.vector_mode} requires --projection-file")
+            sys.exit(1)
+        expected_vector_name = REDUCED_VECTOR_NAME if args.vector_mode == "both" else None
+        
+        if os.path.exists(args.projection_file):
+            projection = VectorProjection.load(args.projection_file)
+            if projection.vector_name != expected_vector_name:
+                logger.error(f"Projection {args.projection_file} was created for vector name "
+                             f"'{projection.vector_name}', vector mode '{args.vector_mode}' needs "
+                             f"'{expected_vector_name}'")
+                sys.exit(1)
+        elif args.reduction == "truncate":
+            projection = VectorProjection.truncation(VECTOR_SIZE, args.reduced_dim, vector_name=expected_vector_name)
+            projection.save(args.projection_file)
+        else:
+            logger.error(f"PCA projection {args.projection_file} not found. "
+                         f"Fit it first with fit_vector_projection.py")
+            sys.exit(1)
     
     try:
         # Initialize indexer
-        indexer = QdrantIndexer(recreate=args.recreate)
+        indexer = QdrantIndexer(recreate=args.recreate, projection=projection, vector_mode=args.vector_mode,
+                                target=args.target)
         
         # Create collection
-        indexer.create_collection_if_not_exists()
+        if indexer.write_qdrant:
+            indexer.create_collection_if_not_exists()
         
         # Fetch documents
         logger.info(f"Fetching documents from {args.source}")
@@ -1110,6 +1342,15 @@ def main():
         if success_count == 0:
             logger.error("No documents were successfully indexed. Please check the logs for errors.")
             sys.exit(1)
+        
+        if indexer.solr_writer is not None:
+            indexer.solr_writer.commit()
+        
+        # Blue/green: switch the alias only after the rebuild has been validated
+        if args.recreate and indexer.write_qdrant and not indexer.publish_collection(
+                success_count, keep_versions=args.keep_versions, min_point_ratio=args.min_point_ratio):
+            logger.error(f"Rebuilt collection '{indexer.collection_name}' was not published.")
+            sys.exit(1)
             
     except KeyboardInterrupt:
         logger.info("Indexing interrupted by user")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Query Sets
+
+Built-in German legal queries for evaluation and benchmark scripts, and a loader for
+query files (one query per line, or JSONL with a "query" field).
+"""
+
+import json
+from typing import Dict, List
+
+# Typical queries from the ASRA search log: citations, short topics and natural-language questions
+GERMAN_LEGAL_QUERIES = [
+    "Art 1 GG",
+    "§ 823 BGB",
+    "Kündigung Mietvertrag",
+    "Menschenwürde",
+    "Meinungsfreiheit und Pressefreiheit",
+    "Gleichheit vor dem Gesetz",
+    "Schadensersatz bei unerlaubter Handlung",
+    "Eigentum verpflichtet",
+    "Asylrecht politisch Verfolgte",
+    "Berufsfreiheit",
+    "Versammlungsfreiheit",
+    "Unverletzlichkeit der Wohnung",
+    "Gesetzgebungskompetenz des Bundes",
+    "Bundesverfassungsgericht Zuständigkeit",
+    "Wahl des Bundespräsidenten",
+    "Haushaltsplan des Bundes",
+    "Kinder und Erziehung Elternrecht",
+    "Verbot der Zensur",
+    "Recht auf Leben und körperliche Unversehrtheit",
+    "Enteignung Entschädigung",
+    "Brief- und Postgeheimnis",
+    "Staatsangehörigkeit Entziehung",
+    "Petitionsrecht",
+    "Widerstandsrecht",
+    "Glaubensfreiheit Gewissensfreiheit",
+    "Verteidigungsfall Bundeswehr",
+    "Steuerverteilung zwischen Bund und Ländern",
+    "Rechtsweg bei Verletzung von Rechten durch die öffentliche Gewalt",
+    "Wer haftet, wenn jemand fahrlässig einen Schaden verursacht?",
+    "Welche Rechte haben Abgeordnete im Bundestag?",
+]
+
+
+def load_queries(path: str) -> List[Dict]:
+    """Load queries from a file.
+
+    Plain text files contain one query per line. JSONL files contain one object per
+    line with a "query" field and optional extra fields (e.g. "id", "limit",
+    "relevant_ids"), which are passed through unchanged.
+
+    Args:
+        path: Path to the query file
+
+    Returns:
+        List of query dicts, each with at least a "query" key
+    """
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                entry = json.loads(line)
+                if entry.get("query"):
+                    queries.append(entry)
+            else:
+                queries.append({"query": line})
+    return queries
+
+
+def query_limit(entry: Dict, default: int) -> int:
+    """Return the number of results requested by a query entry.
+
+    Args:
+        entry: Query dict, optionally with a "limit" field
+        default: Limit of entries without one (e.g. --limit)
+
+    Returns:
+        The entry's limit, or the default
+
+    Raises:
+        ValueError: If the entry's limit is not a positive integer
+    """
+    limit = entry.get("limit")
+    if limit is None:
+        return default
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+        raise ValueError(f"Invalid limit {limit!r} for query '{entry['query']}', expected a positive integer")
+    return limit
+
+
+def default_queries() -> List[Dict]:
+    """Return the built-in German legal query set as query dicts."""
+    return [{"query": query} for query in GERMAN_LEGAL_QUERIES]
@@ -54,7 +54,10 @@ class QdrantDocumentRemover:
         # Verify collection exists
         try:
             collections = self.qdrant_client.get_collections()
-            if COLLECTION_NAME not in [c.name for c in collections.collections]:
+            aliases = self.qdrant_client.get_aliases()
+            # COLLECTION_NAME is an alias after the first blue/green reindexing run
+            if (COLLECTION_NAME not in [c.name for c in collections.collections] and
+                    COLLECTION_NAME not in [a.alias_name for a in aliases.aliases]):
                 logger.error(f"Collection '{COLLECTION_NAME}' not found in Qdrant")
                 sys.exit(1)
             logger.info(f"Connected to Qdrant collection '{COLLECTION_NAME}'")
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Search Caches
+
+In-process caches for the hybrid search service. `TTLCache` is a thread-safe LRU
+cache, bounded by entry count and optionally by estimated size, whose entries expire
+after a fixed time. `EmbeddingCache` builds on it to store query embeddings keyed by
+normalized query text, embedding model and model digest, with an optional SQLite tier
+that several worker processes can share. `ResultCache` stores fused hybrid result lists
+and drops them when the Solr or Qdrant index version changes.
+
+Usage:
+    cache = EmbeddingCache(EMBEDDING_MODEL, max_entries=2048, ttl_seconds=86400,
+                           sqlite_path="/tmp/asra_embeddings.db")
+    embedding = cache.get(query)
+    if embedding is None:
+        embedding = generate(query)
+        cache.put(query, embedding)
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Cache defaults
+DEFAULT_MAX_ENTRIES = 2048  # Covers the few hundred queries that make up most traffic
+DEFAULT_TTL_SECONDS = 24 * 60 * 60  # Embeddings only change with the model
+SQLITE_TIMEOUT = 5  # Seconds to wait for a lock held by another worker
+DEFAULT_RESULT_MAX_BYTES = 64 * 1024 * 1024  # Memory bound for cached result lists
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text for use as a cache key.
+
+    Applies Unicode NFC normalization and collapses whitespace. Case is kept because
+    the embedding model is case-sensitive.
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        Normalized query text
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a maximum size and per-entry expiry."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: Optional[int] = None, sizeof: Optional[Callable[[Any], int]] = None):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries before the least recently used is evicted
+            ttl_seconds: Lifetime of an entry in seconds
+            max_bytes: Optional bound on the summed entry sizes
+            sizeof: Size estimate of a value in bytes, required with max_bytes
+        """
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes requires a sizeof function")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry and its size (lock must be held)."""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for a key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if the cache is full."""
+        if self.max_entries <= 0:
+            return
+        size = self.sizeof(value) if self.sizeof else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Larger than the whole cache
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SQLiteEmbeddingStore:
+    """Embedding store in a SQLite file shared by several worker processes."""
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """Open (and create if needed) the SQLite store.
+
+        Args:
+            path: Path of the SQLite database file
+            ttl_seconds: Lifetime of an entry in seconds
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=SQLITE_TIMEOUT, check_same_thread=False)
+        # Reason: WAL lets readers in other workers proceed while one worker writes
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "cache_key TEXT PRIMARY KEY, embedding BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Return a stored embedding, or None if it is missing or expired."""
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT embedding, created_at FROM embeddings WHERE cache_key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding store read failed: {e}")
+            return None
+
+        if row is None or row[1] + self.ttl_seconds < time.time():
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def put(self, key: str, embedding: List[float]) -> None:
+        """Store an embedding as float32 blob."""
+        blob = np.asarray(embedding, dtype=np.float32).tobytes()
+        try:
+            with self._lock:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO embeddings (cache_key, embedding, created_at) VALUES (?, ?, ?)",
+                    (key, blob, time.time())
+                )
+                self._connection.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding store write failed: {e}")
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM embeddings WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._connection.commit()
+            return cursor.rowcount
+
+
+class EmbeddingCache:
+    """Two-tier cache for query embeddings (in-process LRU, optional SQLite)."""
+
+    def __init__(self, model: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, sqlite_path: Optional[str] = None):
+        """Initialize the embedding cache.
+
+        Args:
+            model: Embedding model name, part of every cache key
+            max_entries: Maximum number of in-process entries
+            ttl_seconds: Lifetime of an entry in seconds (both tiers)
+            sqlite_path: Optional SQLite file shared between workers
+        """
+        self.model = model
+        self.model_digest: Optional[str] = None
+        self.memory = TTLCache(max_entries, ttl_seconds)
+        self.store = SQLiteEmbeddingStore(sqlite_path, ttl_seconds) if sqlite_path else None
+        self.store_hits = 0
+
+    def set_model_digest(self, digest: Optional[str]) -> None:
+        """Set the model digest that is part of every key.
+
+        A changed digest means the model was replaced; embeddings of the old model are
+        no longer reachable and the in-process tier is dropped.
+        """
+        if digest and digest != self.model_digest:
+            if self.model_digest is not None:
+                logger.info(f"Embedding model {self.model} changed ({self.model_digest[:12]} -> {digest[:12]}), "
+                            f"dropping cached query embeddings")
+                self.memory.clear()
+            self.model_digest = digest
+
+    def key(self, text: str) -> str:
+        """Build the cache key for a query."""
+        return f"{self.model}@{self.model_digest or 'unknown'}\x00{normalize_query(text)}"
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Return the cached embedding for a query, or None on a miss."""
+        key = self.key(text)
+        embedding = self.memory.get(key)
+        if embedding is None and self.store is not None:
+            embedding = self.store.get(key)
+            if embedding is not None:
+                self.store_hits += 1
+                self.memory.put(key, embedding)
+        return embedding
+
+    def put(self, text: str, embedding: List[float]) -> None:
+        """Cache the embedding of a query in both tiers."""
+        key = self.key(text)
+        self.memory.put(key, embedding)
+        if self.store is not None:
+            self.store.put(key, embedding)
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters of both tiers."""
+        stats = self.memory.stats()
+        # Memory misses that were answered by the shared store are hits overall
+        lookups = stats["hits"] + stats["misses"]
+        hits = stats["hits"] + self.store_hits
+        stats.update({
+            "model": self.model,
+            "model_digest": self.model_digest,
+            "memory_hits": stats["hits"],
+            "store_hits": self.store_hits,
+            "hits": hits,
+            "misses": lookups - hits,
+            "shared_store": self.store.path if self.store else None,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        })
+        return stats
+
+
+def estimate_json_size(value: Any) -> int:
+    """Estimate the memory footprint of a JSON-like value by its serialized length."""
+    return len(json.dumps(value, ensure_ascii=False, default=str))
+
+
+class ResultCache:
+    """Cache for fused hybrid result lists, invalidated by index version changes."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_RESULT_MAX_BYTES):
+        """Initialize the result cache.
+
+        Args:
+            max_entries: Maximum number of cached result lists
+            ttl_seconds: Lifetime of an entry in seconds
+            max_bytes: Memory bound for all cached result lists (estimated via JSON size)
+        """
+        self.entries = TTLCache(max_entries, ttl_seconds, max_bytes=max_bytes, sizeof=estimate_json_size)
+        self.index_version: Optional[Hashable] = None
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def set_index_version(self, version: Hashable) -> None:
+        """Record the current index version and drop all entries if it changed.
+
+        Args:
+            version: Hashable version of all indexes the results depend on
+        """
+        with self._lock:
+            if version == self.index_version:
+                return
+            if self.index_version is not None:
+                logger.info(f"Index version changed ({self.index_version} -> {version}), dropping cached results")
+                self.entries.clear()
+                self.invalidations += 1
+            self.index_version = version
+
+    @staticmethod
+    def key(query: str, limit: int, *params: Hashable) -> tuple:
+        """Build the cache key from the normalized query, the limit and further parameters."""
+        return (normalize_query(query), limit) + params
+
+    def get(self, key: tuple) -> Optional[List[Dict]]:
+        """Return a copy of the cached result list, or None on a miss."""
+        results = self.entries.get((self.index_version,) + key)
+        # Reason: callers may modify the returned documents (e.g. the service adds fields)
+        return [dict(doc) for doc in results] if results is not None else None
+
+    def put(self, key: tuple, results: List[Dict]) -> None:
+        """Cache a copy of a result list under the current index version."""
+        self.entries.put((self.index_version,) + key, [dict(doc) for doc in results])
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters, memory use and the index version."""
+        stats = self.entries.stats()
+        stats.update({
+            "index_version": str(self.index_version),
+            "invalidations": self.invalidations,
+        })
+        return stats
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Search Filters
+
+Field filters for the hybrid search, e.g. one law (`jurabk`) or one norm type. The
+same filter is pushed down to both engines instead of filtering the fused results:
+
+- Solr gets one `fq` clause per field. Solr caches each clause in its filterCache,
+  so repeated filters only cost a bitset intersection.
+- Qdrant gets a payload filter. With payload indexes on the fields (created by
+  qdrant_indexer.py), the filtered HNSW search only visits matching points.
+
+Values of one field are OR-ed, different fields are AND-ed:
+
+    {"jurabk": ["BGB", "HGB"], "norm_type": "article"}
+    -> fq=jurabk:("bgb" OR "hgb")&fq=norm_type:("article")
+
+Solr indexes `jurabk` and `amtabk` as lowercased text_de_exact, while Qdrant keyword
+indexes compare exactly. Filter values of these fields are therefore lowercased, and
+Qdrant filters on lowercased payload copies (`jurabk_folded`, `amtabk_folded`) that
+filter_payload() adds at indexing time. The original payload values stay for display.
+"""
+
+import json
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from qdrant_client.http import models as qdrant_models
+
+# Fields stored in Solr and in the Qdrant payload with the same values
+FILTER_FIELDS = ("jurabk", "amtabk", "norm_type", "parent_document_id")
+CASE_INSENSITIVE_FIELDS = ("jurabk", "amtabk")  # text_de_exact in Solr, lowercased at index and query time
+FOLDED_SUFFIX = "_folded"  # Qdrant payload key suffix of the lowercased copies
+MAX_FILTER_VALUES = 50  # Values per field; larger sets belong in a dedicated query
+
+Filters = Dict[str, Tuple[str, ...]]
+
+
+def payload_field(field: str) -> str:
+    """Return the Qdrant payload key a filter field is matched against."""
+    return f"{field}{FOLDED_SUFFIX}" if field in CASE_INSENSITIVE_FIELDS else field
+
+
+# Payload keys with keyword indexes (created by qdrant_indexer.py)
+PAYLOAD_INDEX_FIELDS = tuple(payload_field(field) for field in FILTER_FIELDS)
+
+
+def filter_payload(payload: Dict) -> Dict:
+    """Add the lowercased copies of case-insensitive filter fields to a Qdrant payload.
+
+    Args:
+        payload: Point payload with the original field values (strings or lists)
+
+    Returns:
+        The same payload, extended in place
+    """
+    for field in CASE_INSENSITIVE_FIELDS:
+        value = payload.get(field)
+        if isinstance(value, (list, tuple)):
+            payload[payload_field(field)] = [str(item).lower() for item in value]
+        elif value is not None:
+            payload[payload_field(field)] = str(value).lower()
+    return payload
+
+
+def normalize_filters(filters: Optional[Mapping[str, Union[str, Sequence[str]]]]) -> Optional[Filters]:
+    """Validate filters and bring them into a canonical, hashable form.
+
+    Args:
+        filters: Field -> value or list of values
+
+    Returns:
+        Field -> sorted tuple of distinct values (lowercased for CASE_INSENSITIVE_FIELDS),
+        or None if no filter is set
+
+    Raises:
+        ValueError: If a field is not filterable or has too many values
+    """
+    if not filters:
+        return None
+    normalized = {}
+    for field, values in filters.items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"Unknown filter field '{field}', expected one of {', '.join(FILTER_FIELDS)}")
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        values = {str(value).strip() for value in values if value is not None and str(value).strip()}
+        if field in CASE_INSENSITIVE_FIELDS:
+            values = {value.lower() for value in values}
+        values = tuple(sorted(values))
+        if len(values) > MAX_FILTER_VALUES:
+            raise ValueError(f"Filter '{field}' has {len(values)} values, at most {MAX_FILTER_VALUES} are allowed")
+        if values:
+            normalized[field] = values
+    return dict(sorted(normalized.items())) or None
+
+
+def filter_key(filters: Optional[Filters]) -> str:
+    """Return a stable string for cache keys ("" without filters)."""
+    return json.dumps(filters, ensure_ascii=False, separators=(",", ":")) if filters else ""
+
+
+def _solr_phrase(value: str) -> str:
+    """Quote a filter value for the Solr standard query parser."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def solr_filter_queries(filters: Optional[Filters]) -> List[str]:
+    """Build one Solr fq clause per filtered field.
+
+    Args:
+        filters: Normalized filters
+
+    Returns:
+        List of fq clauses (empty without filters)
+    """
+    if not filters:
+        return []
+    return [f"{field}:({' OR '.join(_solr_phrase(value) for value in values)})"
+            for field, values in filters.items()]
+
+
+def qdrant_filter(filters: Optional[Filters]) -> Optional[qdrant_models.Filter]:
+    """Build the Qdrant payload filter.
+
+    Args:
+        filters: Normalized filters
+
+    Returns:
+        Filter with one condition per field, or None without filters
+    """
+    if not filters:
+        return None
+    conditions = []
+    for field, values in filters.items():
+        match = (qdrant_models.MatchValue(value=values[0]) if len(values) == 1
+                 else qdrant_models.MatchAny(any=list(values)))
+        conditions.append(qdrant_models.FieldCondition(key=payload_field(field), match=match))
+    return qdrant_models.Filter(must=conditions)
+
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Solr Vectors
+
+Dense vectors in Solr for deployments without Qdrant. The E5 document embeddings are
+stored in the `embedding_vector` DenseVectorField of the `documents` core, next to the
+text fields. The hybrid search then runs the `{!knn}` query and the edismax query
+against the same core, and semantic hits arrive with their stored fields.
+
+- `SolrVectorWriter` writes embeddings into existing Solr documents with atomic
+  updates (used by `qdrant_indexer.py --target solr`).
+- `knn_query` builds the `{!knn}` query for a query embedding.
+- `cosine_from_solr` converts Solr's kNN score back to the cosine similarity that
+  Qdrant returns, so thresholds and fusion behave the same for both backends.
+"""
+
+import json
+import logging
+from typing import Dict, List
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+SOLR_VECTOR_FIELD = "embedding_vector"  # DenseVectorField in the documents configset (managed-schema)
+SOLR_VECTOR_SIZE = 1024  # vectorDimension of the field; multilingual-e5-large embeddings
+COMMIT_WITHIN_MS = 10000  # Solr makes written vectors searchable within this time
+WRITE_TIMEOUT_SECONDS = 60  # Timeout of one update request
+
+
+def knn_query(embedding: List[float], top_k: int, field: str = SOLR_VECTOR_FIELD) -> str:
+    """Build a Solr kNN query.
+
+    fq parameters of the same request act as pre-filters, so a filtered kNN search
+    still returns top_k matching documents.
+
+    Args:
+        embedding: Query embedding
+        top_k: Number of nearest neighbours
+        field: DenseVectorField to search
+
+    Returns:
+        Query string for the q parameter
+    """
+    vector = ",".join(f"{value:.7g}" for value in embedding)
+    return f"{{!knn f={field} topK={top_k}}}[{vector}]"
+
+
+def cosine_from_solr(score: float) -> float:
+    """Convert a Solr kNN score to the cosine similarity.
+
+    Solr (Lucene) scores cosine similarity as (1 + cosine) / 2 to keep scores positive.
+    """
+    return 2.0 * score - 1.0
+
+
+class SolrVectorWriter:
+    """Writes document embeddings into the Solr vector field."""
+
+    def __init__(self, solr_endpoint: str, field: str = SOLR_VECTOR_FIELD, vector_size: int = SOLR_VECTOR_SIZE,
+                 commit_within_ms: int = COMMIT_WITHIN_MS):
+        """Initialize the writer.
+
+        Args:
+            solr_endpoint: Core URL, e.g. http://localhost:8983/solr/documents
+            field: DenseVectorField receiving the embeddings
+            vector_size: Dimension of the field; other embeddings are skipped
+            commit_within_ms: commitWithin of the updates
+        """
+        self.solr_endpoint = solr_endpoint.rstrip("/")
+        self.field = field
+        self.vector_size = vector_size
+        self.commit_within_ms = commit_within_ms
+        self.session = requests.Session()
+        self.written = 0
+        self.skipped = 0
+
+    def write(self, embeddings: Dict[str, List[float]]) -> int:
+        """Set the vector field of existing Solr documents.
+
+        The updates are atomic, so the other fields of the documents are kept. They carry
+        `_version_: 1`, which makes Solr skip IDs that are not in the core instead of
+        creating documents that only hold a vector.
+
+        Args:
+            embeddings: Solr document ID -> embedding
+
+        Returns:
+            Number of embeddings sent to Solr
+
+        Raises:
+            requests.exceptions.RequestException: If the update request fails
+        """
+        updates = []
+        for doc_id, embedding in embeddings.items():
+            if len(embedding) != self.vector_size:
+                logger.warning(f"Embedding of document {doc_id} has {len(embedding)} dimensions, "
+                               f"{self.field} expects {self.vector_size}. Skipping.")
+                self.skipped += 1
+                continue
+            updates.append({"id": doc_id, "_version_": 1, self.field: {"set": [float(value) for value in embedding]}})
+        if not updates:
+            return 0
+
+        response = self.session.post(
+            f"{self.solr_endpoint}/update",
+            params={"commitWithin": self.commit_within_ms, "failOnVersionConflicts": "false", "wt": "json"},
+            data=json.dumps(updates),
+            headers={"Content-Type": "application/json"},
+            timeout=WRITE_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        self.written += len(updates)
+        logger.info(f"Wrote {len(updates)} vectors to Solr field {self.field}")
+        return len(updates)
+
+    def commit(self) -> None:
+        """Make all written vectors searchable now."""
+        response = self.session.get(f"{self.solr_endpoint}/update", params={"commit": "true", "wt": "json"},
+                                    timeout=WRITE_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        logger.info(f"Committed {self.written} Solr vectors ({self.skipped} skipped)")
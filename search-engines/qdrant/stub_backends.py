@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Stand-in Backends
+
+Local stand-ins for Solr, Ollama and Qdrant on one HTTP port, for benchmarks and
+smoke tests without the real services. They serve the endpoints the hybrid search
+uses over a synthetic corpus and add a configurable latency per request:
+
+    Solr    /solr/documents/select, /get, /admin/luke, /admin/ping
+    Ollama  /api/tags, /api/ps, /api/embeddings, /api/embed
+    Qdrant  /, /aliases, /collections, /collections/<name>, .../points/query(/batch)
+
+Keyword results come from a small inverted index over the synthetic texts; semantic
+results from random unit vectors. Similarities are mapped to 0.5-1, so the
+hybrid search's similarity threshold keeps the candidates. The results are meant for
+latency measurements, not for relevance.
+
+Usage:
+    python3 stub_backends.py [--port 8990] [--documents 5000] [--solr-latency-ms 5]
+
+    backends = StubBackends(documents=5000)
+    base_url = backends.start()        # e.g. http://127.0.0.1:41234
+    ...
+    backends.stop()
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from query_sets import GERMAN_LEGAL_QUERIES
+from search_filters import filter_payload
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DOCUMENTS = 5000  # Size of the synthetic corpus
+DEFAULT_DIMENSIONS = 1024  # multilingual-e5-large-instruct
+DEFAULT_PORT = 8990
+SOLR_PATH = "/solr/documents"
+KNN_QUERY = re.compile(r"\{!knn f=\w+ topK=(\d+)\}\[([^\]]*)\]")
+COLLECTION_NAME = "deutsche_gesetze"
+EMBEDDING_MODEL = "qllama/multilingual-e5-large-instruct:latest"
+WORDS_PER_DOCUMENT = 40
+DEFAULT_KEEP_ALIVE_SECONDS = 300  # Ollama's default keep_alive
+FOREVER = 253402300799  # Latest timestamp datetime can represent, for negative keep_alive
+DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+JURABKS = ("BGB", "StGB", "GG", "ZPO", "HGB", "SGB V", "StVO", "VwVfG")
+FILLER_WORDS = (
+    "Antrag", "Behörde", "Frist", "Verfahren", "Anspruch", "Vertrag", "Person", "Recht",
+    "Pflicht", "Verordnung", "Gesetz", "Entscheidung", "Gericht", "Zustellung", "Beschluss",
+    "Erklärung", "Leistung", "Zahlung", "Haftung", "Eigentum", "Besitz", "Schaden",
+)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercased word tokens."""
+    return [token.lower() for token in _TOKEN_RE.findall(text)]
+
+
+def keep_alive_seconds(keep_alive) -> float:
+    """Interpret a keep_alive value like Ollama (seconds or Go duration; negative keeps the model loaded)."""
+    if keep_alive is None:
+        return DEFAULT_KEEP_ALIVE_SECONDS
+    if isinstance(keep_alive, str) and not re.fullmatch(r"-?\d+(\.\d+)?", keep_alive.strip()):
+        sign = -1 if keep_alive.strip().startswith("-") else 1
+        units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        seconds = sign * sum(float(value) * units[unit] for value, unit in DURATION.findall(keep_alive))
+    else:
+        seconds = float(keep_alive)
+    return float(FOREVER) if seconds < 0 else seconds
+
+
+def text_vector(text: str, dimensions: int) -> np.ndarray:
+    """Deterministic random unit vector for a text (stand-in for an embedding)."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class StubCorpus:
+    """Synthetic norms with texts, an inverted index and vectors."""
+
+    def __init__(self, documents: int = DEFAULT_DOCUMENTS, dimensions: int = DEFAULT_DIMENSIONS, seed: int = 42):
+        """Generate the corpus.
+
+        Args:
+            documents: Number of norms
+            dimensions: Vector dimensions
+            seed: Random seed, the same seed yields the same corpus
+        """
+        rng = np.random.default_rng(seed)
+        vocabulary = sorted({token for query in GERMAN_LEGAL_QUERIES for token in tokenize(query)}
+                            | {word.lower() for word in FILLER_WORDS})
+        self.dimensions = dimensions
+        self.docs: List[Dict] = []
+        self.by_id: Dict[str, Dict] = {}
+        self.postings: Dict[str, List[int]] = {}
+        for index in range(documents):
+            words = rng.choice(vocabulary, size=WORDS_PER_DOCUMENT)
+            jurabk = JURABKS[index % len(JURABKS)]
+            doc = {
+                "id": f"STUB{index:06d}",
+                "enbez": f"§ {index // len(JURABKS) + 1}",
+                "kurzue": f"{jurabk} Stub-Norm {index}",
+                "langue": f"Synthetische Norm {index} für Benchmarks",
+                "norm_type": "paragraph",
+                "parent_document_id": f"STUB-{jurabk}",
+                "jurabk": [jurabk],
+                "amtabk": jurabk,
+                "text_content": " ".join(words),
+            }
+            doc["text_content_html"] = f"<p>{doc['text_content']}</p>"
+            self.docs.append(doc)
+            self.by_id[doc["id"]] = doc
+            for token in set(words):
+                self.postings.setdefault(token, []).append(index)
+
+        vectors = rng.standard_normal((documents, dimensions)).astype(np.float32)
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.idf = {token: math.log(1 + documents / len(postings)) for token, postings in self.postings.items()}
+
+    def keyword_search(self, query: str, rows: int) -> List[Tuple[Dict, float]]:
+        """Rank documents by the summed IDF of matching query tokens."""
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            for index in self.postings.get(token, []):
+                scores[index] = scores.get(index, 0.0) + self.idf[token]
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:rows]
+        return [(self.docs[index], score) for index, score in ranked]
+
+    def vector_search(self, vector: List[float], limit: int, score_threshold: Optional[float]) -> List[Tuple[int, float]]:
+        """Return (document index, score) of the nearest vectors; scores are mapped to 0.5-1."""
+        query = np.asarray(vector, dtype=np.float32)
+        if query.shape[0] != self.dimensions:
+            raise ValueError(f"Expected {self.dimensions}-dim vector, got {query.shape[0]}")
+        scores = 0.5 + 0.5 * (self.vectors @ (query / max(np.linalg.norm(query), 1e-12)))
+        top = np.argpartition(-scores, min(limit, len(scores) - 1))[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(int(index), float(scores[index])) for index in top
+                if score_threshold is None or scores[index] >= score_threshold]
+
+
+def select_fields(doc: Dict, fl: Optional[str]) -> Dict:
+    """Project a document onto the Solr field list (fl)."""
+    if not fl:
+        return dict(doc)
+    fields = [field.strip() for field in fl.split(",") if field.strip() and field.strip() != "score"]
+    return {field: doc[field] for field in fields if field in doc}
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the Solr, Ollama and Qdrant stand-ins."""
+
+    server_version = "ASRAStubBackends/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, payload, status: int = 200) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _delay(self, backend: str, items: int = 1) -> None:
+        """Sleep for the configured latency of a backend."""
+        backends: "StubBackends" = self.server.backends
+        seconds = backends.latency_ms[backend] / 1000
+        if backend == "ollama":
+            seconds += backends.ollama_item_ms * max(items - 1, 0) / 1000
+            if backends.ollama_slots is not None:
+                # A CPU Ollama host works on a limited number of requests at a time (OLLAMA_NUM_PARALLEL)
+                with backends.ollama_slots:
+                    time.sleep(seconds)
+                return
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        self._route("GET", parsed.path, params, {})
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        if self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+            # Solr /select with the parameters in the body (kNN queries)
+            length = int(self.headers.get("Content-Length") or 0)
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+            params.update({key: values[-1] for key, values in form.items()})
+            self._route("POST", parsed.path, params, {})
+            return
+        self._route("POST", parsed.path, params, self._read_json())
+
+    def _route(self, method: str, path: str, params: Dict, body: Dict) -> None:
+        try:
+            if path.startswith(SOLR_PATH):
+                self._delay("solr")
+                self._send_json(self._solr(path[len(SOLR_PATH):], params))
+            elif path.startswith("/api/"):
+                self._ollama(path, body)
+            else:
+                self._qdrant(method, path, body)
+        except (KeyError, ValueError) as e:
+            self._send_json({"error": str(e)}, status=400)
+
+    def _solr(self, path: str, params: Dict) -> Dict:
+        corpus: StubCorpus = self.server.backends.corpus
+        if path == "/admin/ping":
+            return {"status": "OK"}
+        if path == "/admin/luke":
+            return {"index": {"version": self.server.backends.index_version}}
+        if path == "/get":
+            docs = [select_fields(corpus.by_id[doc_id], params.get("fl"))
+                    for doc_id in params.get("ids", "").split(",") if doc_id in corpus.by_id]
+            return {"response": {"numFound": len(docs), "start": 0, "docs": docs}}
+        if path == "/select":
+            query = params.get("q", "")
+            rows = int(params.get("rows", 10))
+            if query.startswith("{!terms f=id}"):
+                docs = [corpus.by_id[doc_id] for doc_id in query[len("{!terms f=id}"):].split(",")
+                        if doc_id in corpus.by_id][:rows]
+                highlighting = {doc["id"]: {"text_content": [doc["text_content"][:200]]} for doc in docs}
+                return {"response": {"numFound": len(docs), "start": 0,
+                                     "docs": [select_fields(doc, params.get("fl")) for doc in docs]},
+                        "highlighting": highlighting}
+            knn = KNN_QUERY.match(query)
+            if knn:
+                vector = [float(value) for value in knn.group(2).split(",")]
+                # Reason: Solr scores cosine as (1 + cosine) / 2; the stand-in Qdrant score acts as the cosine
+                hits = [(corpus.docs[index], (1.0 + score) / 2) for index, score in
+                        corpus.vector_search(vector, int(knn.group(1)), None)]
+                docs = [dict(select_fields(doc, params.get("fl")), score=score) for doc, score in hits]
+                return {"response": {"numFound": len(docs), "start": 0, "docs": docs}}
+            start = int(params.get("start", 0))
+            hits = corpus.keyword_search(query, start + rows)[start:]
+            docs = [dict(select_fields(doc, params.get("fl")), score=score) for doc, score in hits]
+            return {"response": {"numFound": len(docs), "start": start, "docs": docs}}
+        raise KeyError(f"Unknown Solr path {path}")
+
+    def _ollama(self, path: str, body: Dict) -> None:
+        backends: "StubBackends" = self.server.backends
+        dimensions = backends.corpus.dimensions
+        if path == "/api/tags":
+            self._send_json({"models": [{"name": EMBEDDING_MODEL, "digest": "stub"}]})
+        elif path == "/api/ps":
+            self._send_json({"models": backends.loaded_models()})
+        elif path == "/api/embeddings":
+            backends.load_model(body.get("keep_alive"))
+            self._delay("ollama")
+            self._send_json({"embedding": text_vector(body["prompt"], dimensions).tolist()})
+        elif path == "/api/embed":
+            texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+            load_seconds = backends.load_model(body.get("keep_alive"))
+            self._delay("ollama", len(texts))
+            self._send_json({"model": EMBEDDING_MODEL, "load_duration": int(load_seconds * 1e9),
+                             "embeddings": [text_vector(text, dimensions).tolist() for text in texts]})
+        else:
+            self._send_json({"error": f"Unknown Ollama path {path}"}, status=404)
+
+    def _qdrant_points(self, search: Dict) -> Dict:
+        corpus: StubCorpus = self.server.backends.corpus
+        query = search["query"]
+        if isinstance(query, dict):
+            query = query.get("nearest", query)
+        hits = corpus.vector_search(query, int(search.get("limit", 10)), search.get("score_threshold"))
+        points = []
+        for index, score in hits:
+            doc = corpus.docs[index]
+            payload = {key: doc[key] for key in ("enbez", "kurzue", "langue", "norm_type",
+                                                 "parent_document_id", "jurabk", "amtabk")}
+            payload["original_id"] = doc["id"]
+            filter_payload(payload)
+            points.append({"id": index, "version": 0, "score": score,
+                           "payload": payload if search.get("with_payload") else None})
+        return {"points": points}
+
+    def _qdrant_count(self, payload_filter: Optional[Dict]) -> int:
+        """Count the documents matching the must conditions of a payload filter."""
+        corpus: StubCorpus = self.server.backends.corpus
+        conditions = (payload_filter or {}).get("must") or []
+
+        def matches(doc: Dict) -> bool:
+            for condition in conditions:
+                match = condition.get("match") or {}
+                allowed = match["any"] if "any" in match else [match.get("value")]
+                value = filter_payload(dict(doc)).get(condition.get("key"))
+                if not set(value if isinstance(value, list) else [value]) & set(allowed):
+                    return False
+            return True
+
+        return sum(1 for doc in corpus.docs if matches(doc))
+
+    def _qdrant(self, method: str, path: str, body: Dict) -> None:
+        backends: "StubBackends" = self.server.backends
+        collection_path = f"/collections/{COLLECTION_NAME}"
+        if path == "/":
+            self._send_json({"title": "qdrant - vector search engine (stub)", "version": "1.12.0"})
+            return
+
+        self._delay("qdrant")
+        if path == "/aliases" or path == "/collections/aliases":
+            result = {"aliases": []}
+        elif path == "/collections":
+            result = {"collections": [{"name": COLLECTION_NAME}]}
+        elif path == collection_path and method == "GET":
+            result = backends.collection_info()
+        elif path == f"{collection_path}/points/query":
+            result = self._qdrant_points(body)
+        elif path == f"{collection_path}/points/query/batch":
+            result = [self._qdrant_points(search) for search in body["searches"]]
+        elif path == f"{collection_path}/points/count":
+            result = {"count": self._qdrant_count(body.get("filter"))}
+        else:
+            self._send_json({"status": {"error": f"Unknown Qdrant path {path}"}}, status=404)
+            return
+        self._send_json({"result": result, "status": "ok", "time": 0.0})
+
+
+class StubBackends:
+    """Runs the stand-in backends on a background HTTP server."""
+
+    def __init__(self, documents: int = DEFAULT_DOCUMENTS, dimensions: int = DEFAULT_DIMENSIONS,
+                 solr_latency_ms: float = 5, ollama_latency_ms: float = 30,
+                 ollama_item_ms: float = 2, qdrant_latency_ms: float = 5, ollama_parallel: Optional[int] = None,
+                 ollama_load_ms: float = 0):
+        """Generate the corpus and configure the latencies.
+
+        Args:
+            documents: Size of the synthetic corpus
+            dimensions: Embedding dimensions
+            solr_latency_ms: Added latency per Solr request
+            ollama_latency_ms: Added latency per Ollama embedding request
+            ollama_item_ms: Extra latency per additional text in an /api/embed batch
+            qdrant_latency_ms: Added latency per Qdrant request
+            ollama_parallel: Embedding requests Ollama works on at the same time (None: unlimited)
+            ollama_load_ms: Time to load the model when it is not resident (keep_alive expired)
+        """
+        self.corpus = StubCorpus(documents, dimensions)
+        self.latency_ms = {"solr": solr_latency_ms, "ollama": ollama_latency_ms, "qdrant": qdrant_latency_ms}
+        self.ollama_item_ms = ollama_item_ms
+        self.ollama_slots = threading.BoundedSemaphore(ollama_parallel) if ollama_parallel else None
+        self.ollama_load_ms = ollama_load_ms
+        self.model_expires_at = 0.0  # Epoch seconds until which the model stays loaded (0: not loaded)
+        self._model_lock = threading.Lock()
+        self.index_version = int(time.time())
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def load_model(self, keep_alive=None) -> float:
+        """Load the stand-in model if needed and apply keep_alive like Ollama.
+
+        Args:
+            keep_alive: Seconds, a duration such as "30m", a negative value to keep it loaded, or None (5m)
+
+        Returns:
+            Seconds spent loading (0 if the model was resident)
+        """
+        with self._model_lock:
+            now = time.time()
+            load_seconds = self.ollama_load_ms / 1000 if self.model_expires_at <= now else 0.0
+            if load_seconds:
+                time.sleep(load_seconds)
+            self.model_expires_at = time.time() + keep_alive_seconds(keep_alive)
+            return load_seconds
+
+    def loaded_models(self) -> List[Dict]:
+        """Entries of /api/ps: the stand-in model while its keep_alive runs."""
+        if self.model_expires_at <= time.time():
+            return []
+        expires_at = datetime.fromtimestamp(min(self.model_expires_at, FOREVER), timezone.utc)
+        return [{"name": EMBEDDING_MODEL, "model": EMBEDDING_MODEL, "digest": "stub", "size_vram": 0,
+                 "expires_at": expires_at.isoformat()}]
+
+    def collection_info(self) -> Dict:
+        """Qdrant collection info of the stub collection."""
+        return {
+            "status": "green",
+            "optimizer_status": "ok",
+            "segments_count": 1,
+            "points_count": len(self.corpus.docs),
+            "indexed_vectors_count": len(self.corpus.docs),
+            "config": {
+                "params": {"vectors": {"size": self.corpus.dimensions, "distance": "Cosine"}},
+                "hnsw_config": {"m": 16, "ef_construct": 100, "full_scan_threshold": 10000},
+                "optimizer_config": {"deleted_threshold": 0.2, "vacuum_min_vector_number": 1000,
+                                     "default_segment_number": 0, "flush_interval_sec": 5},
+                "wal_config": {"wal_capacity_mb": 32, "wal_segments_ahead": 0},
+            },
+            "payload_schema": {},
+        }
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving in a background thread.
+
+        Args:
+            host: Interface to bind to
+            port: Port (0 picks a free port)
+
+        Returns:
+            Base URL of the stand-ins
+        """
+        self.server = ThreadingHTTPServer((host, port), StubRequestHandler)
+        self.server.daemon_threads = True
+        self.server.backends = self
+        self._thread = threading.Thread(target=self.server.serve_forever, name="stub-backends", daemon=True)
+        self._thread.start()
+        base_url = f"http://{host}:{self.server.server_address[1]}"
+        logger.info(f"Stand-in backends with {len(self.corpus.docs)} documents at {base_url}")
+        return base_url
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @staticmethod
+    def endpoints(base_url: str) -> Dict[str, str]:
+        """Return the Solr, Ollama and Qdrant endpoint URLs for a base URL."""
+        return {"solr": f"{base_url}{SOLR_PATH}", "ollama": base_url, "qdrant": base_url}
+
+
+def main():
+    """Main function to run the stand-in backends."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="Local stand-ins for Solr, Ollama and Qdrant")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to bind to (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--documents", type=int, default=DEFAULT_DOCUMENTS,
+                        help=f"Size of the synthetic corpus (default: {DEFAULT_DOCUMENTS})")
+    parser.add_argument("--solr-latency-ms", type=float, default=5, help="Latency per Solr request (default: 5)")
+    parser.add_argument("--ollama-latency-ms", type=float, default=30,
+                        help="Latency per Ollama embedding request (default: 30)")
+    parser.add_argument("--qdrant-latency-ms", type=float, default=5, help="Latency per Qdrant request (default: 5)")
+    parser.add_argument("--ollama-parallel", type=int, default=None,
+                        help="Embedding requests Ollama works on at the same time (default: unlimited)")
+    parser.add_argument("--ollama-load-ms", type=float, default=0,
+                        help="Model load time after keep_alive expired (default: 0)")
+    args = parser.parse_args()
+
+    backends = StubBackends(args.documents, solr_latency_ms=args.solr_latency_ms,
+                            ollama_latency_ms=args.ollama_latency_ms, qdrant_latency_ms=args.qdrant_latency_ms,
+                            ollama_parallel=args.ollama_parallel, ollama_load_ms=args.ollama_load_ms)
+    base_url = backends.start(args.host, args.port)
+    endpoints = StubBackends.endpoints(base_url)
+    print(f"SOLR_ENDPOINT={endpoints['solr']} OLLAMA_ENDPOINT={endpoints['ollama']} "
+          f"QDRANT_ENDPOINT={endpoints['qdrant']}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        backends.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Search Tracing
+
+Nested timing spans for the hybrid search. A trace is started per search (by the
+service when timings are requested, or by the benchmark); code paths open spans with
+`span()` and record attributes such as result counts, bytes received and cache hits.
+Without an active trace, `span()` only costs a context variable lookup.
+
+The current trace and span live in context variables, so work handed to thread pools
+must be submitted with `submit_in_context()` to be recorded as a child of the caller.
+
+Traces can be returned as a compact `timings` block or exported as OTLP JSON
+(the OpenTelemetry ExportTraceServiceRequest encoding), one request per line, which the
+OpenTelemetry Collector reads with its otlpjsonfile receiver.
+
+Usage:
+    with start_trace() as trace:
+        searcher.combined_search("Kündigung Mietvertrag")
+    trace.totals()   # {"solr_search": 0.012, "embed": 0.034, ...}
+    trace.timings()  # {"trace_id": ..., "total_ms": ..., "stages": {...}, "spans": [...]}
+
+    with span("solr_search", rows=30) as current:
+        response = session.get(...)
+        current.set_attribute("bytes", len(response.content))
+"""
+
+import json
+import secrets
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+SERVICE_NAME = "asra-hybrid-search"
+TRACER_NAME = "asra.hybrid_search"
+
+# Stage names used by the hybrid search
+STAGES = ("embed", "qdrant", "solr_knn", "solr_search", "solr_hydration", "fusion")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("asra_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("asra_span", default=None)
+_export_lock = threading.Lock()
+
+
+class Span:
+    """One timed operation with attributes; spans form a tree through parent_id."""
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Optional[Dict[str, Any]] = None):
+        """Start the span.
+
+        Args:
+            name: Span name (a stage name for the hybrid search hops)
+            parent_id: ID of the enclosing span, None for a root span
+            attributes: Initial attributes
+        """
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.duration = 0.0
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute (str, int, float or bool)."""
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        """Set several attributes."""
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        """Record the duration."""
+        self.duration = time.perf_counter() - self._start
+
+
+class _NoopSpan:
+    """Stand-in returned by span() without an active trace."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _otel_value(value: Any) -> Dict:
+    """Encode an attribute value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # int64 values are strings in OTLP JSON
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Trace:
+    """Spans of one search (thread-safe, spans of parallel hops may overlap)."""
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.spans: List[Span] = []  # Finished spans
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        """Record a finished span."""
+        with self._lock:
+            self.spans.append(span)
+
+    def totals(self) -> Dict[str, float]:
+        """Return the summed duration in seconds per span name."""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for finished in self.spans:
+                totals[finished.name] = totals.get(finished.name, 0.0) + finished.duration
+        return totals
+
+    def timings(self) -> Dict:
+        """Return the trace as a compact timings block for API responses.
+
+        Returns:
+            Dict with trace_id, total_ms (since the trace started), stages (summed ms per
+            span name) and spans (in start order, offsets relative to the trace start)
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "stages": {name: round(seconds * 1000, 3) for name, seconds in self.totals().items()},
+            "spans": [{
+                "name": s.name,
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                "start_ms": round((s.start_ns - self.start_ns) / 1e6, 3),
+                "duration_ms": round(s.duration * 1000, 3),
+                "attributes": s.attributes,
+                **({"error": s.error} if s.error else {}),
+            } for s in spans],
+        }
+
+    def to_otel(self, service_name: str = SERVICE_NAME) -> Dict:
+        """Encode the trace as an OTLP JSON ExportTraceServiceRequest.
+
+        Args:
+            service_name: Value of the service.name resource attribute
+
+        Returns:
+            JSON-serializable dict
+        """
+        with self._lock:
+            spans = list(self.spans)
+        otel_spans = []
+        for s in spans:
+            otel_span = {
+                "traceId": self.trace_id,
+                "spanId": s.span_id,
+                "name": s.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.start_ns + int(s.duration * 1e9)),
+                "attributes": [{"key": key, "value": _otel_value(value)} for key, value in s.attributes.items()],
+                "status": {"code": 2, "message": s.error} if s.error else {},  # 2 = STATUS_CODE_ERROR
+            }
+            if s.parent_id:
+                otel_span["parentSpanId"] = s.parent_id
+            otel_spans.append(otel_span)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": TRACER_NAME}, "spans": otel_spans}],
+        }]}
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace of the current context, or None."""
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace() -> Iterator[Trace]:
+    """Start a trace for the enclosed block.
+
+    Yields:
+        The trace collecting the spans
+    """
+    trace = Trace()
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+@contextmanager
+def ensure_trace(enabled: bool = True) -> Iterator[Optional[Trace]]:
+    """Join the current trace, or start one if enabled.
+
+    Args:
+        enabled: Start a trace if none is active
+
+    Yields:
+        The active trace, or None if there is none and enabled is False
+    """
+    trace = _current_trace.get()
+    if trace is not None or not enabled:
+        yield trace
+        return
+    with start_trace() as trace:
+        yield trace
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Time the enclosed block as a child of the current span (no-op without a trace).
+
+    Args:
+        name: Span name (see STAGES for the hybrid search hops)
+        **attributes: Initial attributes
+
+    Yields:
+        The span, for setting attributes inside the block
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish()
+        trace.add(current)
+
+
+def submit_in_context(executor: Executor, fn: Callable, *args, **kwargs) -> Future:
+    """Submit a call to an executor so that it runs in a copy of the caller's context.
+
+    Args:
+        executor: Thread pool
+        fn: Callable to run
+        *args: Positional arguments of fn
+        **kwargs: Keyword arguments of fn
+
+    Returns:
+        Future of the call
+    """
+    return executor.submit(copy_context().run, fn, *args, **kwargs)
+
+
+def export_otel_json(trace: Trace, path: str, service_name: str = SERVICE_NAME) -> None:
+    """Append a trace as one OTLP JSON line to a file.
+
+    Args:
+        trace: Finished trace
+        path: JSON lines file
+        service_name: Value of the service.name resource attribute
+    """
+    line = json.dumps(trace.to_otel(service_name), separators=(",", ":"))
+    with _export_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
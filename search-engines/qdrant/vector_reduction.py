@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ASRA Vector Reduction
+
+Dimensionality reduction for the 1024-dim E5 embeddings. Two methods are supported:
+
+- "pca": projection onto the top principal components, fitted offline on the corpus
+- "truncate": Matryoshka-style truncation to the first N dimensions
+
+A projection is persisted as a .npz file so that the indexer and HybridSearcher
+apply exactly the same transform to document and query embeddings.
+"""
+
+import json
+import logging
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REDUCTION_METHODS = ("pca", "truncate")
+FULL_VECTOR_NAME = "full"  # Named vector holding the full embedding when both are stored
+REDUCED_VECTOR_NAME = "reduced"  # Named vector holding the reduced embedding when both are stored
+
+
+class VectorProjection:
+    """A persisted transform from full embeddings to reduced vectors."""
+
+    def __init__(self, method: str, dim: int, source_dim: int,
+                 mean: Optional[np.ndarray] = None, components: Optional[np.ndarray] = None,
+                 vector_name: Optional[str] = None):
+        """Initialize the projection.
+
+        Args:
+            method: Reduction method ("pca" or "truncate")
+            dim: Dimension of the reduced vectors
+            source_dim: Dimension of the full embeddings
+            mean: Corpus mean subtracted before projecting (pca only)
+            components: Principal components, shape (dim, source_dim) (pca only)
+            vector_name: Qdrant named vector holding the reduced vectors (None for the unnamed vector)
+        """
+        if method not in REDUCTION_METHODS:
+            raise ValueError(f"Unknown reduction method: {method}")
+        if dim <= 0 or dim > source_dim:
+            raise ValueError(f"Reduced dimension must be between 1 and {source_dim}, got {dim}")
+        if method == "pca" and (mean is None or components is None):
+            raise ValueError("PCA projection requires mean and components")
+
+        self.method = method
+        self.dim = dim
+        self.source_dim = source_dim
+        self.mean = mean
+        self.components = components
+        self.vector_name = vector_name
+
+    @classmethod
+    def fit_pca(cls, vectors: Sequence[Sequence[float]], dim: int,
+                vector_name: Optional[str] = None) -> "VectorProjection":
+        """Fit a PCA projection on a sample of corpus embeddings.
+
+        Args:
+            vectors: Corpus embeddings, shape (n, source_dim)
+            dim: Number of principal components to keep
+            vector_name: Qdrant named vector holding the reduced vectors
+
+        Returns:
+            The fitted projection
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.shape[0] < dim:
+            raise ValueError(f"Need at least {dim} vectors to fit {dim} components, got {matrix.shape[0]}")
+
+        mean = matrix.mean(axis=0)
+        # Rows of vt are the principal axes, sorted by explained variance
+        _, singular_values, vt = np.linalg.svd(matrix - mean, full_matrices=False)
+        explained = (singular_values[:dim] ** 2).sum() / (singular_values ** 2).sum()
+        logger.info(f"Fitted PCA on {matrix.shape[0]} vectors: {matrix.shape[1]} -> {dim} dims "
+                    f"({explained:.1%} variance explained)")
+
+        return cls("pca", dim, matrix.shape[1], mean=mean, components=vt[:dim].astype(np.float32),
+                   vector_name=vector_name)
+
+    @classmethod
+    def truncation(cls, source_dim: int, dim: int, vector_name: Optional[str] = None) -> "VectorProjection":
+        """Create a Matryoshka-style truncation to the first `dim` dimensions.
+
+        Args:
+            source_dim: Dimension of the full embeddings
+            dim: Number of leading dimensions to keep
+            vector_name: Qdrant named vector holding the reduced vectors
+
+        Returns:
+            The truncation projection
+        """
+        return cls("truncate", dim, source_dim, vector_name=vector_name)
+
+    def transform_many(self, vectors: Sequence[Sequence[float]]) -> np.ndarray:
+        """Reduce a batch of embeddings.
+
+        Args:
+            vectors: Full embeddings, shape (n, source_dim)
+
+        Returns:
+            L2-normalized reduced vectors, shape (n, dim)
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.shape[-1] != self.source_dim:
+            raise ValueError(f"Expected {self.source_dim}-dim vectors, got {matrix.shape[-1]}")
+
+        if self.method == "pca":
+            reduced = (matrix - self.mean) @ self.components.T
+        else:
+            reduced = matrix[..., :self.dim]
+
+        # Reason: the collections use cosine distance, normalizing keeps scores comparable
+        norms = np.linalg.norm(reduced, axis=-1, keepdims=True)
+        return reduced / np.maximum(norms, 1e-12)
+
+    def transform(self, vector: Sequence[float]) -> List[float]:
+        """Reduce a single embedding.
+
+        Args:
+            vector: Full embedding
+
+        Returns:
+            Reduced vector as a list of floats
+        """
+        return self.transform_many([vector])[0].tolist()
+
+    def save(self, path: str) -> None:
+        """Persist the projection as a .npz file.
+
+        Args:
+            path: Output file path
+        """
+        metadata = {
+            "method": self.method,
+            "dim": self.dim,
+            "source_dim": self.source_dim,
+            "vector_name": self.vector_name,
+        }
+        arrays = {"metadata": np.array(json.dumps(metadata))}
+        if self.method == "pca":
+            arrays["mean"] = self.mean
+            arrays["components"] = self.components
+        # Reason: open the file ourselves so numpy does not append another ".npz"
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+        logger.info(f"Saved {self.method} projection ({self.source_dim} -> {self.dim}) to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "VectorProjection":
+        """Load a projection saved with save().
+
+        Args:
+            path: Path to the .npz file
+
+        Returns:
+            The loaded projection
+        """
+        with np.load(path) as data:
+            metadata = json.loads(str(data["metadata"]))
+            mean = data["mean"] if "mean" in data else None
+            components = data["components"] if "components" in data else None
+
+        projection = cls(metadata["method"], metadata["dim"], metadata["source_dim"],
+                         mean=mean, components=components, vector_name=metadata.get("vector_name"))
+        logger.info(f"Loaded {projection.method} projection ({projection.source_dim} -> {projection.dim}) "
+                    f"from {path}")
+        return projection
+
+
+def load_collection_vectors(client, collection_name: str, vector_name: Optional[str] = None,
+                            limit: Optional[int] = None, batch_size: int = 256) -> np.ndarray:
+    """Scroll full embeddings out of a Qdrant collection.
+
+    Args:
+        client: Qdrant client
+        collection_name: Collection (or alias) to read from
+        vector_name: Named vector to read (None for the unnamed vector)
+        limit: Maximum number of vectors to read (None for all)
+        batch_size: Points per scroll request
+
+    Returns:
+        Matrix of embeddings, shape (n, source_dim)
+    """
+    vectors = []
+    offset = None
+    while limit is None or len(vectors) < limit:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=batch_size if limit is None else min(batch_size, limit - len(vectors)),
+            offset=offset,
+            with_payload=False,
+            with_vectors=[vector_name] if vector_name else True
+        )
+        for point in points:
+            vector = point.vector[vector_name] if vector_name else point.vector
+            vectors.append(vector)
+        if offset is None:
+            break
+
+    logger.info(f"Loaded {len(vectors)} vectors from '{collection_name}'")
+    return np.asarray(vectors, dtype=np.float32)
@@ -23,12 +23,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Zitat-Index (jurabk/amtabk, enbez) -> id für den Zitat-Direktzugriff der Hybrid-Suche,
+# Dateiformat siehe search-engines/qdrant/citation_index.py
+CITATION_INDEX_FORMAT = 1
+DEFAULT_CITATION_INDEX_FILE = os.environ.get(
+    "CITATION_INDEX_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "qdrant", "citation_index.json")
+)
+
 class NormSolrImporter:
-    def __init__(self, solr_url: str = "http://localhost:8983/solr/documents"):
+    def __init__(self, solr_url: str = "http://localhost:8983/solr/documents",
+                 citation_index_file: Optional[str] = None):
         self.solr_url = solr_url
         self.update_url = f"{solr_url}/update/json/docs"
         self.commit_url = f"{solr_url}/update?commit=true"
         self.session = requests.Session()
+        self.citation_index_file = citation_index_file
+        self.citation_entries: List[List[str]] = []
         
     def test_connection(self) -> bool:
         """Testet die Verbindung zu Solr"""
@@ -549,6 +560,8 @@ class NormSolrImporter:
             if norm_docs:
                 imported_count = self.index_documents(norm_docs)
                 total_norms_imported += imported_count
+                if imported_count:
+                    self.collect_citations(norm_docs)
                 logger.info(f"  {imported_count} Normen aus {filename} importiert")
             else:
                 logger.error(f"Fehler beim Parsen von {filename}")
@@ -556,10 +569,64 @@ class NormSolrImporter:
         # Commit nach dem Import
         if total_norms_imported > 0:
             self.commit()
+            if self.citation_index_file:
+                self.write_citation_index(self.citation_index_file)
         
         logger.info(f"Norm-level Import abgeschlossen: {total_norms_imported} Normen aus {len(xml_files)} Dateien")
         return total_norms_imported
 
+    def collect_citations(self, docs: List[Dict[str, Any]]):
+        """Merkt sich (Abkürzung, enbez, id) aller zitierbaren Normen für den Zitat-Index"""
+        for doc in docs:
+            enbez = doc.get('enbez')
+            if not enbez:
+                continue
+            abbreviations = list(doc.get('jurabk', []))
+            if doc.get('amtabk') and doc['amtabk'] not in abbreviations:
+                abbreviations.append(doc['amtabk'])
+            for abbreviation in abbreviations:
+                self.citation_entries.append([abbreviation, enbez, doc['id']])
+    
+    def write_citation_index(self, path: str) -> bool:
+        """
+        Schreibt den Zitat-Index; Einträge früherer Importe in dieselbe Datei bleiben erhalten
+        
+        Args:
+            path: Pfad der Index-Datei
+            
+        Returns:
+            True bei Erfolg
+        """
+        try:
+            entries = []
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    existing = json.load(f)
+                if existing.get('format') == CITATION_INDEX_FORMAT:
+                    entries = existing.get('entries', [])
+            
+            # Doppelte Einträge (erneuter Import derselben Dateien) entfernen
+            seen = set()
+            merged = []
+            for entry in entries + self.citation_entries:
+                key = tuple(entry)
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(list(entry))
+            
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            # Erst in eine temporäre Datei schreiben, damit ein laufender Dienst nie eine halbe Datei liest
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'format': CITATION_INDEX_FORMAT, 'created_at': datetime.now().timestamp(),
+                           'entries': merged}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+            logger.info(f"Zitat-Index mit {len(merged)} Einträgen geschrieben: {path}")
+            return True
+        except (OSError, ValueError) as e:
+            logger.error(f"Fehler beim Schreiben des Zitat-Index {path}: {e}")
+            return False
+
 def main():
     parser = argparse.ArgumentParser(description='Importiert deutsche Rechtsdokumente auf Norm-Ebene in Solr')
     parser.add_argument('directory', help='Verzeichnis mit XML-Dateien')
@@ -567,6 +634,11 @@ def main():
                        help='Solr URL (default: http://localhost:8983/solr/documents)')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Verbose logging')
+    parser.add_argument('--citation-index', default=DEFAULT_CITATION_INDEX_FILE,
+                       help='Zitat-Index für die Hybrid-Suche (default: CITATION_INDEX_FILE env '
+                            'oder ../qdrant/citation_index.json)')
+    parser.add_argument('--no-citation-index', action='store_true',
+                       help='Keinen Zitat-Index schreiben')
     
     args = parser.parse_args()
     
@@ -574,7 +646,8 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Solr Importer initialisieren
-    importer = NormSolrImporter(args.solr_url)
+    importer = NormSolrImporter(args.solr_url,
+                                citation_index_file=None if args.no_citation_index else args.citation_index)
     
     # Verbindung testen
     if not importer.test_connection():
@@ -586,6 +659,8 @@ def main():
     
     if total_imported > 0:
         logger.info(f"Norm-level Import erfolgreich abgeschlossen: {total_imported} Normen")
+        # Der Import ersetzt ganze Dokumente, gespeicherte Vektoren (embedding_vector) gehen dabei verloren
+        logger.info("Für das Solr-Vektor-Backend danach 'qdrant_indexer.py --target solr' erneut ausführen")
         sys.exit(0)
     else:
         logger.error("Import fehlgeschlagen")